@@ -1,75 +1,150 @@
 # Dieses Modul ist für das Web-Scraping von Preisen von der Automotive-Connectors Webseite zuständig.
 
 from datetime import date
-import requests, re
-from bs4 import BeautifulSoup
+import re
+import http_client
+from bs4 import BeautifulSoup, SoupStrainer
+from bs4.builder import builder_registry
+from price_cache import cached
 
-def ac_price(article):
+def ac_price(article, refresh=False):
     try:
-        headers = {"User-Agent": "Mozilla/5.0"}
-        url     = f"https://www.automotive-connectors.com/en/search?search={article}"
-        resp    = requests.get(url, headers=headers, timeout=10)
-        soup    = BeautifulSoup(resp.text, "html.parser")
-
-        # --- Interne Hilfsfunktion, um Preisdaten zu extrahieren und zu formatieren ---
-        def extract_price_data(price_rows):
-            if not price_rows:
-                return None
-            
-            last = price_rows[-1]
-            qty_txt = last.select_one(".product-block-prices-quantity").get_text(strip=True)
-            qty     = int(re.sub(r"[^\d]", "", qty_txt) or "0")
-            price_cell = last.find_all("td", class_="product-block-prices-cell")[-1]
-            price_txt  = price_cell.get_text(" ", strip=True)
-            
-            discounted_price = 0.0
-            price_search = re.search(r"(\d+[.,]?\d*)", price_txt)
-            if price_search:
-                price_float = float(price_search.group(1).replace(",", "."))
-                discounted_price = price_float * 0.7
-            
-            # KORREKTUR: Gib die berechneten Zahlen zurück
-            return {
-                "Datum": date.today().strftime("%d.%m.%Y"),
-                "Preis": discounted_price,
-                "Losgröße": qty,
-                "Quelle": "Automotive-Connectors (-30%)"
-            }
-
-        # 1. Prüfe, ob wir auf einer Produkt-Detailseite sind
-        detail = soup.find("div", class_="product-detail-main")
-        if detail:
-            result = extract_price_data(detail.select("tr.product-block-prices-row"))
-            if result:
-                return result
-
-        # 2. Suchergebnisseite
-        boxes = soup.find_all("div", class_="product-box")
-        if not boxes:
-            return None
-
-        box = boxes[0]
-        
-        # Hole Preisdaten direkt aus der Box
-        result = extract_price_data(box.select("tr.product-block-prices-row"))
-        if result:
-            return result
-        
-        # Wenn keine Preisdaten in der Box sind, lade die Detailseite
-        link_tag = box.find("a", class_="product-name")
-        if link_tag and link_tag.has_attr('href'):
-            link = link_tag["href"]
-            if not link.startswith("http"):
-                link = "https://www.automotive-connectors.com" + link
-            
-            detail_resp = requests.get(link, headers=headers, timeout=10)
-            detail_soup = BeautifulSoup(detail_resp.text, "html.parser")
-            detail_result = extract_price_data(detail_soup.select("tr.product-block-prices-row"))
-            if detail_result:
-                return detail_result
-
-        return None # Wenn nirgendwo Preisdaten gefunden wurden
-        
+        return _fetch_ac_price(article, refresh=refresh)
     except Exception as e:
         print(f"[AC-FEHLER] Unerwarteter Fehler für '{article}': {e}")
-        return None
\ No newline at end of file
+        return None
+
+def _has_class(*names):
+    # Beim Filtern während des Parsens ist das class-Attribut noch ein String ("card product-box ..."),
+    # ein Vergleich mit class_="product-box" träfe nur Elemente mit genau dieser einen Klasse
+    wanted = set(names)
+    def match(value):
+        return value is not None and not wanted.isdisjoint(value.split() if isinstance(value, str) else value)
+    return match
+
+# Nur die Bereiche parsen, die Preisdaten oder den Produktlink enthalten
+_SEARCH_STRAINER = SoupStrainer("div", class_=_has_class("product-detail-main", "product-box"))
+_DETAIL_STRAINER = SoupStrainer("tr", class_=_has_class("product-block-prices-row"))
+# lxml ist deutlich schneller, aber optional
+_PARSER = "lxml" if builder_registry.lookup("lxml") else "html.parser"
+_BASE_URL = "https://www.automotive-connectors.com"
+_HEADERS = {"User-Agent": "Mozilla/5.0"}
+_DIGITS = re.compile(r"[^\d]")
+_PRICE = re.compile(r"(\d+[.,]?\d*)")
+
+def _parse(html, strainer):
+    return BeautifulSoup(html, _PARSER, parse_only=strainer)
+
+def _extract_price_data(price_rows):
+    """Wandelt die letzte Preisstaffel in einen Preiseintrag um."""
+    if not price_rows:
+        return None
+
+    last = price_rows[-1]
+    qty_txt = last.select_one(".product-block-prices-quantity").get_text(strip=True)
+    qty     = int(_DIGITS.sub("", qty_txt) or "0")
+    price_cell = last.find_all("td", class_="product-block-prices-cell")[-1]
+    price_txt  = price_cell.get_text(" ", strip=True)
+
+    discounted_price = 0.0
+    price_search = _PRICE.search(price_txt)
+    if price_search:
+        price_float = float(price_search.group(1).replace(",", "."))
+        discounted_price = price_float * 0.7
+
+    return {
+        "Datum": date.today().strftime("%d.%m.%Y"),
+        "Preis": discounted_price,
+        "Losgröße": qty,
+        "Quelle": "Automotive-Connectors (-30%)"
+    }
+
+def _extract_search_page(soup):
+    """Liefert (Preiseintrag, Link zur Detailseite) aus einer geparsten Such- oder Detailseite."""
+    # 1. Prüfe, ob wir auf einer Produkt-Detailseite sind
+    detail = soup.find("div", class_="product-detail-main")
+    if detail:
+        result = _extract_price_data(detail.select("tr.product-block-prices-row"))
+        if result:
+            return result, None
+
+    # 2. Suchergebnisseite
+    box = soup.find("div", class_="product-box")
+    if box is None:
+        return None, None
+
+    # Hole Preisdaten direkt aus der Box
+    result = _extract_price_data(box.select("tr.product-block-prices-row"))
+    if result:
+        return result, None
+
+    # Wenn keine Preisdaten in der Box sind, wird die Detailseite benötigt
+    link_tag = box.find("a", class_="product-name")
+    if link_tag and link_tag.has_attr('href'):
+        link = link_tag["href"]
+        if not link.startswith("http"):
+            link = _BASE_URL + link
+        return None, link
+    return None, None
+
+def _extract_detail_page(soup):
+    return _extract_price_data(soup.select("tr.product-block-prices-row"))
+
+def _get_html(url):
+    resp = http_client.get(url, headers=_HEADERS, timeout=10)
+    resp.raise_for_status()
+    return resp.text
+
+@cached("Automotive-Connectors")
+def _fetch_ac_price(article):
+    # Netzwerk- und Parsing-Fehler werden an ac_price weitergereicht und nicht gecacht
+    html = _get_html(f"{_BASE_URL}/en/search?search={article}")
+    result, link = _extract_search_page(_parse(html, _SEARCH_STRAINER))
+    if result or not link:
+        return result
+    return _extract_detail_page(_parse(_get_html(link), _DETAIL_STRAINER))
+
+def benchmark_parse(fixtures, repeat=20):
+    """Vergleicht den gefilterten Parser mit dem vollständigen html.parser-Durchlauf über gespeicherte HTML-Seiten.
+    'fixtures' ist eine Liste von (Name, HTML, Seitentyp) mit Seitentyp "search" oder "detail".
+    Liefert False, wenn eine Seite gefiltert anders ausgewertet wird oder weder Preis noch Link liefert."""
+    import time
+    ok = True
+    for name, html, kind in fixtures:
+        if kind == "search":
+            extract, strainer = _extract_search_page, _SEARCH_STRAINER
+        else:
+            extract, strainer = _extract_detail_page, _DETAIL_STRAINER
+        start = time.perf_counter()
+        for _ in range(repeat):
+            full = extract(BeautifulSoup(html, "html.parser"))
+        t_full = (time.perf_counter() - start) / repeat
+        start = time.perf_counter()
+        for _ in range(repeat):
+            fast = extract(_parse(html, strainer))
+        t_fast = (time.perf_counter() - start) / repeat
+        if full != fast:
+            status = "ABWEICHUNG"
+        elif fast in (None, (None, None)):
+            status = "KEIN PREIS"
+        else:
+            status = "OK"
+        ok = ok and status == "OK"
+        print(f"{name}: html.parser {t_full*1000:.1f} ms, {_PARSER}+Filter {t_fast*1000:.1f} ms "
+              f"({t_full/t_fast:.1f}x) [{status}]")
+    return ok
+
+if __name__ == "__main__":
+    # Aufruf: python ac_price_module.py [suchseite.html detailseite.html ...]
+    # Ohne Angabe werden die Vorlagen aus benchmark_fixtures/ verwendet (Elemente mit mehreren Klassen).
+    # Dateien mit "detail" im Namen werden als Detailseite ausgewertet.
+    import glob
+    import os
+    import sys
+    paths = sys.argv[1:] or sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                          "benchmark_fixtures", "ac_*.html")))
+    fixtures = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            fixtures.append((os.path.basename(path), f.read(), "detail" if "detail" in path else "search"))
+    sys.exit(0 if benchmark_parse(fixtures) else 1)
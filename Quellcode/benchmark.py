@@ -0,0 +1,426 @@
+# Dieses Modul misst die wichtigsten Abläufe durchgängig mit synthetischen Daten: Datenbank laden, Einzelsuche und
+# BOM-Kalkulation, offline und gegen einen lokalen Stub-Server, der die Antworten der Online-Quellen aus
+# benchmark_fixtures/ mit einstellbarer Verzögerung ausliefert. Es werden keine echten Anbieter abgefragt.
+# Aufruf: python benchmark.py [--sizes 1000 10000] [--latency 0.05] [--json ergebnis.json] [--compare vorher.json]
+#         [--trace ablauf.json]
+
+import argparse
+import html
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs, unquote
+import numpy as np
+import pandas as pd
+from requests.adapters import HTTPAdapter
+
+# Platzhalter-Keys, damit Mouser und Nexar abgefragt werden (alle Anfragen gehen an den Stub-Server)
+os.environ.setdefault("MOUSER_API_KEY", "benchmark")
+os.environ.setdefault("OCTOPART_API_KEY", "benchmark")
+
+from config import (BLOCK_SIZE, BLOCK_ROWS, SEARCH_COLS, SUPPLIER_HOSTS, EXCHANGE_RATE_URL,
+                    HTTP_POOL_CONNECTIONS, HTTP_POOL_MAXSIZE, BENCHMARK_SIZES, BENCHMARK_BOM_PARTS,
+                    BENCHMARK_QUERIES, BENCHMARK_LATENCY, BENCHMARK_ONLINE_PARTS, BENCHMARK_REPEAT)
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_fixtures")
+
+# Aufbau der synthetischen Datenbank (Spalten und Wertebereiche wie in database.json)
+_CLASSES = ["VERBINDER", "KONTAKT", "DICHTUNG", "ZUBEHÖR"]
+_CLASSES_DE = ["SOCKET", "PIN", "SEAL", "WEDGE", "CAP"]
+_DESCRIPTIONS = ["GEHÄUSE", "VERRIEGELUNG", "KONTAKT", "DICHTUNG", "KAPPE", "TÜLLE"]
+_CATEGORIES = ["Connector/ Stecker", "Wedge/ Keil", "Cable Seal", "Plug", "Contact/ Kontakt"]
+_MANUFACTURERS = ["DEUTSCH", "TE CONNECTIVITY", "BINDER", "MOLEX", "APTIV", "AMPHENOL"]
+_MPN_PREFIXES = ["DTM06-", "DT04-", "1394", "99-0436-", "MX150-", "AT06-"]
+_MPN_SUFFIXES = ["2S", "4P", "E007", "1", "12S", "08SA"]
+_SOURCES = ["www (-30%)", "SAP", "ECI", "www (-15%)", "PSZ", "Automotive-Connectors (-30%)", "Mouser (-30%)"]
+_LOTS = [1, 10, 100, 500, 1000, 5000]
+_PRICE_COLUMNS = [f"Unnamed: {i}" for i in range(24, 35)]
+# Anteil der Blöcke mit mindestens 1, 2, ... Preiseinträgen (gemessen an der echten Datenbank)
+_FILL_RATES = (0.30, 0.18, 0.06, 0.028, 0.014, 0.007, 0.003, 0.001, 0.0005, 0.0003, 0.0002)
+_DAY_MIN = (pd.Timestamp("2019-01-01") - pd.Timestamp(0)).days
+_DAY_MAX = (pd.Timestamp("2026-06-30") - pd.Timestamp(0)).days
+
+def _pick(rng, choices, n):
+    return np.array(choices, dtype=object)[rng.integers(0, len(choices), n)]
+
+def make_db(n_blocks, seed=0):
+    """Erzeugt eine Datenbank mit n_blocks Preisblöcken im Format von database.json (Metadaten in der ersten Blockzeile)."""
+    rng = np.random.default_rng(seed)
+    n_rows = n_blocks * BLOCK_SIZE
+    ids = range(n_blocks)
+
+    def meta(values, fill):
+        column = np.full(n_rows, fill, dtype=object)
+        column[::BLOCK_SIZE] = values
+        return column
+
+    mpns = [f"{p}{i:06d}-{s}" for p, s, i in
+            zip(_pick(rng, _MPN_PREFIXES, n_blocks), _pick(rng, _MPN_SUFFIXES, n_blocks), ids)]
+    description = _pick(rng, _DESCRIPTIONS, n_blocks)
+    data = {
+        "ENTRY": meta([f"E3{i:08d}" for i in ids], np.nan),
+        "WN_SAP-Artikel-NR": meta([str(1000000000 + i) for i in ids], ""),
+        "Class": meta(_pick(rng, _CLASSES, n_blocks), np.nan),
+        "Class_deutsch": meta(_pick(rng, _CLASSES_DE, n_blocks), np.nan),
+        "Description_deutsch_2": meta(description, np.nan),
+        "Description": meta(description, np.nan),
+        "Category": meta(_pick(rng, _CATEGORIES, n_blocks), None),
+        "WN_Hersteller_1": meta(_pick(rng, _MANUFACTURERS, n_blocks), np.nan),
+        "WN_HerstellerBestellnummer_1": meta(mpns, None),
+        "WN_Norm": np.full(n_rows, np.nan, dtype=object),
+        "Unnamed: 16": np.full(n_rows, np.nan),
+        "Unnamed: 23": np.full(n_rows, np.nan),
+    }
+    # Preisspalten füllen sich von links: Spalte j ist nur belegt, wenn Spalte j-1 belegt ist
+    filled = np.ones(n_blocks, dtype=bool)
+    previous = 1.0
+    for col, rate in zip(_PRICE_COLUMNS, _FILL_RATES):
+        filled &= rng.random(n_blocks) < rate / previous
+        previous = rate
+        starts = np.flatnonzero(filled) * BLOCK_SIZE
+        k = len(starts)
+        column = np.full(n_rows, None, dtype=object)
+        column[starts + BLOCK_ROWS["Datum"]] = np.array(
+            list(pd.to_datetime(rng.integers(_DAY_MIN, _DAY_MAX, k), unit="D")), dtype=object)
+        column[starts + BLOCK_ROWS["Preis"]] = np.round(rng.lognormal(-1.0, 1.0, k), 4).astype(object)
+        column[starts + BLOCK_ROWS["Losgröße"]] = np.array(_LOTS)[rng.integers(0, len(_LOTS), k)].astype(object)
+        column[starts + BLOCK_ROWS["Quelle"]] = _pick(rng, _SOURCES, k)
+        data[col] = column
+    return pd.DataFrame(data)
+
+def write_bom(path, df, n_parts, hit_ratio=0.8, seed=0):
+    """
+    Schreibt eine BOM als CSV (6 Kopfzeilen, dann Spaltenüberschriften wie in den echten Stücklisten).
+    hit_ratio der Teile stammt aus der Datenbank, der Rest ist unbekannt; etwa jedes zehnte Teil kommt doppelt vor.
+    """
+    rng = np.random.default_rng(seed)
+    mpns = df["WN_HerstellerBestellnummer_1"].iloc[::BLOCK_SIZE].to_numpy(dtype=object)
+    n_hits = int(n_parts * hit_ratio)
+    parts = list(mpns[rng.choice(len(mpns), min(n_hits, len(mpns)), replace=False)])
+    parts += [f"NEU-{i:05d}-X" for i in range(n_parts - len(parts))]
+    parts = [parts[i] for i in rng.permutation(len(parts))]
+    parts += [parts[i] for i in rng.integers(0, len(parts), len(parts) // 10)]
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write("Stückliste;Benchmark;\n" * 6)
+        f.write("Pos;ManufacturerOrderNo;Menge\n")
+        for pos, part in enumerate(parts, 1):
+            f.write(f"{pos};{part};{pos % 7 + 1}\n")
+    return parts
+
+# --- Lokaler Stub-Server für die Online-Quellen ---
+
+_AC_HOST = SUPPLIER_HOSTS["Automotive-Connectors"]
+_MOUSER_HOST = SUPPLIER_HOSTS["Mouser"]
+_NEXAR_HOST = SUPPLIER_HOSTS["Octopart"]
+_RATES_HOST = urlsplit(EXCHANGE_RATE_URL).hostname
+_STUB_HOSTS = (_AC_HOST, _MOUSER_HOST, _NEXAR_HOST, _RATES_HOST)
+
+def _load_fixtures():
+    fixtures = {}
+    for name in os.listdir(FIXTURE_DIR):
+        with open(os.path.join(FIXTURE_DIR, name), encoding="utf-8") as f:
+            fixtures[name] = f.read()
+    return fixtures
+
+def _needs_detail(mpn):
+    # Jedes fünfte Teil ohne Preis in der Trefferliste, damit auch die Detailseite abgerufen wird
+    return zlib.crc32(mpn.encode("utf-8")) % 5 == 0
+
+def _is_unknown(mpn):
+    # Teile wie "UNBEKANNT-12" (siehe bench_database) kennen die Stub-Quellen nicht
+    return mpn.startswith("UNBEKANNT")
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """Beantwortet Anfragen an /<host>/<pfad> mit den Vorlagen aus benchmark_fixtures ({{MPN}} wird ersetzt)."""
+    protocol_version = "HTTP/1.1"
+    latency = 0.0
+    fixtures = {}
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, body, content_type):
+        data = body.encode("utf-8")
+        time.sleep(self.latency)
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _html(self, name, mpn):
+        return self._send(self.fixtures[name].replace("{{MPN}}", html.escape(mpn)), "text/html; charset=utf-8")
+
+    def _json_part(self, name, mpn):
+        return json.loads(self.fixtures[name].replace("{{MPN}}", json.dumps(mpn)[1:-1]))
+
+    def _nexar_search(self, mpn):
+        return {"results": []} if _is_unknown(mpn) else self._json_part("nexar_supsearch.json", mpn)
+
+    def _route(self):
+        parts = urlsplit(self.path)
+        host, _, path = parts.path.lstrip("/").partition("/")
+        return host, unquote(path), parse_qs(parts.query)
+
+    def do_GET(self):
+        host, path, query = self._route()
+        if host == _AC_HOST and path.startswith("en/search"):
+            mpn = query.get("search", [""])[0]
+            return self._html("ac_search_noprice.html" if _needs_detail(mpn) else "ac_search.html", mpn)
+        if host == _AC_HOST and path.startswith("en/p/"):
+            return self._html("ac_detail.html", path[len("en/p/"):])
+        if host == _RATES_HOST:
+            return self._send(self.fixtures["exchangerate_latest.json"], "application/json")
+        self.send_error(404)
+
+    def do_POST(self):
+        host, _, _ = self._route()
+        payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if host == _MOUSER_HOST:
+            numbers = payload["SearchByPartRequest"]["mouserPartNumber"].split("|")
+            found = [self._json_part("mouser_part.json", n) for n in numbers if not _is_unknown(n)]
+            body = {"Errors": [], "SearchResults": {"NumberOfResult": len(found), "Parts": found}}
+        elif host == _NEXAR_HOST:
+            variables = payload.get("variables") or {}
+            if "mpn" in variables:
+                data = {"supSearch": self._nexar_search(variables["mpn"])}
+            else:
+                # Sammelabfrage: Variable mpn<j> gehört zum Alias q<j>
+                data = {f"q{key[3:]}": self._nexar_search(mpn) for key, mpn in variables.items()}
+            body = {"data": data}
+        else:
+            return self.send_error(404)
+        self._send(json.dumps(body), "application/json")
+
+class _StubAdapter(HTTPAdapter):
+    """Schreibt https://<host>/<pfad> auf den lokalen Stub-Server um; Pooling wie bei den echten Quellen."""
+
+    def __init__(self, base_url, **kwargs):
+        self.base_url = base_url
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        parts = urlsplit(request.url)
+        request.url = f"{self.base_url}/{parts.hostname}{parts.path}" + (f"?{parts.query}" if parts.query else "")
+        return super().send(request, **kwargs)
+
+@contextmanager
+def stub_suppliers(latency):
+    """Leitet alle Online-Quellen für die Dauer des Blocks auf einen lokalen Stub-Server um."""
+    import http_client
+    handler = type("StubHandler", (_StubHandler,), {"latency": latency, "fixtures": _load_fixtures()})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="stub-server", daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    session = http_client.get_session()
+    previous = {}
+    for host in _STUB_HOSTS:
+        prefix = f"https://{host}"
+        previous[prefix] = session.adapters.get(prefix)
+        session.mount(prefix, _StubAdapter(base_url, pool_connections=HTTP_POOL_CONNECTIONS,
+                                           pool_maxsize=HTTP_POOL_MAXSIZE))
+    try:
+        yield base_url
+    finally:
+        for prefix, adapter in previous.items():
+            if adapter is None:
+                session.adapters.pop(prefix, None)
+            else:
+                session.mount(prefix, adapter)
+        server.shutdown()
+        server.server_close()
+
+# --- Messungen ---
+
+def _measure(func, items):
+    """Ruft func für jedes Element auf und liefert die Einzelzeiten in Sekunden."""
+    times = []
+    for item in items:
+        start = time.perf_counter()
+        func(item)
+        times.append(time.perf_counter() - start)
+    return times
+
+def _format_entry(entry):
+    return (f"{entry['name']:28s} {entry['size']:>7}  n={entry['n']:<4d} p50 {entry['p50_ms']:10.2f} ms  "
+            f"p95 {entry['p95_ms']:10.2f} ms  {entry['throughput']:10.1f} {entry['unit']}")
+
+def _record(results, name, size, times, count, unit):
+    """Speichert p50/p95 der Einzelzeiten; count = verarbeitete Einheiten pro Messung (für den Durchsatz)."""
+    times = np.asarray(times)
+    p50, p95 = np.percentile(times, [50, 95])
+    entry = {"name": name, "size": size, "n": len(times), "p50_ms": p50 * 1000, "p95_ms": p95 * 1000,
+             "throughput": count * len(times) / times.sum() if times.sum() > 0 else 0.0, "unit": unit}
+    results.append(entry)
+    print(_format_entry(entry), flush=True)
+    return entry
+
+def bench_database(results, size, args):
+    """DB laden, Index aufbauen, Einzelsuche und BOM offline für eine Datenbank mit 'size' Blöcken."""
+    from data_manager import save_db_to_json, save_db_to_feather, load_db_from_json, load_db_from_feather, pa
+    from excel_search import build_search_index, search_and_show, merge_results, format_price_blocks
+    from fuzzy_search import build_fuzzy_index
+    from bom_service import price_bom
+
+    save_db_to_json(make_db(size, seed=args.seed))
+    _record(results, "DB laden (JSON)", size,
+            _measure(lambda _: load_db_from_json(), range(args.repeat)), size, "Blöcke/s")
+    if pa is not None:
+        save_db_to_feather(load_db_from_json())
+        _record(results, "DB laden (Feather)", size,
+                _measure(lambda _: load_db_from_feather(), range(args.repeat)), size, "Blöcke/s")
+        df = load_db_from_feather()
+    else:
+        df = load_db_from_json()
+
+    _record(results, "Suchindex aufbauen", size,
+            _measure(lambda _: build_search_index(df, SEARCH_COLS), range(args.repeat)), size, "Blöcke/s")
+    index = build_search_index(df, SEARCH_COLS)
+
+    # Einzelsuche wie im GUI: 80 % Herstellernummern, 10 % SAP-Nummern, 10 % unbekannt
+    rng = np.random.default_rng(args.seed)
+    blocks = rng.integers(0, size, args.queries)
+    kind = rng.random(args.queries)
+    mpn_col = df.columns.get_loc("WN_HerstellerBestellnummer_1")
+    sap_col = df.columns.get_loc("WN_SAP-Artikel-NR")
+    queries = [str(df.iat[b * BLOCK_SIZE, mpn_col]) if k < 0.8 else
+               str(df.iat[b * BLOCK_SIZE, sap_col]) if k < 0.9 else f"UNBEKANNT-{b}"
+               for b, k in zip(blocks, kind)]
+    _record(results, "Einzelsuche (DB)", size,
+            _measure(lambda q: merge_results(search_and_show(df, q, SEARCH_COLS, index), []), queries), 1, "Suchen/s")
+
+    fuzzy = build_fuzzy_index(index)
+    typos = [q[:len(q) // 2] + q[len(q) // 2 + 1:] for q in queries]
+    _record(results, "Unscharfe Suche", size, _measure(fuzzy.search, typos), 1, "Suchen/s")
+
+    bomfile = os.path.abspath(f"bom_{size}.csv")
+    write_bom(bomfile, df, args.bom_parts, seed=args.seed)
+    runs = []
+    times = _measure(lambda _: runs.append(price_bom(df, index, bomfile)), range(args.repeat))
+    _record(results, "BOM (offline)", size, times, runs[-1]["parts"], "Teile/s")
+
+    # Anzeige/Export: show_table braucht ein Fenster, gemessen wird die Formatierung davor
+    table = runs[-1]["df"]
+    if table is not None:
+        _record(results, "Tabellen-Formatierung", size,
+                _measure(lambda _: format_price_blocks(table), range(args.repeat)), len(table), "Zeilen/s")
+    return df, index
+
+def bench_online(results, df, index, size, args):
+    """Einzelsuche und BOM mit Online-Quellen gegen den Stub-Server (mit und ohne Preis-Cache)."""
+    import http_client
+    from supplier_guard import set_rate_limit
+    from online_sources import get_online_results
+    from bom_service import price_bom
+
+    if not args.keep_rate_limits:
+        # Der Stub-Server braucht keinen Schutz; gemessen wird die eigene Verarbeitung
+        for name in SUPPLIER_HOSTS:
+            set_rate_limit(name, 1e6, 1e6)
+    with stub_suppliers(args.latency):
+        bomfile = os.path.abspath("bom_online.csv")
+        parts = write_bom(bomfile, df, args.online_parts, hit_ratio=1.0, seed=args.seed + 1)
+        singles = parts[:min(len(parts), 50)]
+        _record(results, "Einzelsuche (online)", size,
+                _measure(lambda q: get_online_results(q, refresh=True), singles), 1, "Suchen/s")
+        for name, refresh in (("BOM (online, ohne Cache)", True), ("BOM (online, Cache)", False)):
+            runs = []
+            times = _measure(lambda _: runs.append(price_bom(df, index, bomfile, use_online=True, refresh=refresh)),
+                             range(args.repeat))
+            _record(results, name, size, times, runs[-1]["parts"], "Teile/s")
+    print(http_client.format_stats())
+
+def git_revision():
+    """Aktueller Commit (mit '-dirty' bei lokalen Änderungen), damit Ergebnisse Commits zugeordnet werden können."""
+    cwd = os.path.dirname(os.path.abspath(__file__))
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=cwd, capture_output=True,
+                             text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=cwd,
+                               capture_output=True, text=True).stdout.strip()
+        return rev + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unbekannt"
+
+def compare(results, path):
+    """Stellt die p50-Werte einer früheren Messung (JSON) den aktuellen gegenüber."""
+    with open(path, encoding="utf-8") as f:
+        old = json.load(f)
+    before = {(r["name"], r["size"]): r for r in old["results"]}
+    print(f"--- Vergleich mit {old.get('commit', '?')} ({old.get('created', '?')}) ---")
+    for r in results:
+        prev = before.get((r["name"], r["size"]))
+        if prev is None:
+            continue
+        change = (r["p50_ms"] / prev["p50_ms"] - 1) * 100 if prev["p50_ms"] else 0.0
+        print(f"{r['name']:28s} {r['size']:>7}  p50 {prev['p50_ms']:10.2f} -> {r['p50_ms']:10.2f} ms ({change:+.0f} %)")
+
+def run(args):
+    results = []
+    # Datenbank, Preis-Cache und Wechselkurse liegen relativ zum Arbeitsverzeichnis: alles in ein temporäres
+    # Verzeichnis, damit die echten Dateien unberührt bleiben
+    workdir = tempfile.TemporaryDirectory(prefix="preis_benchmark_", ignore_cleanup_errors=True)
+    cwd = os.getcwd()
+    os.chdir(workdir.name)
+    try:
+        for i, size in enumerate(args.sizes):
+            df, index = bench_database(results, size, args)
+            # Online nur einmal messen (unabhängig von der DB-Größe)
+            if i == 0 and not args.offline:
+                bench_online(results, df, index, size, args)
+            del df, index
+    finally:
+        os.chdir(cwd)
+        workdir.cleanup()
+    return results
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="benchmark", description="Durchgängige Leistungsmessung mit synthetischen Daten")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(BENCHMARK_SIZES), help="Datenbankgrößen in Preisblöcken")
+    parser.add_argument("--bom-parts", type=int, default=BENCHMARK_BOM_PARTS, help="Bauteile der Offline-BOM")
+    parser.add_argument("--online-parts", type=int, default=BENCHMARK_ONLINE_PARTS, help="Bauteile der Online-BOM")
+    parser.add_argument("--queries", type=int, default=BENCHMARK_QUERIES, help="Anzahl Einzelsuchen")
+    parser.add_argument("--latency", type=float, default=BENCHMARK_LATENCY, help="Antwortzeit des Stub-Servers (Sekunden)")
+    parser.add_argument("--repeat", type=int, default=BENCHMARK_REPEAT, help="Wiederholungen je Messung")
+    parser.add_argument("--seed", type=int, default=0, help="Startwert für die synthetischen Daten")
+    parser.add_argument("--offline", action="store_true", help="Ohne Online-Messungen")
+    parser.add_argument("--keep-rate-limits", action="store_true", help="Ratenbegrenzung der Quellen beibehalten")
+    parser.add_argument("--json", help="Ergebnisse als JSON speichern")
+    parser.add_argument("--compare", help="Mit einer früheren JSON-Ausgabe vergleichen")
+    parser.add_argument("--trace", help="Ablaufmessung aufzeichnen und im Chrome-Trace-Format speichern "
+                                        "(verfälscht die Zeiten geringfügig)")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    commit = git_revision()
+    print(f"Benchmark für Commit {commit}", flush=True)
+    if args.trace:
+        import tracing
+        tracing.enable()
+    results = run(args)
+    if args.trace:
+        print(tracing.format_summary())
+        print(f"Ablaufmessung gespeichert: {tracing.export_chrome_trace(args.trace)}")
+    if args.json:
+        report = {"commit": commit, "created": datetime.now().isoformat(timespec="seconds"),
+                  "python": sys.version.split()[0], "pandas": pd.__version__,
+                  "params": {k: v for k, v in vars(args).items() if k not in ("json", "compare", "trace")},
+                  "results": results}
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    if args.compare:
+        compare(results, args.compare)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+# Dieses Modul enthält die BOM-Preissuche ohne Abhängigkeit zur Benutzeroberfläche (genutzt von GUI und Kommandozeile).
+
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from excel_search import search_and_show, merge_results
+from bom_tools import iter_bom_parts
+import tracing
+from config import SEARCH_COLS, BOM_MAX_WORKERS, BOM_ONLINE_CHUNK
+
+@tracing.traced("price_bom")
+def price_bom(df, search_index, bomfile, use_online=False, refresh=False, cancel_event=None,
+              on_progress=None, workers=BOM_MAX_WORKERS):
+    """
+    Sucht alle Bauteile einer BOM in der Datenbank und optional online.
+    Gibt ein Dict mit 'df' (Ergebnis in BOM-Reihenfolge oder None), 'veraltet' (Zeilenindizes),
+    'parts' (Anzahl Bauteile) und 'cancelled' zurück. on_progress(done, total) meldet den Fortschritt,
+    online je fertigem Teilblock. 'workers' ist die Anzahl gleichzeitig abgefragter Teilblöcke zu je
+    BOM_ONLINE_CHUNK Teilen, nicht die Zahl paralleler Anfragen (die begrenzen die Quellen-Limits in online_sources).
+    """
+    if use_online:
+        # Online-Module (requests, bs4, ...) nur laden, wenn sie gebraucht werden
+        from online_sources import get_online_results_batch
+
+    def cancelled():
+        return cancel_event is not None and cancel_event.is_set()
+
+    def progress(done, total):
+        if on_progress:
+            on_progress(done, total)
+
+    # 1. BOM wird gestreamt gelesen: lokale Treffer sofort über den Index auflösen und
+    #    Online-Abfragen über einen begrenzten Worker-Pool starten, während die Datei noch gelesen wird
+    bauteile = []
+    db_rows_list = []
+    futures = {}
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bom") as pool:
+        def submit_chunk(chunk):
+            futures[pool.submit(tracing.bind(get_online_results_batch), chunk,
+                                cancel_event=cancel_event, refresh=refresh)] = chunk
+
+        chunk = []
+        for part in tracing.iterate("read_bom", iter_bom_parts(bomfile)):
+            if cancelled():
+                break
+            bauteile.append(part)
+            db_rows_list.append(search_and_show(df, part, SEARCH_COLS, search_index))
+            if use_online:
+                # Teile sammeln, damit Mouser und Nexar Sammelabfragen erhalten
+                chunk.append(part)
+                if len(chunk) >= BOM_ONLINE_CHUNK:
+                    submit_chunk(chunk)
+                    chunk = []
+        if chunk:
+            submit_chunk(chunk)
+        total = len(bauteile)
+
+        # 2. Online-Ergebnisse einsammeln (Limits pro Quelle in online_sources)
+        online_by_part = {}
+        done = 0
+        for future in as_completed(futures):
+            if cancelled():
+                for f in futures:
+                    f.cancel()
+                break
+            online_by_part.update(future.result())
+            done += len(futures[future])
+            progress(done, total)
+        online_list = [online_by_part.get(part, []) for part in bauteile]
+
+    result = {"df": None, "veraltet": [], "parts": total, "cancelled": cancelled()}
+    if result["cancelled"] or total == 0:
+        return result
+
+    # 3. Ergebnisse in BOM-Reihenfolge zusammensetzen, Offset wird mitgeführt
+    all_results = []
+    offset = 0
+    for idx, (db_rows, online_res) in enumerate(zip(db_rows_list, online_list)):
+        merged, veraltet = merge_results(db_rows, online_res)
+        if merged is not None:
+            all_results.append(merged)
+            result["veraltet"].extend([i + offset for i in veraltet])
+            offset += len(merged)
+        if not use_online:
+            progress(idx + 1, total)
+
+    if all_results:
+        result["df"] = pd.concat(all_results, ignore_index=True).fillna('')
+    return result
@@ -1,5 +1,6 @@
 # Dieses Modul enthält Funktionen zum Lesen und Verarbeiten von Stücklistendateien (BOMs).
 
+import csv
 import pandas as pd
 
 def read_bom(bomfile, header=6):
@@ -11,6 +12,84 @@ def read_bom(bomfile, header=6):
         raise Exception("Nur Excel oder CSV unterstützt.")
     return bom_df
 
+def _sniff_delimiter(bomfile, header, sample_size=64 * 1024):
+    """
+    Ermittelt das Trennzeichen anhand eines kleinen Ausschnitts der CSV-Datei ab der Kopfzeile.
+    Die Zeilen davor (Vorspann) haben oft eine andere Spaltenzahl und bleiben außen vor.
+    """
+    delimiters = ";,\t|"
+    with open(bomfile, "r", encoding="utf-8", errors="replace", newline="") as f:
+        # Wie pandas (skip_blank_lines) zählen Leerzeilen nicht mit
+        skipped = 0
+        while skipped < header:
+            line = f.readline()
+            if not line:
+                break
+            if line.strip():
+                skipped += 1
+        sample = f.read(sample_size)
+    # Nur vollständige Zeilen, sonst zählt die abgeschnittene letzte Zeile mit
+    if len(sample) == sample_size and "\n" in sample:
+        sample = sample[:sample.rindex("\n") + 1]
+    try:
+        return csv.Sniffer().sniff(sample, delimiters=delimiters).delimiter
+    except csv.Error:
+        # Einspaltige Datei: das Trennzeichen spielt keine Rolle. Sonst nicht raten, ganze Zeilen wären sonst "Artikelnummern"
+        if not any(d in sample for d in delimiters):
+            return ","
+        raise Exception("Trennzeichen der CSV-Datei nicht erkannt (Kopfzeile und Daten uneinheitlich).")
+
+def _iter_csv_column(bomfile, header, chunksize):
+    sep = _sniff_delimiter(bomfile, header)
+    columns = pd.read_csv(bomfile, sep=sep, header=header, nrows=0).columns
+    _, art_col = detect_both_part_columns(pd.DataFrame(columns=columns))
+    # Schneller C-Parser, nur die Artikelspalte, blockweise
+    reader = pd.read_csv(bomfile, sep=sep, header=header, usecols=[art_col], dtype=str, chunksize=chunksize)
+    for chunk in reader:
+        yield from chunk[art_col].dropna()
+
+def _iter_xlsx_column(bomfile, header):
+    from openpyxl import load_workbook
+    wb = load_workbook(bomfile, read_only=True, data_only=True)
+    try:
+        # Wie pd.read_excel das erste Blatt lesen, nicht das zuletzt in Excel ausgewählte (wb.active)
+        rows = wb.worksheets[0].iter_rows(min_row=header + 1, values_only=True)
+        columns = next(rows, None)
+        if columns is None:
+            return
+        columns = [c if c is not None else f"Unnamed: {i}" for i, c in enumerate(columns)]
+        _, art_col = detect_both_part_columns(pd.DataFrame(columns=columns))
+        col_idx = columns.index(art_col)
+        for row in rows:
+            if col_idx < len(row) and row[col_idx] is not None:
+                yield row[col_idx]
+    finally:
+        wb.close()
+
+def iter_bom_parts(bomfile, header=6, chunksize=10000):
+    """
+    Liest die Artikelnummern einer BOM als Generator, ohne die ganze Datei in den Speicher zu laden.
+    Liefert jede Nummer (bereinigt, ohne 'SPLICE') nur einmal, in der Reihenfolge der Datei.
+    """
+    name = bomfile.lower()
+    if name.endswith(".csv"):
+        values = _iter_csv_column(bomfile, header, chunksize)
+    elif name.endswith(".xlsx"):
+        values = _iter_xlsx_column(bomfile, header)
+    elif name.endswith(".xls"):
+        bom_df = read_bom(bomfile, header=header)
+        _, art_col = detect_both_part_columns(bom_df)
+        values = bom_df[art_col].dropna()
+    else:
+        raise Exception("Nur Excel oder CSV unterstützt.")
+    seen = set()
+    for value in values:
+        part = str(value).strip()
+        if not part or part.upper() == "SPLICE" or part in seen:
+            continue
+        seen.add(part)
+        yield part
+
 def detect_both_part_columns(bom_df):
     columns = [str(c).strip().replace("\n", "").replace("\r", "").replace(" ", "").lower() for c in bom_df.columns]
     sap_patterns = ["saparticleno", "wn_sap-articleno", "sap", "material", "artikel"]
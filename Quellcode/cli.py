@@ -0,0 +1,80 @@
+# Kommandozeilen-Einstiegspunkt für den Betrieb ohne Benutzeroberfläche (z. B. nächtliche BOM-Kalkulation auf einem Server).
+# Beispiel: python -m cli price-bom bom.xlsx --online --out ergebnis.xlsx --workers 8 [--trace ablauf.json]
+
+import argparse
+import os
+import sys
+import time
+from dotenv import load_dotenv
+
+# Umgebungsvariablen (API-Keys) wie in main.py vor den Quellmodulen laden
+load_dotenv(dotenv_path=os.path.join("venv", ".env"))
+
+from data_manager import load_db
+from excel_search import build_search_index, format_price_blocks
+from bom_service import price_bom
+import http_client
+import tracing
+from supplier_guard import format_breaker_status
+from config import SEARCH_COLS, BOM_MAX_WORKERS, BOM_ONLINE_CHUNK
+
+def _print_progress(done, total):
+    print(f"Fortschritt: {done}/{total}", flush=True)
+
+def cmd_price_bom(args):
+    start = time.perf_counter()
+    if args.trace:
+        tracing.enable()
+    df = load_db()
+    if df is None or any(col not in df.columns for col in SEARCH_COLS):
+        print("Keine gültige Datenbank gefunden. Bitte zuerst über die GUI eine Datenbank laden.", file=sys.stderr)
+        return 2
+    index = build_search_index(df, SEARCH_COLS)
+    print(f"Datenbank geladen: {len(df)} Zeilen, {len(index)} Suchschlüssel", flush=True)
+
+    result = price_bom(df, index, args.bomfile, use_online=args.online, refresh=args.refresh,
+                       on_progress=_print_progress, workers=args.workers)
+    if result["df"] is None:
+        print(f"Keine Ergebnisse für BOM gefunden ({result['parts']} Bauteile).", file=sys.stderr)
+        return 1
+
+    final_df = format_price_blocks(result["df"])
+    if args.out.lower().endswith(".csv"):
+        final_df.to_csv(args.out, index=False, sep=";")
+    else:
+        final_df.to_excel(args.out, index=False)
+    print(f"{result['parts']} Bauteile, {len(final_df)} Zeilen, davon {len(result['veraltet'])} veraltet "
+          f"-> {args.out} ({time.perf_counter() - start:.1f} s)")
+    if args.online:
+        print(http_client.format_stats())
+        breakers = format_breaker_status()
+        if breakers:
+            print(breakers)
+    if args.trace:
+        print(tracing.format_summary())
+        print(f"Ablaufmessung gespeichert: {tracing.export(args.trace, args.trace_format)}")
+    return 0
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cli", description="Preisrecherche ohne Benutzeroberfläche")
+    sub = parser.add_subparsers(dest="command", required=True)
+    bom = sub.add_parser("price-bom", help="Alle Bauteile einer BOM suchen und das Ergebnis speichern")
+    bom.add_argument("bomfile", help="BOM als .xlsx/.xls/.csv")
+    bom.add_argument("--out", default="bom_ergebnis.xlsx", help="Ausgabedatei (.xlsx oder .csv)")
+    bom.add_argument("--online", action="store_true", help="Online-Quellen abfragen")
+    bom.add_argument("--refresh", action="store_true", help="Preis-Cache umgehen")
+    bom.add_argument("--workers", type=int, default=BOM_MAX_WORKERS,
+                     help=f"Gleichzeitig abgefragte Teilblöcke zu je {BOM_ONLINE_CHUNK} Bauteilen "
+                          f"(wirkt erst ab mehr als {BOM_ONLINE_CHUNK} Bauteilen; Fortschritt je Teilblock)")
+    bom.add_argument("--trace", help="Ablaufmessung aufzeichnen und in diese Datei schreiben")
+    bom.add_argument("--trace-format", choices=("chrome", "json"), default="chrome",
+                     help="Format der Ablaufmessung (chrome://tracing bzw. eigenes JSON)")
+    bom.set_defaults(func=cmd_price_bom)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
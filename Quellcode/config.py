@@ -6,6 +6,19 @@ import os
 # Dateiname für den JSON-Cache
 DB_JSON_FILE = "database.json"
 
+# Protokoll der Änderungen beim inkrementellen Datenbank-Abgleich
+DB_CHANGELOG_FILE = "db_changes.log"
+
+# Dateiname für den spaltenorientierten Binär-Cache (Feather, benötigt pyarrow)
+DB_FEATHER_FILE = "database.feather"
+
+# Aufbau eines Preisblocks: jeder Datensatz belegt BLOCK_SIZE Zeilen, BLOCK_ROWS gibt an, welche Zeile was enthält
+BLOCK_SIZE = 4
+BLOCK_ROWS = {"Datum": 0, "Preis": 1, "Losgröße": 2, "Quelle": 3}
+
+# Preise, deren Datum älter als diese Anzahl Tage ist, werden als veraltet markiert
+STALE_AFTER_DAYS = 365
+
 # Spalten, die für die Suche in der Datenbank verwendet werden
 SEARCH_COLS = ["WN_SAP-Artikel-NR", "WN_HerstellerBestellnummer_1"]
 
@@ -19,4 +32,115 @@ HIDE_COLS = ["ENTRY", "Description_deutsch_2"]
 EXCEL_SHEET_NAME = "DB_4erDS"
 
 # Passwort für den Blattschutz in Excel
-EXCEL_SHEET_PASSWORD = os.getenv("EXCEL_PASSWORD")
\ No newline at end of file
+EXCEL_SHEET_PASSWORD = os.getenv("EXCEL_PASSWORD")
+
+# Maximale Gesamtdauer (Sekunden) einer Online-Preisabfrage über alle Quellen
+ONLINE_LOOKUP_DEADLINE = 12
+# Bei Sammelabfragen (BOM) verlängert sich die Deadline um so viele Sekunden pro Teil
+ONLINE_BATCH_DEADLINE_PER_PART = 2
+
+# Maximale Anzahl gleichzeitiger Anfragen pro Online-Quelle
+SUPPLIER_MAX_CONCURRENCY = {
+    "Automotive-Connectors": 2,
+    "Mouser": 4,
+    "Octopart": 4,
+}
+
+# Anzahl paralleler Threads für Online-Abfragen (Summe der Quellen-Limits)
+ONLINE_MAX_WORKERS = sum(SUPPLIER_MAX_CONCURRENCY.values())
+
+# Anzahl der BOM-Teilblöcke (je BOM_ONLINE_CHUNK Teile), deren Online-Abfrage gleichzeitig läuft.
+# Bei BOMs bis BOM_ONLINE_CHUNK Teilen gibt es nur einen Block; die Anfragen je Quelle begrenzt SUPPLIER_MAX_CONCURRENCY
+BOM_MAX_WORKERS = 4
+
+# Lokaler Cache für Online-Preise (SQLite, liegt neben der database.json)
+PRICE_CACHE_FILE = "price_cache.sqlite"
+
+# Gültigkeitsdauer (Sekunden) gefundener Preise pro Quelle
+PRICE_CACHE_TTL = {
+    "Automotive-Connectors": 24 * 3600,
+    "Mouser": 24 * 3600,
+    "Octopart": 24 * 3600,
+}
+
+# Gültigkeitsdauer (Sekunden) für "nicht gefunden"-Einträge
+PRICE_CACHE_NEGATIVE_TTL = 3600
+
+# Maximale Anzahl an Cache-Einträgen, danach werden die am längsten nicht genutzten gelöscht
+PRICE_CACHE_MAX_ENTRIES = 20000
+# Die Größe wird beim Öffnen und nach jeweils so vielen neuen Einträgen geprüft (bis dahin darf sie darüber liegen)
+PRICE_CACHE_PRUNE_INTERVAL = 500
+
+# Anzahl der Tabellenzeilen, die auf einmal in die Ergebnisansicht eingefügt werden
+TABLE_PAGE_SIZE = 200
+
+# HTTP-Verbindungen: Anzahl Hosts mit eigenem Pool, Verbindungen pro Host, Wiederholungen bei 429/5xx
+HTTP_POOL_CONNECTIONS = 10
+HTTP_POOL_MAXSIZE = 10
+HTTP_RETRIES = 2
+HTTP_BACKOFF = 0.5
+HTTP_TIMEOUT = 10
+# POST-Suchanfragen (Mouser, Nexar) werden nur bei diesen Statuscodes und mit Retry-After wiederholt
+HTTP_POST_RETRY_STATUS = (429, 503)
+
+# Anzahl Teile pro Sammelanfrage (Mouser erlaubt bis zu 10 Teilenummern pro Suche)
+MOUSER_BATCH_SIZE = 10
+NEXAR_BATCH_SIZE = 20
+
+# Anzahl BOM-Teile, die gemeinsam als Sammelabfrage an die Online-Quellen gehen
+BOM_ONLINE_CHUNK = 50
+
+# Wechselkurse: Quelle, lokale Datei mit dem letzten gültigen Stand, Abrufintervall und Alter, ab dem ein Kurs als veraltet gilt (Sekunden)
+EXCHANGE_RATE_URL = "https://api.exchangerate.host/latest?base=EUR"
+EXCHANGE_RATE_FILE = "exchange_rates.json"
+EXCHANGE_RATE_REFRESH = 6 * 3600
+EXCHANGE_RATE_MAX_AGE = 3 * 24 * 3600
+# Nach einem fehlgeschlagenen Abruf erst nach dieser Zeit (Sekunden) erneut versuchen
+EXCHANGE_RATE_RETRY_AFTER_FAILURE = 300
+
+# Hosts der Online-Quellen (für Ratenbegrenzung und Schutzschalter)
+SUPPLIER_HOSTS = {
+    "Automotive-Connectors": "www.automotive-connectors.com",
+    "Mouser": "api.mouser.com",
+    "Octopart": "api.nexar.com",
+}
+
+# Ratenbegrenzung pro Quelle: (Anfragen pro Sekunde, maximale Anzahl auf einmal)
+SUPPLIER_RATE_LIMITS = {
+    "Automotive-Connectors": (1.0, 2),
+    "Mouser": (5.0, 5),
+    "Octopart": (5.0, 5),
+}
+
+# Schutzschalter: nach so vielen Fehlern in Folge wird die Quelle für die Abkühlzeit (Sekunden) übersprungen
+CIRCUIT_BREAKER_THRESHOLD = 5
+CIRCUIT_BREAKER_COOLDOWN = 60
+# Aktualisierungsintervall der Schutzschalter-Anzeige in der Statusleiste (Millisekunden)
+SUPPLIER_STATUS_INTERVAL_MS = 2000
+
+# Unscharfe Suche: Mindestähnlichkeit (0..1) und Anzahl Vorschläge / Kandidaten
+FUZZY_MIN_SCORE = 0.5
+FUZZY_MAX_RESULTS = 10
+# Trigramme mit mehr Einträgen (z. B. "100" in fast jeder SAP-Nummer) liefern keine Kandidaten für die unscharfe Suche
+FUZZY_MAX_POSTINGS = 5000
+# Je Vorschlag genau bewertete Kandidaten (die mit den meisten gemeinsamen Trigrammen)
+FUZZY_CANDIDATE_FACTOR = 20
+# Verzögerung der Vorschläge beim Tippen (Millisekunden)
+TYPEAHEAD_DELAY_MS = 150
+
+# Maximale Anzahl zwischengespeicherter Formatierungen einzelner Werte (Datum/Preis)
+FORMAT_CACHE_SIZE = 4096
+
+# Benchmark (python benchmark.py): Datenbankgrößen in Preisblöcken, BOM-Umfang und Antwortzeit des lokalen Stub-Servers
+BENCHMARK_SIZES = (1000, 10000, 100000)
+BENCHMARK_BOM_PARTS = 500
+BENCHMARK_QUERIES = 500
+BENCHMARK_LATENCY = 0.05
+BENCHMARK_ONLINE_PARTS = 100
+BENCHMARK_REPEAT = 3
+
+# Ablaufmessung (python main.py --trace): Größe des Ringpuffers in Ereignissen, Anzahl Schritte in der Statusleiste
+# und Zieldatei für den Export beim Schließen des Fensters (Chrome-Trace-Format)
+TRACE_BUFFER_SIZE = 20000
+TRACE_SUMMARY_TOP = 5
+TRACE_FILE = "preis_trace.json"
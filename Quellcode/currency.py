@@ -0,0 +1,93 @@
+# Dieses Modul stellt Wechselkurse bereit. Kurse werden höchstens einmal pro Intervall abgerufen und lokal gespeichert.
+
+import json
+import os
+import threading
+import time
+import http_client
+from config import (EXCHANGE_RATE_URL, EXCHANGE_RATE_FILE, EXCHANGE_RATE_REFRESH, EXCHANGE_RATE_MAX_AGE,
+                    EXCHANGE_RATE_RETRY_AFTER_FAILURE)
+
+# Notfallwerte (Fremdwährung -> EUR), falls weder Abruf noch gespeicherter Kurs verfügbar ist
+FALLBACK_TO_EUR = {"USD": 0.92}
+
+_lock = threading.Lock()
+_rates = None          # {"rates": {Währung: Kurs zur Basis EUR}, "fetched_at": Zeitstempel}
+_last_attempt = 0.0
+
+def _load_rates():
+    if not os.path.exists(EXCHANGE_RATE_FILE):
+        return None
+    try:
+        with open(EXCHANGE_RATE_FILE, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data if data.get("rates") and data.get("fetched_at") else None
+    except (OSError, ValueError) as e:
+        print(f"Fehler beim Laden der Wechselkurse: {e}")
+        return None
+
+def _save_rates(data):
+    try:
+        with open(EXCHANGE_RATE_FILE, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+    except OSError as e:
+        print(f"Fehler beim Speichern der Wechselkurse: {e}")
+
+def _fetch_rates():
+    response = http_client.get(EXCHANGE_RATE_URL, timeout=5)
+    response.raise_for_status()
+    rates = response.json()["rates"]
+    rates["EUR"] = 1.0
+    return {"rates": rates, "fetched_at": time.time()}
+
+def _current_rates():
+    global _rates, _last_attempt
+    with _lock:
+        if _rates is None:
+            _rates = _load_rates()
+        now = time.time()
+        outdated = _rates is None or now - _rates["fetched_at"] > EXCHANGE_RATE_REFRESH
+        if not outdated or now - _last_attempt <= EXCHANGE_RATE_RETRY_AFTER_FAILURE:
+            return _rates
+        # Nur dieser Thread ruft ab; andere rechnen währenddessen mit dem bisherigen Stand (bzw. dem Notfallwert)
+        _last_attempt = now
+        current = _rates
+    try:
+        fresh = _fetch_rates()
+    except Exception as e:
+        print(f"Konnte Wechselkurs nicht abrufen: {e}")
+        return current
+    _save_rates(fresh)
+    with _lock:
+        _rates = fresh
+    return fresh
+
+def get_rate(currency, target="EUR"):
+    """
+    Gibt (Kurs, Alter in Sekunden) für die Umrechnung currency -> target zurück.
+    Alter ist None, wenn nur ein Notfallwert verfügbar ist; Kurs ist None, wenn die Währung unbekannt ist.
+    """
+    if currency == target:
+        return 1.0, 0.0
+    data = _current_rates()
+    if data is not None:
+        rates = data["rates"]
+        if currency in rates and target in rates and rates[currency]:
+            return rates[target] / rates[currency], time.time() - data["fetched_at"]
+    if target == "EUR" and currency in FALLBACK_TO_EUR:
+        return FALLBACK_TO_EUR[currency], None
+    return None, None
+
+def is_stale(age):
+    return age is None or age > EXCHANGE_RATE_MAX_AGE
+
+def result_rate_stale(result):
+    """
+    Prüft beim Lesen, ob ein (evtl. aus dem Preis-Cache stammendes) Online-Ergebnis mit einem inzwischen
+    veralteten Kurs umgerechnet wurde. 'Kurs_Stand' ist der Zeitpunkt des verwendeten Kurses (None = Notfallwert).
+    """
+    if "Kurs_Stand" not in result:
+        # Ergebnis ohne Umrechnung
+        return False
+    stand = result["Kurs_Stand"]
+    return is_stale(None if stand is None else time.time() - stand)
@@ -1,9 +1,56 @@
-# Dieses Modul verwaltet das Laden und Speichern des lokalen Daten-Caches (database.json).
+# Dieses Modul verwaltet das Laden und Speichern des lokalen Daten-Caches (database.feather bzw. database.json).
 
 import os
+import json
+import time
+import numpy as np
 import pandas as pd
 from datetime import datetime
-from config import DB_JSON_FILE
+from config import DB_JSON_FILE, DB_FEATHER_FILE, BLOCK_SIZE, BLOCK_ROWS
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # pyarrow ist optional, ohne wird weiter JSON verwendet
+    pa = None
+    feather = None
+
+# Typ-Kennungen für gemischte Spalten (z.B. 4er-Preisblöcke mit Datum, Preis, Losgröße und Quelle)
+_KIND_NONE, _KIND_FLOAT, _KIND_INT, _KIND_STR, _KIND_TS, _KIND_BOOL = range(6)
+_META_KEY = b"preis_db"
+# Größter als Timestamp darstellbarer Wert in Millisekunden; größere Zahlen bleiben wie bisher unverändert
+_MAX_TS_MS = pd.Timestamp.max.value // 10**6
+
+def _restore_block_dates(df):
+    """
+    Wandelt in den Datumszeilen der Preisblöcke als Millisekunden gespeicherte Timestamps
+    spaltenweise in Datums-Objekte um (statt Zelle für Zelle über df.iloc).
+    """
+    positions = np.arange(BLOCK_ROWS["Datum"], len(df), BLOCK_SIZE)
+    if len(positions) == 0:
+        return df
+    for j, col in enumerate(df.columns):
+        series = df.iloc[:, j]
+        if pd.api.types.is_bool_dtype(series.dtype):
+            continue
+        values = series.to_numpy(dtype=object)[positions]
+        if pd.api.types.is_numeric_dtype(series.dtype):
+            is_num = np.ones(len(values), dtype=bool)
+        else:
+            is_num = np.fromiter(
+                (isinstance(v, (int, float)) and not isinstance(v, bool) for v in values),
+                dtype=bool, count=len(values)
+            )
+        numbers = np.zeros(len(values))
+        numbers[is_num] = values[is_num].astype(float)
+        mask = is_num & (numbers > 1e12) & (numbers <= _MAX_TS_MS)
+        if not mask.any():
+            continue
+        if series.dtype != object:
+            df[col] = series.astype(object)
+        converted = pd.to_datetime(numbers[mask], unit="ms", errors="coerce")
+        df.iloc[positions[mask], j] = np.array(list(converted), dtype=object)
+    return df
 
 def load_db_from_json():
     if not os.path.exists(DB_JSON_FILE):
@@ -11,23 +58,170 @@ def load_db_from_json():
     try:
         df = pd.read_json(DB_JSON_FILE, orient="split")
         # Konvertiert Timestamps, die als Zahlen gespeichert wurden, zurück in Datums-Objekte
-        block_size = 4
-        for col in df.columns:
-            for i in range(0, len(df), block_size):
-                val = df.iloc[i][col]
-                if isinstance(val, (int, float)) and not isinstance(val, bool) and val > 1e12:
-                    try:
-                        df.iloc[i, df.columns.get_loc(col)] = pd.to_datetime(val, unit='ms')
-                    except Exception:
-                        pass
-        return df
+        return _restore_block_dates(df)
     except Exception as e:
         print(f"Fehler beim Laden von JSON: {e}")
         return None
 
+def _write_replacing(path, write):
+    """
+    Schreibt über eine temporäre Datei und ersetzt das Ziel erst danach (os.replace), damit bei einem Fehler
+    die bisherige Datei erhalten bleibt. Fehler werden an den Aufrufer weitergegeben.
+    """
+    tmp = f"{path}.tmp"
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    except Exception:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    print(f"Datenbank gespeichert unter: {os.path.abspath(path)}")
+
 def save_db_to_json(df):
+    _write_replacing(DB_JSON_FILE, lambda path: df.to_json(path, orient="split", force_ascii=False))
+
+def _encode_object_column(values):
+    """Zerlegt eine gemischte Spalte verlustfrei in eine Typ-Spalte und typisierte Wert-Spalten."""
+    n = len(values)
+    kind = np.zeros(n, dtype=np.int8)
+    num = np.full(n, np.nan)
+    ints = np.zeros(n, dtype=np.int64)
+    ts = np.full(n, np.datetime64("NaT", "ms"))
+    strs = [None] * n
+    for i, v in enumerate(values):
+        if v is None:
+            continue
+        if isinstance(v, (bool, np.bool_)):
+            kind[i] = _KIND_BOOL
+            ints[i] = int(v)
+        elif isinstance(v, (int, np.integer)):
+            kind[i] = _KIND_INT
+            ints[i] = v
+        elif isinstance(v, (float, np.floating)):
+            kind[i] = _KIND_FLOAT
+            num[i] = v
+        elif isinstance(v, (pd.Timestamp, datetime)):
+            kind[i] = _KIND_TS
+            ts[i] = np.datetime64(pd.Timestamp(v).as_unit("ms"))
+        else:
+            kind[i] = _KIND_STR
+            strs[i] = str(v)
+    columns = {"kind": kind}
+    if (kind == _KIND_FLOAT).any():
+        columns["num"] = num
+    if ((kind == _KIND_INT) | (kind == _KIND_BOOL)).any():
+        columns["int"] = ints
+    if (kind == _KIND_TS).any():
+        columns["ts"] = ts
+    if (kind == _KIND_STR).any():
+        columns["str"] = pa.array(strs, type=pa.string())
+    return columns
+
+def _decode_object_column(parts):
+    kind = parts["kind"]
+    values = np.full(len(kind), None, dtype=object)
+    if "num" in parts:
+        mask = kind == _KIND_FLOAT
+        values[mask] = parts["num"][mask]
+    if "int" in parts:
+        mask = kind == _KIND_INT
+        values[mask] = parts["int"][mask]
+        mask = kind == _KIND_BOOL
+        values[mask] = parts["int"][mask].astype(bool)
+    if "ts" in parts:
+        mask = kind == _KIND_TS
+        values[mask] = np.array(list(pd.DatetimeIndex(parts["ts"][mask])), dtype=object)
+    if "str" in parts:
+        mask = kind == _KIND_STR
+        values[mask] = parts["str"][mask]
+    return values
+
+def save_db_to_feather(df):
+    """Speichert die Datenbank spaltenorientiert (Feather, unkomprimiert). Fehler werden an den Aufrufer weitergegeben."""
+    if pa is None:
+        save_db_to_json(df)
+        return
+    arrays, names, encoded = [], [], []
+    for i, col in enumerate(df.columns):
+        series = df.iloc[:, i]
+        if series.dtype == object:
+            # Gemischte Spalten werden in typisierte Teil-Spalten zerlegt
+            encoded.append(str(col))
+            for part, arr in _encode_object_column(series.tolist()).items():
+                names.append(f"{col}::{part}")
+                arrays.append(pa.array(arr) if not isinstance(arr, pa.Array) else arr)
+        else:
+            names.append(str(col))
+            arrays.append(pa.Array.from_pandas(series))
+    meta = {"columns": [str(c) for c in df.columns], "encoded": encoded}
+    table = pa.Table.from_arrays(arrays, names=names).replace_schema_metadata({_META_KEY: json.dumps(meta)})
+    _write_replacing(DB_FEATHER_FILE, lambda path: feather.write_feather(table, path, compression="uncompressed"))
+
+def load_db_from_feather():
+    if pa is None or not os.path.exists(DB_FEATHER_FILE):
+        return None
     try:
-        df.to_json(DB_JSON_FILE, orient="split", force_ascii=False)
-        print(f"Datenbank gespeichert unter: {os.path.abspath(DB_JSON_FILE)}")
+        # Ohne Memory-Mapping: der geladene DataFrame darf nicht auf die Datei verweisen, sonst kann sie beim
+        # Speichern nicht ersetzt werden (Windows) bzw. ein Überschreiben beschädigt die Daten (Linux).
+        # Der Geschwindigkeitsunterschied ist gering, die meiste Zeit kostet das Dekodieren der gemischten Spalten.
+        table = feather.read_table(DB_FEATHER_FILE, memory_map=False)
+        meta = json.loads(table.schema.metadata[_META_KEY])
+        encoded = set(meta["encoded"])
+        data = {}
+        for col in meta["columns"]:
+            if col in encoded:
+                parts = {}
+                for part in ("kind", "num", "int", "ts", "str"):
+                    name = f"{col}::{part}"
+                    if name in table.column_names:
+                        chunked = table.column(name)
+                        parts[part] = chunked.to_numpy(zero_copy_only=False) if part != "str" else \
+                            np.array(chunked.to_pylist(), dtype=object)
+                data[col] = _decode_object_column(parts)
+            else:
+                data[col] = table.column(col).to_pandas()
+        return pd.DataFrame(data, columns=meta["columns"])
     except Exception as e:
-        print(f"Fehler beim Speichern zu JSON: {e}")
\ No newline at end of file
+        print(f"Fehler beim Laden von Feather: {e}")
+        return None
+
+def load_db():
+    """Lädt die Datenbank, bevorzugt aus dem Binär-Cache. Eine vorhandene JSON wird einmalig migriert."""
+    df = load_db_from_feather()
+    if df is not None:
+        return df
+    df = load_db_from_json()
+    if df is not None and pa is not None:
+        print("Migriere database.json in das Feather-Format...")
+        try:
+            save_db_to_feather(df)
+        except Exception as e:
+            # Die JSON bleibt gültig, die Migration wird beim nächsten Start erneut versucht
+            print(f"Fehler beim Speichern zu Feather: {e}")
+    return df
+
+def save_db(df):
+    if pa is not None:
+        save_db_to_feather(df)
+    else:
+        save_db_to_json(df)
+
+def benchmark_load(repeat=3):
+    """Vergleicht die Ladezeit von JSON und Feather (Kaltstart ohne Zwischenspeicher im Prozess)."""
+    results = {}
+    for name, loader in (("json", load_db_from_json), ("feather", load_db_from_feather)):
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            df = loader()
+            times.append(time.perf_counter() - start)
+        if df is not None:
+            results[name] = min(times)
+            print(f"{name:8s}: {min(times) * 1000:8.1f} ms ({len(df)} Zeilen)")
+    return results
+
+if __name__ == "__main__":
+    if not os.path.exists(DB_FEATHER_FILE):
+        save_db_to_feather(load_db_from_json())
+    benchmark_load()
@@ -0,0 +1,136 @@
+# Dieses Modul gleicht eine neu eingelesene Excel-Datenbank blockweise mit der vorhandenen ab und übernimmt nur die Änderungen.
+
+import json
+import numpy as np
+import pandas as pd
+from datetime import date, datetime
+from excel_search import _norm_sapnr, _norm_bestellnr
+from utils import sapnr_to_str
+from config import BLOCK_SIZE, DB_CHANGELOG_FILE
+
+def block_keys(df):
+    """Schlüssel je 4er-Block: (SAP-Nummer, Bestellnummer, laufende Nr. bei Duplikaten)."""
+    starts = np.arange(0, len(df), BLOCK_SIZE)
+    sap = df["WN_SAP-Artikel-NR"].to_numpy(dtype=object)[starts]
+    bestell = df["WN_HerstellerBestellnummer_1"].to_numpy(dtype=object)[starts]
+    keys, seen = [], {}
+    for s, b in zip(sap, bestell):
+        base = (_norm_sapnr(s) or str(s).strip(), _norm_bestellnr(b))
+        n = seen.get(base, 0)
+        seen[base] = n + 1
+        keys.append(base + (n,))
+    return keys
+
+def _canonical(value):
+    """
+    Einheitliche Textform einer Zelle für den Vergleich: Excel liefert z.B. 1000 als int, die gespeicherte
+    Datenbank als 1000.0 oder Datumswerte als datetime statt Timestamp. Solche Typunterschiede sind keine Änderung.
+    """
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, (datetime, date, np.datetime64)):
+        return pd.Timestamp(value).isoformat()
+    if isinstance(value, (int, np.integer)):
+        return str(int(value))
+    if isinstance(value, (float, np.floating)):
+        if value != value:
+            return ""
+        return str(int(value)) if float(value).is_integer() else repr(float(value))
+    return str(value)
+
+def _canonical_column(values, convert=_canonical):
+    # Jeder unterschiedliche Wert wird nur einmal umgewandelt; fehlende Werte (Code -1) werden zum Leerstring
+    codes, uniques = pd.factorize(values)
+    canon = np.array([convert(v) for v in uniques] + [""], dtype=object)
+    return canon[codes]
+
+def block_hashes(df):
+    """Ein Hash-Tupel pro Block über die einheitliche Textform aller Zellen (siehe _canonical)."""
+    canon = pd.DataFrame({
+        j: _canonical_column(df.iloc[:, j].to_numpy(dtype=object),
+                             sapnr_to_str if col == "WN_SAP-Artikel-NR" else _canonical)
+        for j, col in enumerate(df.columns)
+    })
+    row_hashes = pd.util.hash_pandas_object(canon, index=False).to_numpy()
+    return list(map(tuple, row_hashes.reshape(-1, BLOCK_SIZE)))
+
+def diff_db(old_df, new_df):
+    """
+    Vergleicht zwei Datenbanken blockweise. Gibt None zurück, wenn kein blockweiser Abgleich
+    möglich ist (z.B. geänderte Spalten), sonst ein Dict mit eingefügten und gelöschten Blöcken
+    (Schlüssel -> Blocknummer) sowie geänderten und unveränderten Blöcken (Schlüssel -> (alte, neue Blocknummer)).
+    """
+    if old_df is None or list(old_df.columns) != list(new_df.columns):
+        return None
+    if len(old_df) % BLOCK_SIZE or len(new_df) % BLOCK_SIZE:
+        return None
+    old_blocks = dict(zip(block_keys(old_df), zip(range(len(old_df) // BLOCK_SIZE), block_hashes(old_df))))
+    new_blocks = dict(zip(block_keys(new_df), zip(range(len(new_df) // BLOCK_SIZE), block_hashes(new_df))))
+    return {
+        "inserted": {k: b for k, (b, _) in new_blocks.items() if k not in old_blocks},
+        "deleted": {k: b for k, (b, _) in old_blocks.items() if k not in new_blocks},
+        "changed": {k: (old_blocks[k][0], b) for k, (b, h) in new_blocks.items()
+                    if k in old_blocks and old_blocks[k][1] != h},
+        "unchanged": {k: (old_blocks[k][0], b) for k, (b, h) in new_blocks.items()
+                      if k in old_blocks and old_blocks[k][1] == h},
+    }
+
+def is_reordered(diff):
+    """True, wenn ein übernommener Block in der neuen Datei an anderer Position steht."""
+    return any(old_b != new_b for kind in ("changed", "unchanged") for old_b, new_b in diff[kind].values())
+
+def has_changes(diff):
+    return diff is None or any(diff[kind] for kind in ("inserted", "changed", "deleted")) or is_reordered(diff)
+
+def positions_kept(diff):
+    """True, wenn alle bisherigen Blöcke an ihrer Position bleiben (nichts gelöscht, nichts verschoben, neue nur hinten)."""
+    return diff is not None and not diff["deleted"] and not is_reordered(diff)
+
+def apply_diff(old_df, new_df, diff):
+    """
+    Übernimmt nur die geänderten Blöcke: Das Ergebnis hat die Blockreihenfolge der neuen Datei, unveränderte
+    Blöcke werden aus der bisherigen Datenbank übernommen, geänderte und neue aus der neuen Datei.
+    """
+    if not has_changes(diff):
+        return old_df
+    offset = len(old_df)
+    source = {new_b: offset + new_b * BLOCK_SIZE for new_b in diff["inserted"].values()}
+    source.update((new_b, offset + new_b * BLOCK_SIZE) for _, new_b in diff["changed"].values())
+    source.update((new_b, old_b * BLOCK_SIZE) for old_b, new_b in diff["unchanged"].values())
+    take = np.concatenate([np.arange(BLOCK_SIZE) + source[b] for b in range(len(new_df) // BLOCK_SIZE)]) \
+        if len(new_df) else np.array([], dtype=int)
+    combined = pd.concat([old_df, new_df], ignore_index=True)
+    return combined.iloc[take].reset_index(drop=True)
+
+def changed_positions(diff):
+    """
+    Startzeilen der ersetzten und neuen Blöcke im Ergebnis von apply_diff. Für eine schrittweise
+    Aktualisierung des Suchindex nur sinnvoll, wenn positions_kept(diff) gilt.
+    """
+    replaced = sorted(new_b * BLOCK_SIZE for _, new_b in diff["changed"].values())
+    appended = sorted(b * BLOCK_SIZE for b in diff["inserted"].values())
+    return replaced, appended
+
+def write_changelog(diff, source_file):
+    """Hängt eine Zusammenfassung des Abgleichs an das Änderungsprotokoll an."""
+    entry = {
+        "zeit": datetime.now().isoformat(timespec="seconds"),
+        "datei": str(source_file),
+        "vollstaendig_ersetzt": diff is None,
+    }
+    if diff is not None:
+        for kind in ("inserted", "changed", "deleted"):
+            entry[kind] = [list(k[:2]) for k in diff[kind]]
+        entry["reihenfolge_geaendert"] = is_reordered(diff)
+    try:
+        with open(DB_CHANGELOG_FILE, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    except OSError as e:
+        print(f"Fehler beim Schreiben des Änderungsprotokolls: {e}")
+
+def format_diff_summary(diff):
+    if diff is None:
+        return "Datenbank vollständig ersetzt."
+    text = (f"{len(diff['inserted'])} neu, {len(diff['changed'])} geändert, "
+            f"{len(diff['deleted'])} gelöscht.")
+    return text + " Reihenfolge angepasst." if is_reordered(diff) else text
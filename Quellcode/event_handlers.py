@@ -1,45 +1,116 @@
 # Diese Datei enthält die Kernlogik der Anwendung. Sie behandelt alle Benutzerinteraktionen (Events) aus der GUI.
+# Schwere Module (pandas, requests, bs4, win32com, ...) werden erst bei Bedarf importiert, damit das Fenster sofort erscheint.
 
 import tkinter as tk
 from tkinter import filedialog, messagebox
-import pandas as pd
 import threading
-from excel_search import load_excel, search_and_show, merge_results
-from online_sources import get_online_results
-from bom_tools import read_bom, detect_both_part_columns
-from data_manager import load_db_from_json, save_db_to_json
-from excel_updater import update_excel_prices_win32com
-from utils import is_online_source
-from config import SEARCH_COLS
+import time
+from fuzzy_search import build_fuzzy_index, compact
+from supplier_guard import format_breaker_status
+import startup_profile
+import tracing
+from config import SEARCH_COLS, BLOCK_SIZE, SUPPLIER_STATUS_INTERVAL_MS, TYPEAHEAD_DELAY_MS
 
 class EventHandlers:
     def __init__(self, ui_manager):
         self.ui = ui_manager
         self.df = None
+        self.search_index = {}
+        self.fuzzy_index = build_fuzzy_index({})
+        self._typeahead_job = None
+        self.cancel_event = None
         self.initialize_db()
+        self.refresh_supplier_status()
+
+    def refresh_supplier_status(self):
+        """Zeigt gesperrte Online-Quellen in der Statusleiste an und plant die nächste Aktualisierung."""
+        self.ui.supplier_status_label.config(text=format_breaker_status())
+        self.ui.root.after(SUPPLIER_STATUS_INTERVAL_MS, self.refresh_supplier_status)
+
+    def show_trace_summary(self, run):
+        """Zeigt die Ablaufmessung eines Laufs (tracing.start_run) unter der Statusleiste an (nur mit --trace)."""
+        if tracing.is_enabled():
+            self.ui.trace_label.config(text="Ablauf: " + tracing.format_summary(run=run))
+
+    def set_db(self, df):
+        """Setzt die Datenbank und baut den Suchindex neu auf."""
+        from excel_search import build_search_index
+        self.df = df
+        self.search_index = build_search_index(df, SEARCH_COLS)
+        self.fuzzy_index = build_fuzzy_index(self.search_index)
 
     def initialize_db(self):
-        self.df = load_db_from_json()
-        if self.df is not None and all(col in self.df.columns for col in SEARCH_COLS):
+        """Lädt die Datenbank im Hintergrund; Suche und BOM werden freigegeben, sobald sie bereit ist."""
+        self.ui.update_db_btn.config(state="disabled")
+        self.ui.status_label.config(text="Lade Datenbank...")
+
+        def worker():
+            start = time.perf_counter()
+            df, index, error = None, {}, None
+            try:
+                from data_manager import load_db
+                from excel_search import build_search_index
+                df = load_db()
+                if df is not None:
+                    index = build_search_index(df, SEARCH_COLS)
+            except Exception as e:
+                error = e
+            fuzzy = build_fuzzy_index(index)
+            elapsed = time.perf_counter() - start
+            self.ui.root.after(0, lambda: self._on_db_loaded(df, index, fuzzy, error, elapsed))
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def _on_db_loaded(self, df, index, fuzzy, error, elapsed):
+        self.ui.update_db_btn.config(state="normal")
+        startup_profile.mark("Datenbank geladen")
+        startup_profile.report()
+        if df is not None and all(col in df.columns for col in SEARCH_COLS):
+            self.df, self.search_index, self.fuzzy_index = df, index, fuzzy
             self.ui.search_btn.config(state="normal")
             self.ui.bom_btn.config(state="normal")
+            self.ui.status_label.config(text=f"Bereit ({len(df) // BLOCK_SIZE} Einträge, geladen in {elapsed:.1f} s)")
         else:
+            if error is not None:
+                messagebox.showerror("Fehler", f"Datenbank konnte nicht geladen werden:\n{error}")
             messagebox.showinfo("Keine Datenbank", "Keine Datenbank gefunden. Bitte Excel-Datei zur Initialisierung laden.")
             self.update_db_from_excel()
 
     def update_db_from_excel(self):
         file = filedialog.askopenfilename(title="Excel-Datei wählen", filetypes=[("Excel-Dateien", "*.xls*")])
         if not file: return
+        from excel_search import load_excel, update_search_index
+        from db_sync import (diff_db, apply_diff, has_changes, positions_kept, changed_positions, write_changelog,
+                             format_diff_summary)
+        from data_manager import save_db
         try:
             df_loaded = load_excel(file)
             if any(col not in df_loaded.columns for col in SEARCH_COLS):
                 messagebox.showerror("Fehler", f"Benötigte Spalten fehlen: {SEARCH_COLS}")
                 return
-            self.df = df_loaded
-            save_db_to_json(self.df)
+            # Inkrementeller Abgleich: nur neue, geänderte und gelöschte Blöcke übernehmen
+            diff = diff_db(self.df, df_loaded)
+            write_changelog(diff, file)
+            if diff is None:
+                self.set_db(df_loaded)
+            elif has_changes(diff):
+                old_df = self.df
+                new_df = apply_diff(old_df, df_loaded, diff)
+                if not positions_kept(diff):
+                    self.set_db(new_df)
+                else:
+                    replaced, appended = changed_positions(diff)
+                    new_index = update_search_index(self.search_index, old_df, new_df, replaced + appended, SEARCH_COLS)
+                    self.df, self.search_index = new_df, new_index
+                    self.fuzzy_index = build_fuzzy_index(new_index)
+            if has_changes(diff):
+                try:
+                    save_db(self.df)
+                except Exception as e:
+                    messagebox.showerror("Fehler", f"Die Datenbank wurde aktualisiert, konnte aber nicht gespeichert werden:\n{e}")
             self.ui.search_btn.config(state="normal")
             self.ui.bom_btn.config(state="normal")
-            messagebox.showinfo("Erfolg", "Datenbank wurde aktualisiert.")
+            messagebox.showinfo("Erfolg", f"Datenbank wurde aktualisiert.\n{format_diff_summary(diff)}")
         except Exception as e:
             messagebox.showerror("Fehler", f"Fehler beim Laden der Datei:\n{e}")
 
@@ -49,21 +120,61 @@ class EventHandlers:
         if not search_term: return
 
         def worker():
-            db_rows = search_and_show(self.df, search_term, SEARCH_COLS)
-            artikelnummer = db_rows.iloc[0]['WN_HerstellerBestellnummer_1'] if (db_rows is not None and not db_rows.empty) else search_term
+            run = tracing.start_run()
+            try:
+                from excel_search import search_and_show, merge_results
+                db_rows = search_and_show(self.df, search_term, SEARCH_COLS, self.search_index)
+                hint = ""
+                if db_rows is None and self.ui.fuzzy_var.get():
+                    # Kein exakter Treffer: ähnliche Nummern nur vorschlagen. Gesucht (auch online) wird weiter nach
+                    # der eingegebenen Nummer, denn ein neues Teil fehlt meist nur in der Datenbank
+                    candidates = self.fuzzy_index.search(search_term)
+                    if candidates:
+                        hint = f"Kein exakter Treffer für '{search_term}', ähnliche Nummern: {', '.join(candidates)}"
+                        self.ui.root.after(0, lambda: self.ui.status_label.config(text=hint))
+                        self.ui.root.after(0, lambda: self.ui.show_suggestions(candidates, open_list=True))
+                # Online wird die Nummer des ersten Blocks abgefragt, merge_results trägt das Ergebnis nur dort ein
+                artikelnummer = db_rows.iloc[0]['WN_HerstellerBestellnummer_1'] if (db_rows is not None and not db_rows.empty) else search_term
             
-            online_results = get_online_results(artikelnummer) if self.ui.use_online_var.get() else []
+                latencies = {}
+                online_results = []
+                if self.ui.use_online_var.get():
+                    from online_sources import get_online_results
+                    online_results = get_online_results(artikelnummer, latencies=latencies, refresh=self.ui.refresh_cache_var.get())
+                if latencies:
+                    from online_sources import format_latencies
+                    # Vorschläge nicht überschreiben, sondern die Antwortzeiten anhängen
+                    status = " | ".join(text for text in (hint, format_latencies(latencies)) if text)
+                    self.ui.root.after(0, lambda: self.ui.status_label.config(text=status))
             
-            merged, veraltet_indices = merge_results(db_rows, online_results)
+                merged, veraltet_indices = merge_results(db_rows, online_results)
             
-            if merged is not None and not merged.empty:
-                self.ui.root.after(0, lambda: self.ui.show_table(merged, veraltet_indices))
-                self.ui.tree.anzeige_df = merged
-            else:
-                self.ui.root.after(0, lambda: messagebox.showinfo("Kein Treffer", f"Keine Daten für '{search_term}' gefunden."))
-        
+                if merged is not None and not merged.empty:
+                    self.ui.root.after(0, tracing.bind(lambda: self.ui.show_table(merged, veraltet_indices)))
+                    self.ui.tree.anzeige_df = merged
+                else:
+                    self.ui.root.after(0, lambda: messagebox.showinfo("Kein Treffer", f"Keine Daten für '{search_term}' gefunden."))
+                # Nach show_table einplanen (mit bind dem Lauf zugeordnet), damit die Anzeige in der Messung enthalten ist
+                self.ui.root.after(0, lambda: self.show_trace_summary(run))
+            except Exception as e:
+                # Fehler im Hintergrund-Thread sonst unsichtbar: Meldung statt leerer Tabelle
+                self.ui.root.after(0, lambda e=e: messagebox.showerror("Suchfehler", str(e)))
+
         threading.Thread(target=worker, daemon=True).start()
 
+    def on_entry_key(self, event=None):
+        """Plant die Aktualisierung der Vorschlagsliste (entprellt, damit nicht bei jedem Tastendruck gesucht wird)."""
+        if event is not None and event.keysym in ("Return", "Up", "Down", "Escape", "Tab"):
+            return
+        if self._typeahead_job is not None:
+            self.ui.root.after_cancel(self._typeahead_job)
+        self._typeahead_job = self.ui.root.after(TYPEAHEAD_DELAY_MS, self.update_suggestions)
+
+    def update_suggestions(self):
+        self._typeahead_job = None
+        text = self.ui.entry.get().strip()
+        self.ui.show_suggestions(self.fuzzy_index.search(text) if len(compact(text)) >= 2 else [])
+
     def update_selected_prices_in_excel(self):
         selected_items = [item for item in self.ui.tree.get_children() if self.ui.tree.index(item) % 4 == 0 and self.ui.tree.set(item, "Auswahl") == "✓"]
         if not selected_items:
@@ -76,6 +187,8 @@ class EventHandlers:
         excel_path = filedialog.askopenfilename(title="Excel-Datei für Update wählen", filetypes=[("Makro-fähige Excel", "*.xlsm")])
         if not excel_path: return
 
+        from price_records import PriceTable
+        from utils import is_online_source
         updates_per_entry = []
         for item in selected_items:
             idx = self.ui.tree.index(item)
@@ -83,8 +196,10 @@ class EventHandlers:
             artikelnummer = str(block_rows.iloc[0][anzeige_df.columns[0]])
             nummer_1000er = str(block_rows.iloc[0][anzeige_df.columns[1]]) if len(anzeige_df.columns) > 1 else ""
             
-            sources = [{'price_block': [block_rows.iloc[j][col] for j in range(4)]}
-                       for col in anzeige_df.columns if is_online_source(col) and all(str(block_rows.iloc[j][col]).strip() for j in range(4))]
+            # Preisblöcke typisiert übernehmen (kein erneutes Parsen formatierter Texte)
+            sources = [{'price_block': record.to_block()}
+                       for record in PriceTable.from_blocks(block_rows).records(complete=True)
+                       if is_online_source(str(record.column))]
             
             if sources:
                 updates_per_entry.append({'artikelnummer': artikelnummer, '1000ernummer': nummer_1000er, 'sources': sources})
@@ -94,8 +209,10 @@ class EventHandlers:
             return
 
         def worker():
-            update_excel_prices_win32com(excel_path, updates_per_entry, self.ui.progress_var, self.ui.status_label, self.ui.root)
-            self.ui.root.after(0, lambda: messagebox.showinfo("Fertig", "Excel-Datei wurde aktualisiert."))
+            from excel_updater import update_excel_prices_win32com
+            # Fehler meldet update_excel_prices_win32com selbst (dann kein Bericht)
+            if update_excel_prices_win32com(excel_path, updates_per_entry, self.ui.progress_var, self.ui.status_label, self.ui.root):
+                self.ui.root.after(0, lambda: messagebox.showinfo("Fertig", "Excel-Datei wurde aktualisiert."))
         
         threading.Thread(target=worker, daemon=True).start()
 
@@ -104,40 +221,49 @@ class EventHandlers:
         bomfile = filedialog.askopenfilename(title="BOM-Datei wählen", filetypes=[("Excel/CSV", "*.xls*;*.csv")])
         if not bomfile: return
 
+        self.cancel_event = threading.Event()
+        cancel_event = self.cancel_event
+        use_online = self.ui.use_online_var.get()
+        refresh = self.ui.refresh_cache_var.get()
+        self.ui.cancel_btn.config(state="normal")
+
+        def set_progress(done, total):
+            self.ui.root.after(0, lambda p=done / total * 100: self.ui.progress_var.set(p))
+            self.ui.root.after(0, lambda: self.ui.status_label.config(text=f"Lade BOM: {done}/{total}"))
+
         def worker():
+            run = tracing.start_run()
             try:
-                bom_df = read_bom(bomfile)
-                _, art_col = detect_both_part_columns(bom_df)
-                bauteile = [str(t).strip() for t in bom_df[art_col].dropna().unique() if str(t).strip().upper() != "SPLICE"]
-                total = len(bauteile)
-                all_results = []
-                all_veraltet = []
-
-                for idx, part in enumerate(bauteile):
-                    progress = (idx + 1) / total * 100
-                    self.ui.root.after(0, lambda p=progress: self.ui.progress_var.set(p))
-                    self.ui.root.after(0, lambda i=idx: self.ui.status_label.config(text=f"Lade BOM: {i+1}/{total}"))
-                    
-                    db_rows = search_and_show(self.df, part, SEARCH_COLS)
-                    online_res = get_online_results(part) if self.ui.use_online_var.get() else []
-                    merged, veraltet = merge_results(db_rows, online_res)
-                    if merged is not None:
-                        offset = sum(len(r) for r in all_results)
-                        all_results.append(merged)
-                        all_veraltet.extend([i + offset for i in veraltet])
-                
-                if not all_results:
+                from bom_service import price_bom
+                result = price_bom(self.df, self.search_index, bomfile, use_online=use_online, refresh=refresh,
+                                   cancel_event=cancel_event, on_progress=set_progress)
+                if result["cancelled"]:
+                    self.ui.root.after(0, lambda: self.ui.status_label.config(text="BOM-Suche abgebrochen."))
+                    return
+                final_df = result["df"]
+                if final_df is None:
                     self.ui.root.after(0, lambda: messagebox.showinfo("Info", "Keine Ergebnisse für BOM gefunden."))
                     return
 
-                final_df = pd.concat(all_results, ignore_index=True).fillna('')
-                self.ui.root.after(0, lambda: self.ui.show_table(final_df, all_veraltet))
+                self.ui.root.after(0, tracing.bind(lambda: self.ui.show_table(final_df, result["veraltet"])))
+                self.ui.root.after(0, lambda: self.show_trace_summary(run))
                 self.ui.tree.anzeige_df = final_df
+                if use_online:
+                    import http_client
+                    print(http_client.format_stats())
             except Exception as e:
                 self.ui.root.after(0, lambda: messagebox.showerror("BOM-Fehler", str(e)))
+            finally:
+                self.ui.root.after(0, lambda: self.ui.cancel_btn.config(state="disabled"))
 
         threading.Thread(target=worker, daemon=True).start()
 
+    def cancel_bom(self):
+        """Bricht eine laufende BOM-Suche ab, laufende Online-Abfragen werden verworfen."""
+        if self.cancel_event is not None:
+            self.cancel_event.set()
+            self.ui.status_label.config(text="BOM-Suche wird abgebrochen...")
+
     def export_as_excel(self):
         df_to_export = getattr(self.ui.tree, "anzeige_df", None)
         if df_to_export is None or df_to_export.empty:
@@ -145,7 +271,8 @@ class EventHandlers:
             return
         fname = filedialog.asksaveasfilename(defaultextension=".xlsx", filetypes=[("Excel", "*.xlsx")])
         if fname:
-            df_to_export.to_excel(fname, index=False)
+            from excel_search import format_price_blocks
+            format_price_blocks(df_to_export).to_excel(fname, index=False)
             messagebox.showinfo("Export", f"Erfolgreich gespeichert:\n{fname}")
 
     def on_tree_click(self, event):
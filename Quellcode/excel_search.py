@@ -1,8 +1,11 @@
 # Dieses Modul ist für das Laden, Durchsuchen und Zusammenführen von Daten aus der Haupt-Excel-Datenbank zuständig.
 
+import numpy as np
 import pandas as pd
-from utils import format_value, sapnr_to_str
-from datetime import datetime, timedelta
+from utils import format_column, sapnr_to_str
+from price_records import PriceRecord, PriceTable
+import tracing
+from config import BLOCK_SIZE, BLOCK_ROWS
 
 def load_excel(file):
     sheet = "DB_4erDS"
@@ -17,91 +20,142 @@ def load_excel(file):
     df = df.drop(columns=[col for col in cols_to_drop if col in df.columns])
     return df
 
-def search_and_show(df, search, search_cols):
+def _norm_sapnr(x):
+    return str(int(float(x))) if pd.notnull(x) and str(x).replace('.', '', 1).isdigit() else ""
+
+def _norm_bestellnr(x):
+    if x is None:
+        return ""
+    x = str(x)
+    return x.strip() if x != 'nan' else ""
+
+# Normalisierungsfunktionen je Suchspalte (identisch zur Suche ohne Index)
+_NORMALIZERS = {
+    'WN_SAP-Artikel-NR': _norm_sapnr,
+    'WN_HerstellerBestellnummer_1': _norm_bestellnr,
+}
+
+def build_search_index(df, search_cols):
+    """Erstellt einmalig einen Index: normalisierte Nummer -> sortierte Zeilenpositionen im DataFrame."""
+    index = {}
+    if df is None:
+        return index
+    for col in search_cols:
+        if col not in df.columns:
+            continue
+        norm = _NORMALIZERS.get(col, str)
+        for pos, val in enumerate(df[col].tolist()):
+            key = norm(val)
+            if key:
+                index.setdefault(key, set()).add(pos)
+    return {key: sorted(positions) for key, positions in index.items()}
+
+def update_search_index(index, old_df, new_df, block_starts, search_cols):
+    """
+    Aktualisiert den Index nur für die angegebenen Blöcke (an gleicher Position ersetzt oder
+    hinten angehängt). Gibt einen neuen Index zurück, der alte bleibt für laufende Suchen gültig.
+    """
+    rows = [start + i for start in block_starts for i in range(BLOCK_SIZE)]
+    touched = {}
+    for col in search_cols:
+        if col not in new_df.columns:
+            continue
+        norm = _NORMALIZERS.get(col, str)
+        for pos in rows:
+            if pos < len(old_df):
+                key = norm(old_df[col].iat[pos])
+                if key:
+                    touched.setdefault(key, set(index.get(key, []))).discard(pos)
+            if pos < len(new_df):
+                key = norm(new_df[col].iat[pos])
+                if key:
+                    touched.setdefault(key, set(index.get(key, []))).add(pos)
+    new_index = dict(index)
+    for key, positions in touched.items():
+        if positions:
+            new_index[key] = sorted(positions)
+        else:
+            new_index.pop(key, None)
+    return new_index
+
+def _block_rows(df, positions, block_size=BLOCK_SIZE):
+    """
+    Alle Zeilen der Blöcke, in denen ein Treffer liegt, in Dateireihenfolge. Das Ergebnis bleibt so am
+    4-Zeilen-Layout ausgerichtet (PriceTable.from_blocks, format_price_blocks), auch bei Mehrfachtreffern.
+    """
+    starts = sorted({p - p % block_size for p in positions})
+    return df.iloc[[row for start in starts for row in range(start, min(start + block_size, len(df)))]]
+
+@tracing.traced("search_and_show", hit=lambda rows: rows is not None)
+def search_and_show(df, search, search_cols, index=None):
     search = str(search).strip()
+    if index is not None:
+        # Schneller Weg: O(1)-Lookup im vorab erstellten Index
+        positions = index.get(search, [])
+        if not positions:
+            return None
+        return _block_rows(df, positions)
     search_df = df[search_cols].copy()
     if 'WN_SAP-Artikel-NR' in search_cols:
-        search_df['WN_SAP-Artikel-NR'] = search_df['WN_SAP-Artikel-NR'].apply(
-            lambda x: str(int(float(x))) if pd.notnull(x) and str(x).replace('.', '', 1).isdigit() else ""
-        )
+        search_df['WN_SAP-Artikel-NR'] = search_df['WN_SAP-Artikel-NR'].apply(_norm_sapnr)
     if 'WN_HerstellerBestellnummer_1' in search_cols:
-        search_df['WN_HerstellerBestellnummer_1'] = search_df['WN_HerstellerBestellnummer_1'].astype(str).map(
-            lambda x: x.strip() if x != 'nan' else ""
-        )
+        search_df['WN_HerstellerBestellnummer_1'] = search_df['WN_HerstellerBestellnummer_1'].astype(str).map(_norm_bestellnr)
     mask = search_df.apply(lambda row: any(search == str(cell) for cell in row), axis=1)
-    indices = mask[mask].index
-    if len(indices) == 0:
+    positions = np.flatnonzero(mask.to_numpy())
+    if len(positions) == 0:
         return None
-    # Wenn mehrere Treffer, gib alle zurück, sonst wie bisher die ersten 4 Zeilen
-    if len(indices) > 4:
-        return df.loc[indices]
-    start = indices[0]
-    end = min(start + 4, len(df))
-    return df.iloc[start:end]
+    # Bei mehreren Treffern alle Blöcke zurückgeben
+    return _block_rows(df, positions)
 
+@tracing.traced("merge_results")
 def merge_results(db_rows, online_results_list):
-    from datetime import datetime, timedelta
-
+    """
+    Hängt die Online-Ergebnisse als eigene Spalten an die Datenbank-Treffer an. Die Werte bleiben
+    typisiert (Datum, Preis, Losgröße); formatiert wird erst bei Anzeige und Export (format_price_blocks).
+    """
+    records = [PriceRecord.from_online(res) for res in online_results_list if res]
     if db_rows is None or db_rows.empty:
-        if online_results_list:
-            data = {}
-            for res in online_results_list:
-                if res:
-                    colname = res.get("Quelle", "Online")
-                    data[colname] = [
-                        format_value(res.get("Datum", ""), "Datum"),
-                        format_value(res.get("Preis", ""), "Preis"),
-                        res.get("Losgröße", ""),
-                        res.get("Quelle", "")
-                    ]
-            if not data:
-                return None, []
-            return pd.DataFrame(data), []
-        else:
+        if not records:
             return None, []
+        df = pd.DataFrame({rec.column: rec.to_block() for rec in records}, dtype=object)
+        return df, _kurs_veraltet_indices(online_results_list, 4)
+
+    df = db_rows.astype(object)
+    for rec in records:
+        # Ein Online-Ergebnis gehört zu genau einem Teil: bei mehreren Blöcken (Mehrfachtreffer)
+        # nur im ersten Block eintragen, dessen Nummer abgefragt wurde
+        block = rec.to_block()[:len(df)]
+        column = [None] * len(df)
+        column[:len(block)] = block
+        df[rec.column] = column
+    veraltet = PriceTable.from_blocks(df).stale_rows()
+    extra = [i for i in _kurs_veraltet_indices(online_results_list, len(df)) if i not in veraltet]
+    return df, sorted(veraltet + extra)
+
+@tracing.traced("format_price_blocks")
+def format_price_blocks(df, block_size=BLOCK_SIZE, as_text=False):
+    """
+    Anzeige- und Exportformat: Datum-Zeilen als TT.MM.JJJJ, Preis-Zeilen als "1,23 €".
+    Mit as_text=True werden auch alle übrigen Zellen in Text umgewandelt (Tabellenansicht), jede Zelle genau einmal.
+    """
+    df = df.astype(object)
+    rows_by_field = {field: np.arange(BLOCK_ROWS[field], len(df), block_size) for field in ("Datum", "Preis")}
+    if as_text:
+        other = np.ones(len(df), dtype=bool)
+        for rows in rows_by_field.values():
+            other[rows] = False
+        rows_by_field[None] = np.flatnonzero(other)
+    for field, rows in rows_by_field.items():
+        for pos in range(df.shape[1]):
+            df.iloc[rows, pos] = format_column(df.iloc[rows, pos], field)
+    return df
 
-    df = db_rows.copy()
-    for col in df.columns:
-        df[col] = df[col].astype(object)  # Typumwandlung für Kompatibilität
-        df.iloc[0, df.columns.get_loc(col)] = format_value(df.iloc[0, df.columns.get_loc(col)], "Datum")
-        df.iloc[1, df.columns.get_loc(col)] = format_value(df.iloc[1, df.columns.get_loc(col)], "Preis")
-    for res in online_results_list:
-        if res:
-            colname = res.get("Quelle", "Online")
-            df[colname] = [
-                format_value(res.get("Datum", ""), "Datum"),
-                format_value(res.get("Preis", ""), "Preis"),
-                res.get("Losgröße", ""),
-                res.get("Quelle", ""),
-            ]
-    block_size = 4
-    today = datetime.today()
-    veraltet_indices = []
-    for i in range(0, len(df), block_size):
-        block_veraltet = False
-        for col in df.columns:
-            for j in range(block_size):
-                if i + j < len(df):
-                    val = str(df.iloc[i + j][col]).strip()
-                    # Unix-Timestamp prüfen
-                    if val.isdigit() and len(val) >= 12:
-                        try:
-                            ts = int(val)
-                            if ts > 1e12:
-                                ts = ts // 1000
-                            d = datetime.fromtimestamp(ts)
-                            if d < today - timedelta(days=365):
-                                block_veraltet = True
-                        except Exception:
-                            continue
-                    else:
-                        # Normales Datum prüfen
-                        try:
-                            d = datetime.strptime(val, "%d.%m.%Y")
-                            if d < today - timedelta(days=365):
-                                block_veraltet = True
-                        except Exception:
-                            continue
-        if block_veraltet:
-            veraltet_indices.extend(range(i, min(i + block_size, len(df))))
-    return df, veraltet_indices
\ No newline at end of file
+def _kurs_veraltet_indices(online_results_list, n_rows):
+    """Online-Preise, die mit einem veralteten Wechselkurs umgerechnet wurden, markieren den ersten Block."""
+    results = [res for res in online_results_list if res]
+    if not results:
+        return []
+    from currency import result_rate_stale
+    if any(result_rate_stale(res) for res in results):
+        return list(range(min(BLOCK_SIZE, n_rows)))
+    return []
@@ -1,12 +1,18 @@
 # Dieses Modul enthält die Logik zur Automatisierung von Excel über win32com, um Preise zu aktualisieren.
 
 import os
+import time
 from datetime import datetime
 from tkinter import messagebox
-import win32com.client
 from utils import clean_price
 from config import EXCEL_SHEET_NAME, EXCEL_SHEET_PASSWORD
 
+# Erste Datenzeile und Spalten im Blatt DB_4erDS
+FIRST_DATA_ROW = 8
+COL_ARTIKEL = 2
+COL_1000ER = 3
+COL_PRICE = 24
+
 def normalize_losgroesse(val):
     try:
         return str(int(float(str(val).replace(",", ".").strip())))
@@ -22,23 +28,231 @@ def normalize_nummer_1000er(val):
     except (ValueError, TypeError):
         return str(val).strip().lower()
 
-def build_excel_index(ws, max_row):
-    """Erstellt einen Index aus der Excel-Datei für schnellen Zugriff."""
+class ComSheet:
+    """Schlanke Schnittstelle zu einem Excel-Arbeitsblatt über win32com. Jeder Methodenaufruf ist ein COM-Zugriff."""
+
+    def __init__(self, excel, wb, ws):
+        self.excel = excel
+        self.wb = wb
+        self.ws = ws
+
+    def max_row(self):
+        return self.ws.UsedRange.Rows.Count
+
+    def get_value(self, row, col):
+        return self.ws.Cells(row, col).Value
+
+    def read_range(self, first_row, first_col, last_row, last_col):
+        values = self.ws.Range(self.ws.Cells(first_row, first_col), self.ws.Cells(last_row, last_col)).Value
+        if first_row == last_row and first_col == last_col:
+            return [[values]]
+        return [list(r) for r in values]
+
+    def write_range(self, first_row, first_col, rows):
+        last_row = first_row + len(rows) - 1
+        last_col = first_col + len(rows[0]) - 1
+        self.ws.Range(self.ws.Cells(first_row, first_col), self.ws.Cells(last_row, last_col)).Value = rows
+
+    def run_price_macro(self):
+        self.excel.Application.Run(f"'{self.wb.Name}'!NewPricesInDB")
+
+    def save(self):
+        self.wb.Save()
+
+class MemorySheet:
+    """
+    Arbeitsblatt im Speicher mit derselben Schnittstelle wie ComSheet, z.B. für Tests unter Linux.
+    Zählt Einzelzell- und Bereichszugriffe, um die Anzahl der Round-Trips prüfen zu können.
+    """
+
+    def __init__(self, cells=None, max_row=None):
+        self.cells = dict(cells or {})
+        self._max_row = max_row
+        self.cell_reads = 0
+        self.range_reads = 0
+        self.range_writes = 0
+        self.macro_runs = 0
+        self.saves = 0
+
+    def max_row(self):
+        if self._max_row is not None:
+            return self._max_row
+        return max((r for r, _ in self.cells), default=0)
+
+    def get_value(self, row, col):
+        self.cell_reads += 1
+        return self.cells.get((row, col))
+
+    def read_range(self, first_row, first_col, last_row, last_col):
+        self.range_reads += 1
+        return [[self.cells.get((r, c)) for c in range(first_col, last_col + 1)]
+                for r in range(first_row, last_row + 1)]
+
+    def write_range(self, first_row, first_col, rows):
+        self.range_writes += 1
+        for i, row in enumerate(rows):
+            for j, value in enumerate(row):
+                self.cells[(first_row + i, first_col + j)] = value
+
+    def run_price_macro(self):
+        self.macro_runs += 1
+
+    def save(self):
+        self.saves += 1
+
+def _read_column(ws, col, first_row, last_row):
+    return [row[0] for row in ws.read_range(first_row, col, last_row, col)]
+
+def build_excel_index(ws, max_row, free_blocks=None):
+    """
+    Erstellt einen Index aus der Excel-Datei für schnellen Zugriff. Gelesen werden nur die Spalten
+    B (Artikelnummer), C (1000er-Nummer) und X (Preisblock), je mit einem einzigen Bereichszugriff.
+    Wird ein Dict 'free_blocks' übergeben, werden darin im selben Durchgang die leeren Preisblöcke je
+    Artikelnummer (aufsteigende Zeilen) gesammelt.
+    """
     index = {}
-    for row in range(8, max_row + 1, 4):
-        artikelnummer = str(ws.Cells(row, 2).Value).strip().lower()
-        nummer_1000er = normalize_nummer_1000er(ws.Cells(row, 3).Value)
-        losgroesse = normalize_losgroesse(ws.Cells(row + 2, 24).Value)
-        quelle = normalize_quelle(ws.Cells(row + 3, 24).Value)
+    if max_row < FIRST_DATA_ROW:
+        return index
+    last_block = max_row - (max_row - FIRST_DATA_ROW) % 4
+    artikel = _read_column(ws, COL_ARTIKEL, FIRST_DATA_ROW, last_block)
+    nummern = _read_column(ws, COL_1000ER, FIRST_DATA_ROW, last_block)
+    prices = _read_column(ws, COL_PRICE, FIRST_DATA_ROW, last_block + 3)
+    for offset in range(0, last_block - FIRST_DATA_ROW + 1, 4):
+        row = FIRST_DATA_ROW + offset
+        artikelnummer = str(artikel[offset]).strip().lower()
+        nummer_1000er = normalize_nummer_1000er(nummern[offset])
+        losgroesse = normalize_losgroesse(prices[offset + 2])
+        quelle = normalize_quelle(prices[offset + 3])
         key = (artikelnummer, nummer_1000er, losgroesse, quelle)
         index[key] = row
+        if free_blocks is not None and all(prices[offset + i] is None for i in range(4)):
+            free_blocks.setdefault(artikelnummer, []).append(row)
     return index
 
+def convert_price_block(price_block):
+    """
+    Wandelt einen Preisblock (Datum, Preis, Losgröße, Quelle) in die Excel-Zelltypen um.
+    Typisierte Werte (siehe price_records) werden direkt übernommen, Texte wie bisher geparst.
+    """
+    datum = price_block[0]
+    if isinstance(datum, str):
+        datum = datetime.strptime(datum, "%d.%m.%Y")
+    elif hasattr(datum, "to_pydatetime"):
+        datum = datum.to_pydatetime()
+    return [
+        datum,
+        float(clean_price(price_block[1])),
+        int(price_block[2]),
+        str(price_block[3]),
+    ]
+
+def plan_price_updates(updates_per_entry, excel_index, free_blocks, on_progress=None, duplicates=None):
+    """
+    Ermittelt für jeden Preisblock die Zielzeile (vorhandener Block oder freier Platz der Artikelnummer).
+    Gibt ein Dict Zielzeile -> Zellwerte zurück; es wird noch nichts geschrieben und nichts gelesen.
+    Gibt es mehrere Preisblöcke mit demselben Schlüssel (Artikel, 1000er-Nummer, Losgröße, Quelle), wird nur
+    der mit dem neuesten Datum geschrieben (bei Gleichstand der erste). Wird eine Liste 'duplicates'
+    übergeben, werden darin die Schlüssel der verworfenen Blöcke gesammelt.
+    """
+    targets = {}
+    planned = {}
+    total_entries = len(updates_per_entry)
+    for entry_idx, entry_upd in enumerate(updates_per_entry):
+        artikelnummer = str(entry_upd.get("artikelnummer", "")).strip().lower()
+        nummer_1000er = normalize_nummer_1000er(entry_upd.get("1000ernummer", ""))
+
+        for source_upd in entry_upd['sources']:
+            price_block = source_upd['price_block']
+            try:
+                values = convert_price_block(price_block)
+            except Exception as e:
+                print(f"Ungültiger Preisblock für '{artikelnummer}': {price_block} ({e})")
+                continue
+            key = (artikelnummer, nummer_1000er, normalize_losgroesse(price_block[2]), normalize_quelle(price_block[3]))
+            if key in planned:
+                # Derselbe Block zweimal (z.B. Teil doppelt ausgewählt): nicht still überschreiben oder doppelt anlegen
+                if duplicates is not None:
+                    duplicates.append(key)
+                if values[0] > targets[planned[key]][0]:
+                    targets[planned[key]] = values
+                continue
+            row = excel_index.get(key)
+
+            if not row:
+                # Neuen leeren Platz für diese Artikelnummer nehmen (bereits verplante Plätze zählen als belegt)
+                row = next((r for r in free_blocks.get(artikelnummer, []) if r not in targets), None)
+            if row:
+                planned[key] = row
+                targets[row] = values
+
+        if on_progress:
+            on_progress(entry_idx + 1, total_entries)
+    return targets
+
+def write_price_blocks(ws, targets):
+    """Schreibt alle Preisblöcke, direkt aufeinanderfolgende Blöcke mit einer einzigen Bereichszuweisung."""
+    ranges = []
+    for row in sorted(targets):
+        if ranges and ranges[-1][0] + len(ranges[-1][1]) == row:
+            ranges[-1][1].extend([v] for v in targets[row])
+        else:
+            ranges.append((row, [[v] for v in targets[row]]))
+    for first_row, rows in ranges:
+        ws.write_range(first_row, COL_PRICE, rows)
+    return len(ranges)
+
+def batch_update_prices(ws, updates_per_entry, on_progress=None):
+    """
+    Aktualisiert alle Preise in einem Durchgang: Index aufbauen, Ziele planen, gesammelt schreiben,
+    Makro einmal ausführen und einmal speichern. Gibt einen Bericht mit Zeiten pro Phase zurück.
+    """
+    timings = {}
+    start = time.perf_counter()
+    free_blocks = {}
+    excel_index = build_excel_index(ws, ws.max_row(), free_blocks)
+    timings["Index"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    duplicates = []
+    targets = plan_price_updates(updates_per_entry, excel_index, free_blocks, on_progress, duplicates)
+    timings["Planung"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    range_count = write_price_blocks(ws, targets) if targets else 0
+    timings["Schreiben"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if targets:
+        ws.run_price_macro()
+    timings["Makro"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if targets:
+        ws.save()
+    timings["Speichern"] = time.perf_counter() - start
+
+    return {"blocks": len(targets), "ranges": range_count, "duplicates": len(duplicates), "timings": timings}
+
+def format_update_report(report):
+    phases = ", ".join(f"{name} {sec:.2f} s" for name, sec in report["timings"].items())
+    text = f"Preis-Update abgeschlossen: {report['blocks']} Blöcke in {report['ranges']} Bereichen ({phases})."
+    if report.get("duplicates"):
+        text += f" {report['duplicates']} doppelte Blöcke verworfen (neuester Preis gilt)."
+    return text
+
+def _progress_callback(progress_var, status_label, root):
+    def on_progress(done, total):
+        if progress_var and status_label and root:
+            root.after(0, lambda p=done / total * 100: progress_var.set(p))
+            root.after(0, lambda: status_label.config(text=f"Aktualisiere Einträge: {done} / {total}"))
+    return on_progress
+
 def update_excel_prices_win32com(excel_path, updates_per_entry, progress_var=None, status_label=None, root=None):
-    """Aktualisiert Preise in der Excel-Datei mit win32com und ruft das Makro explizit auf."""
+    """Aktualisiert Preise in der Excel-Datei mit win32com; Makro und Speichern erfolgen einmal am Ende."""
     excel = None
     wb = None
     try:
+        import win32com.client
         excel = win32com.client.Dispatch("Excel.Application")
         excel.Visible = False
         excel.ScreenUpdating = False
@@ -48,55 +262,10 @@ def update_excel_prices_win32com(excel_path, updates_per_entry, progress_var=Non
         
         if EXCEL_SHEET_PASSWORD:
             ws.Unprotect(EXCEL_SHEET_PASSWORD)
-            
-        max_row = ws.UsedRange.Rows.Count
-        excel_index = build_excel_index(ws, max_row)
-        
-        total_entries = len(updates_per_entry)
 
-        # Interne Funktion, um das Schreiben, Makro-Aufrufen und Speichern zu kapseln
-        def write_and_trigger(target_row, price_block):
-            try:
-                # 1. Daten mit korrektem Typ schreiben
-                ws.Cells(target_row, 24).Value = datetime.strptime(price_block[0], "%d.%m.%Y")
-                ws.Cells(target_row + 1, 24).Value = float(clean_price(price_block[1]))
-                ws.Cells(target_row + 2, 24).Value = int(price_block[2])
-                ws.Cells(target_row + 3, 24).Value = str(price_block[3])
-                
-                # 2. KORREKTUR: Makro explizit aufrufen, wie im alten Skript
-                excel.Application.Run(f"'{wb.Name}'!NewPricesInDB")
-                
-                # 3. KORREKTUR: Arbeitsmappe sofort speichern, um die Änderung zu übernehmen
-                wb.Save()
-                return True
-            except Exception as e:
-                print(f"Fehler beim Schreiben/Makro-Aufruf für Zeile {target_row}: {e}")
-                return False
-
-        for entry_idx, entry_upd in enumerate(updates_per_entry):
-            artikelnummer = str(entry_upd.get("artikelnummer", "")).strip().lower()
-            nummer_1000er = normalize_nummer_1000er(entry_upd.get("1000ernummer", ""))
-
-            for source_upd in entry_upd['sources']:
-                price_block = source_upd['price_block']
-                key = (artikelnummer, nummer_1000er, normalize_losgroesse(price_block[2]), normalize_quelle(price_block[3]))
-                row = excel_index.get(key)
-
-                if row:
-                    write_and_trigger(row, price_block)
-                else:
-                    # Neuen leeren Platz für diese Artikelnummer finden und befüllen
-                    for row_candidate in range(8, max_row + 1, 4):
-                        zelle_artikel = str(ws.Cells(row_candidate, 2).Value).strip().lower()
-                        if artikelnummer == zelle_artikel:
-                            if all(ws.Cells(row_candidate + i, 24).Value is None for i in range(4)):
-                                if write_and_trigger(row_candidate, price_block):
-                                    break
-            
-            if progress_var and status_label and root:
-                progress = (entry_idx + 1) / total_entries * 100
-                root.after(0, lambda p=progress: progress_var.set(p))
-                root.after(0, lambda i=entry_idx: status_label.config(text=f"Aktualisiere Einträge: {i + 1} / {total_entries}"))
+        report = batch_update_prices(ComSheet(excel, wb, ws), updates_per_entry,
+                                     _progress_callback(progress_var, status_label, root))
+        print(format_update_report(report))
 
         if EXCEL_SHEET_PASSWORD:
             ws.Protect(EXCEL_SHEET_PASSWORD, DrawingObjects=True, Contents=True, Scenarios=True, AllowFiltering=True)
@@ -105,7 +274,8 @@ def update_excel_prices_win32com(excel_path, updates_per_entry, progress_var=Non
         wb = None
 
         if root and status_label:
-            root.after(0, status_label.config, {"text": "Preis-Update abgeschlossen."})
+            root.after(0, status_label.config, {"text": format_update_report(report)})
+        return report
 
     except Exception as e:
         messagebox.showerror("Excel-Fehler", f"Ein Fehler ist beim Schreiben in Excel aufgetreten:\n{e}")
@@ -118,4 +288,4 @@ def update_excel_prices_win32com(excel_path, updates_per_entry, progress_var=Non
         if excel is not None:
             excel.Quit()
         ws = None
-        wb = None
\ No newline at end of file
+        wb = None
@@ -0,0 +1,92 @@
+# Dieses Modul ermöglicht Präfix- und unscharfe Suche über die normalisierten Teilenummern des Suchindex.
+
+import heapq
+import math
+import re
+from bisect import bisect_left
+from collections import Counter
+from config import FUZZY_MIN_SCORE, FUZZY_MAX_RESULTS, FUZZY_MAX_POSTINGS, FUZZY_CANDIDATE_FACTOR
+
+_NON_ALNUM = re.compile(r"[^0-9A-Z]")
+
+def compact(text):
+    """Vergleichsform einer Teilenummer: Großbuchstaben, ohne Trenn- und Leerzeichen ("123-4567" -> "1234567")."""
+    return _NON_ALNUM.sub("", str(text).upper())
+
+def _trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class FuzzyIndex:
+    """
+    Vorab berechneter Index über die Schlüssel des exakten Suchindex:
+    je Länge sortierte Listen für Präfixsuche (bisect) und Trigramm-Index für ähnliche Nummern.
+    """
+
+    def __init__(self, keys=()):
+        self.by_compact = {}
+        for key in keys:
+            c = compact(key)
+            if c:
+                self.by_compact.setdefault(c, []).append(key)
+        self.by_length = {}
+        self.trigrams = {}
+        for c in sorted(self.by_compact):
+            self.by_length.setdefault(len(c), []).append(c)
+            for gram in _trigrams(c):
+                self.trigrams.setdefault(gram, []).append(c)
+
+    def prefix(self, text, limit=FUZZY_MAX_RESULTS):
+        """Schlüssel, deren Vergleichsform mit 'text' beginnt (kürzeste zuerst)."""
+        c = compact(text)
+        if not c:
+            return []
+        # Nach Länge aufsteigend, damit ein kurzer Präfix ("10") nicht alle SAP-Nummern durchläuft
+        matches = []
+        for length in sorted(n for n in self.by_length if n >= len(c)):
+            candidates = self.by_length[length]
+            for candidate in candidates[bisect_left(candidates, c):]:
+                if len(matches) >= limit or not candidate.startswith(c):
+                    break
+                matches.append(candidate)
+            if len(matches) >= limit:
+                break
+        return [key for m in matches for key in self.by_compact[m]][:limit]
+
+    def similar(self, text, limit=FUZZY_MAX_RESULTS, min_score=FUZZY_MIN_SCORE):
+        """Ähnlichste Schlüssel nach Trigramm-Übereinstimmung (Dice-Koeffizient) als Liste von (Schlüssel, Score)."""
+        c = compact(text)
+        if not c:
+            return []
+        grams = _trigrams(c)
+        # Sehr häufige Trigramme ("100", "000" in fast jeder SAP-Nummer) liefern keine Kandidaten, solange genug
+        # seltenere übrig bleiben, wie ein Treffer mit min_score mindestens teilen muss. Nur die Kandidaten mit den
+        # meisten Treffern werden anschließend mit allen Trigrammen genau bewertet.
+        needed = math.ceil(min_score * len(grams) / (2 - min_score))
+        postings = sorted((self.trigrams[gram] for gram in grams if gram in self.trigrams), key=len)
+        rare = sum(len(p) <= FUZZY_MAX_POSTINGS for p in postings)
+        shared = Counter()
+        for posting in postings[:max(rare, needed, 1)]:
+            shared.update(posting)
+        scored = []
+        for cand, _ in shared.most_common(limit * FUZZY_CANDIDATE_FACTOR):
+            cand_grams = _trigrams(cand)
+            score = 2 * len(grams & cand_grams) / (len(grams) + len(cand_grams))
+            if score >= min_score:
+                scored.append((score, cand))
+        best = heapq.nlargest(limit, scored)
+        return [(key, score) for score, cand in best for key in self.by_compact[cand]][:limit]
+
+    def search(self, text, limit=FUZZY_MAX_RESULTS):
+        """Kandidaten für einen Suchbegriff: gleiche Vergleichsform, dann Präfixtreffer, dann ähnliche Nummern."""
+        result = list(self.by_compact.get(compact(text), []))
+        for key in self.prefix(text, limit) + [key for key, _ in self.similar(text, limit)]:
+            if len(result) >= limit:
+                break
+            if key not in result:
+                result.append(key)
+        return result[:limit]
+
+def build_fuzzy_index(search_index):
+    """Erstellt den unscharfen Index aus den Schlüsseln des exakten Suchindex."""
+    return FuzzyIndex(search_index.keys())
@@ -1,8 +1,11 @@
 # Diese Datei dient als "Klebstoff", der die Benutzeroberfläche (UIManager) und die Anwendungslogik (EventHandlers) zusammenfügt und die App startet.
 
 import tkinter as tk
+import startup_profile
+import tracing
 from ui_manager import UIManager
 from event_handlers import EventHandlers
+from config import TRACE_FILE
 
 def start_app():
     """Initialisiert und startet die Anwendung."""
@@ -10,6 +13,7 @@ def start_app():
     
     # 1. Erstelle die Benutzeroberfläche
     ui = UIManager(root)
+    startup_profile.mark("Fenster erstellt")
     
     # 2. Erstelle die Logik-Handler und verbinde sie mit der UI
     handlers = EventHandlers(ui)
@@ -17,11 +21,19 @@ def start_app():
     # 3. Verknüpfe die Buttons mit den Handler-Funktionen
     ui.search_btn.config(command=handlers.do_search)
     ui.entry.bind("<Return>", handlers.do_search)
+    ui.entry.bind("<KeyRelease>", handlers.on_entry_key)
+    ui.entry.bind("<<ComboboxSelected>>", handlers.do_search)
     ui.bom_btn.config(command=handlers.load_bom_and_search)
+    ui.cancel_btn.config(command=handlers.cancel_bom)
     ui.export_btn.config(command=handlers.export_as_excel)
     ui.update_db_btn.config(command=handlers.update_db_from_excel)
     ui.update_excel_btn.config(command=handlers.update_selected_prices_in_excel)
     ui.tree.bind("<Button-1>", handlers.on_tree_click)
     
-    # 4. Starte die Hauptschleife der Anwendung
-    root.mainloop()
\ No newline at end of file
+    # 4. Starte die Hauptschleife der Anwendung (die Datenbank lädt währenddessen im Hintergrund)
+    root.after_idle(lambda: startup_profile.mark("Hauptschleife läuft"))
+    root.mainloop()
+
+    # 5. Aufgezeichnete Abläufe beim Beenden sichern (nur mit --trace)
+    if tracing.is_enabled():
+        print(f"Ablaufmessung gespeichert: {tracing.export_chrome_trace(TRACE_FILE)}")
\ No newline at end of file
@@ -0,0 +1,146 @@
+# Dieses Modul stellt eine gemeinsame HTTP-Session mit Verbindungs-Pools für alle Online-Quellen bereit.
+
+import ssl
+import threading
+import time
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.poolmanager import PoolManager
+from urllib3.util.retry import Retry
+from supplier_guard import guard_for_host
+import tracing
+from config import (HTTP_POOL_CONNECTIONS, HTTP_POOL_MAXSIZE, HTTP_RETRIES, HTTP_BACKOFF, HTTP_TIMEOUT,
+                    HTTP_POST_RETRY_STATUS)
+
+# Hosts, die nur mit TLS 1.2 funktionieren
+TLS12_HOSTS = ["https://api.exchangerate.host"]
+
+class _Retry(Retry):
+    """
+    GET wird bei Rate-Limit und Serverfehlern wiederholt. Eine POST-Suchanfrage kann beim Anbieter bereits
+    verarbeitet (und vom Kontingent abgezogen) sein; sie wird nur wiederholt, wenn der Server sie ausdrücklich
+    mit 429/503 und Retry-After abgelehnt hat.
+    """
+
+    def is_retry(self, method, status_code, has_retry_after=False):
+        if method and method.upper() == "POST":
+            return bool(self.total and has_retry_after and status_code in HTTP_POST_RETRY_STATUS)
+        return super().is_retry(method, status_code, has_retry_after)
+
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        retry = super().increment(method, url, response, error, _pool, _stacktrace)
+        # Wiederholungen laufen in urllib3 an request()/before_request() vorbei; sie zählen trotzdem
+        # wie neue Anfragen gegen die Ratenbegrenzung der Quelle
+        guard = guard_for_host(_pool.host) if _pool is not None else None
+        if guard is not None:
+            guard.bucket.acquire()
+        return retry
+
+def _retry():
+    # Wiederholung mit exponentiellem Backoff bei Verbindungsfehlern und 429/5xx (POST eingeschränkt, siehe _Retry).
+    # Nach einem Lese-Timeout wird nicht wiederholt (read=False, der Timeout wird unverändert weitergegeben):
+    # die Anfrage ist beim Server angekommen und ein weiterer Versuch würde die Wartezeit nur vervielfachen.
+    return _Retry(
+        total=HTTP_RETRIES, connect=HTTP_RETRIES, read=False, other=0, status=HTTP_RETRIES,
+        backoff_factor=HTTP_BACKOFF, status_forcelist=(429, 500, 502, 503, 504),
+        respect_retry_after_header=True, raise_on_status=False,
+    )
+
+class Tls12Adapter(HTTPAdapter):
+    """Eigene Adapter-Klasse, um eine bestimmte TLS-Version zu erzwingen."""
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        self.poolmanager = PoolManager(
+            num_pools=connections,
+            maxsize=maxsize,
+            block=block,
+            ssl_version=ssl.PROTOCOL_TLSv1_2,
+        )
+
+_session = None
+_session_lock = threading.Lock()
+_stats_lock = threading.Lock()
+_stats = {}
+
+def get_session():
+    """Gibt die gemeinsame, threadsichere Session zurück (Keep-Alive, ein Pool pro Host)."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE,
+                                  max_retries=_retry())
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            for prefix in TLS12_HOSTS:
+                session.mount(prefix, Tls12Adapter(pool_connections=HTTP_POOL_CONNECTIONS,
+                                                   pool_maxsize=HTTP_POOL_MAXSIZE, max_retries=_retry()))
+            _session = session
+        return _session
+
+def _pool_stats(response, host):
+    """
+    Statistik-Schlüssel und Anzahl bisher geöffneter Verbindungen des urllib3-Pools, der die Anfrage bedient hat.
+    Das ist der Pool, den die Anfrage tatsächlich genutzt hat (z. B. der des Stub-Servers im Benchmark), nicht der
+    des angefragten Hosts. Ohne Antwort (Verbindungsfehler) zählt die Anfrage beim angefragten Host.
+    """
+    pool = getattr(getattr(response, "raw", None), "_pool", None)
+    if pool is None:
+        return host, None
+    key = pool.host if pool.port in (None, 80, 443) else f"{pool.host}:{pool.port}"
+    return key, pool.num_connections
+
+def request(method, url, **kwargs):
+    kwargs.setdefault("timeout", HTTP_TIMEOUT)
+    session = get_session()
+    host = urlsplit(url).hostname
+    guard = guard_for_host(host)
+    if guard is not None:
+        # Ratenbegrenzung; bei gesperrter Quelle wird SupplierUnavailable ausgelöst
+        guard.before_request()
+    start = time.perf_counter()
+    response = None
+    try:
+        with tracing.span(f"http {host}"):
+            response = session.request(method, url, **kwargs)
+    except Exception:
+        if guard is not None:
+            guard.breaker.record_failure()
+        raise
+    else:
+        if response.status_code >= 400:
+            tracing.count(f"http {host}", "error")
+        if guard is not None:
+            if response.status_code == 429 or response.status_code >= 500:
+                guard.breaker.record_failure()
+            else:
+                guard.breaker.record_success()
+        return response
+    finally:
+        elapsed = time.perf_counter() - start
+        key, connections = _pool_stats(response, host)
+        with _stats_lock:
+            entry = _stats.setdefault(key, {"requests": 0, "connections": 0, "time": 0.0})
+            entry["requests"] += 1
+            if connections is not None:
+                entry["connections"] = connections
+            entry["time"] += elapsed
+
+def get(url, **kwargs):
+    return request("GET", url, **kwargs)
+
+def post(url, **kwargs):
+    return request("POST", url, **kwargs)
+
+def get_stats():
+    """Anfragen, geöffnete Verbindungen und Gesamtzeit pro Verbindungs-Pool (Host) seit Programmstart."""
+    with _stats_lock:
+        return {host: dict(entry) for host, entry in _stats.items()}
+
+def format_stats():
+    lines = []
+    for host, s in sorted(get_stats().items()):
+        reused = s["requests"] - s["connections"]
+        lines.append(f"{host}: {s['requests']} Anfragen, {s['connections']} Verbindungen "
+                     f"({reused} wiederverwendet), {s['time']:.1f} s")
+    return "\n".join(lines)
@@ -1,5 +1,16 @@
 # Dies ist der Haupteinstiegspunkt der Anwendung. Er importiert und startet die GUI.
 
+import startup_profile
+
+# Startmessung muss vor allen weiteren Importen aktiviert werden
+if startup_profile.enabled_by_request():
+    startup_profile.enable()
+
+import tracing
+
+if tracing.enabled_by_request():
+    tracing.enable()
+
 import os
 from dotenv import load_dotenv
 
@@ -10,4 +21,4 @@ load_dotenv(dotenv_path=os.path.join("venv", ".env"))
 from gui import start_app
 
 if __name__ == "__main__":
-    start_app()
\ No newline at end of file
+    start_app()
@@ -1,55 +1,117 @@
 # Dieses Modul ist für die Abfrage von Preisen über die Mouser-API zuständig.
 
 from datetime import date
-import requests
+import http_client
 import re
 import os
+import price_cache
+from price_cache import cached
+from config import MOUSER_BATCH_SIZE
 
 MOUSER_API_KEY = os.getenv("MOUSER_API_KEY")
 
-def mouser_price(article, MOUSER_API_KEY=MOUSER_API_KEY):
+def mouser_price(article, MOUSER_API_KEY=MOUSER_API_KEY, refresh=False):
     if not MOUSER_API_KEY:
         return None
+    try:
+        return _fetch_mouser_price(article, MOUSER_API_KEY, refresh=refresh)
+    except Exception:
+        return None
+
+@cached("Mouser")
+def _fetch_mouser_price(article, MOUSER_API_KEY):
+    parts = _search_mouser(article, MOUSER_API_KEY)
+    if not parts:
+        return None
+    return _parse_mouser_part(parts[0])
+
+def _search_mouser(part_numbers, MOUSER_API_KEY):
+    return _search_mouser_results(part_numbers, MOUSER_API_KEY).get("Parts", [])
+
+def _search_mouser_results(part_numbers, MOUSER_API_KEY):
     payload = {
         "SearchByPartRequest": {
-            "mouserPartNumber": article,
+            "mouserPartNumber": part_numbers,
             "partSearchOptions": "None"
         }
     }
+    r = http_client.post(
+        f"https://api.mouser.com/api/v1/search/partnumber?apiKey={MOUSER_API_KEY}",
+        json=payload, headers={"Content-Type":"application/json"}, timeout=10
+    )
+    r.raise_for_status()
+    return r.json().get("SearchResults") or {}
+
+def _parse_mouser_part(part):
+    if not part.get("PriceBreaks"):
+        return None
+
+    brk = part["PriceBreaks"][-1]
+    qty_str = brk.get("Quantity", "0")
+    raw_price_str = brk.get("Price", "0")
+    
+    discounted_price = 0.0
     try:
-        r = requests.post(
-            f"https://api.mouser.com/api/v1/search/partnumber?apiKey={MOUSER_API_KEY}",
-            json=payload, headers={"Content-Type":"application/json"}, timeout=10
-        )
-        r.raise_for_status()
-        parts = r.json().get("SearchResults", {}).get("Parts", [])
-        if not parts:
-            return None
-        
-        part = parts[0]
-        if not part.get("PriceBreaks"):
-            return None
-
-        brk = part["PriceBreaks"][-1]
-        qty_str = brk.get("Quantity", "0")
-        raw_price_str = brk.get("Price", "0")
-        
-        discounted_price = 0.0
+        # Konvertiere den Preis-String in eine Zahl
+        price_val = float(re.sub(r"[^\d,\.]", "", raw_price_str).replace(",", "."))
+        # Wende den 30% Rabatt an
+        discounted_price = price_val * 0.7
+    except (ValueError, TypeError):
+         # Falls die Konvertierung fehlschlägt, bleibt der Preis 0.0
+         pass
+
+    # Gib die berechneten Zahlen zurück, nicht die formatierten Strings.
+    return {
+        "Datum": date.today().strftime("%d.%m.%Y"),
+        "Preis": discounted_price,
+        "Losgröße": int(qty_str),
+        "Quelle": "Mouser (-30%)"
+    }
+
+def mouser_price_batch(articles, MOUSER_API_KEY=MOUSER_API_KEY, refresh=False):
+    """
+    Fragt mehrere Teile mit je einer Anfrage pro MOUSER_BATCH_SIZE Teilen ab (Teilenummern durch '|' getrennt).
+    Gibt ein Dict Teil -> Ergebnis zurück. Teile ohne Treffer in einer vollständigen Antwort gelten als
+    nicht gefunden (wird gecacht); bei einer gekürzten Antwort (NumberOfResult > Anzahl Parts) bleiben sie
+    ungeklärt (None, nicht gecacht), statt für jedes Teil eine eigene Anfrage zu stellen.
+    """
+    results = {}
+    if not MOUSER_API_KEY:
+        return {a: None for a in articles}
+    missing = []
+    for article in articles:
+        hit, value = (False, None) if refresh else price_cache.lookup("Mouser", article)
+        if hit:
+            results[article] = value
+        else:
+            missing.append(article)
+
+    for i in range(0, len(missing), MOUSER_BATCH_SIZE):
+        batch = missing[i:i + MOUSER_BATCH_SIZE]
         try:
-            # Konvertiere den Preis-String in eine Zahl
-            price_val = float(re.sub(r"[^\d,\.]", "", raw_price_str).replace(",", "."))
-            # Wende den 30% Rabatt an
-            discounted_price = price_val * 0.7
-        except (ValueError, TypeError):
-             # Falls die Konvertierung fehlschlägt, bleibt der Preis 0.0
-             pass
-
-        # Gib die berechneten Zahlen zurück, nicht die formatierten Strings.
-        return {
-            "Datum": date.today().strftime("%d.%m.%Y"),
-            "Preis": discounted_price,
-            "Losgröße": int(qty_str),
-            "Quelle": "Mouser (-30%)"
-        }
-    except Exception:
-        return None
\ No newline at end of file
+            search = _search_mouser_results("|".join(batch), MOUSER_API_KEY)
+        except Exception:
+            for article in batch:
+                results[article] = None
+            continue
+        parts = search.get("Parts") or []
+        complete = (search.get("NumberOfResult") or 0) <= len(parts)
+        by_number = {}
+        for part in parts:
+            for field in ("ManufacturerPartNumber", "MouserPartNumber"):
+                if part.get(field):
+                    by_number.setdefault(price_cache.normalize_part(part[field]), part)
+        for article in batch:
+            part = by_number.get(price_cache.normalize_part(article))
+            if part is None:
+                results[article] = None
+                if complete:
+                    price_cache.store("Mouser", article, None)
+                continue
+            try:
+                results[article] = _parse_mouser_part(part)
+            except Exception:
+                results[article] = None
+                continue
+            price_cache.store("Mouser", article, results[article])
+    return results
@@ -1,60 +1,28 @@
 # Dieses Modul ist für die Abfrage von Preisen über die Octopart/Nexar-API zuständig.
 
 from datetime import date
-import requests
 import os
-from dotenv import load_dotenv
-import ssl
-from requests.adapters import HTTPAdapter
-from urllib3.poolmanager import PoolManager
+import time
+import http_client
+import currency
+import price_cache
+from price_cache import cached
+from config import NEXAR_BATCH_SIZE
 
-# Lade Umgebungsvariablen
-load_dotenv(dotenv_path=os.path.join("venv", ".env"))
+# Umgebungsvariablen werden von main.py bzw. cli.py geladen
 OCTOPART_API_KEY = os.getenv("OCTOPART_API_KEY")
 
-# --- SSL/TLS FIX START ---
-# Eigene Adapter-Klasse, um eine bestimmte TLS-Version zu erzwingen
-class Tls12Adapter(HTTPAdapter):
-    def init_poolmanager(self, connections, maxsize, block=False):
-        self.poolmanager = PoolManager(
-            num_pools=connections,
-            maxsize=maxsize,
-            block=block,
-            ssl_version=ssl.PROTOCOL_TLSv1_2,
-        )
-
-# Funktion, um eine Session mit dem TLS-Fix zu erstellen
-def get_tls_session():
-    session = requests.Session()
-    session.mount("https://", Tls12Adapter())
-    return session
-# --- SSL/TLS FIX END ---
-
-
-def get_usd_to_eur():
-    url = "https://api.exchangerate.host/latest?base=USD&symbols=EUR"
+def octopart_price_nexar(article, octopart_api_key=OCTOPART_API_KEY, refresh=False):
+    if not octopart_api_key:
+        return None
     try:
-        # Verwende die Session mit dem TLS-Fix
-        session = get_tls_session()
-        response = session.get(url, timeout=5)
-        response.raise_for_status()
-        data = response.json()
-        return data["rates"]["EUR"]
+        return _fetch_octopart_price(article, octopart_api_key, refresh=refresh)
     except Exception as e:
-        print(f"Konnte Wechselkurs nicht abrufen: {e}")
-        return 0.92 # Fallback-Wert
-
-def octopart_price_nexar(article, octopart_api_key=OCTOPART_API_KEY):
-    if not octopart_api_key:
+        print(f"Octopart-Parsing-Fehler: {e}")
         return None
-    url = "https://api.nexar.com/graphql"
-    headers = {
-        "Authorization": f"Bearer {octopart_api_key}",
-        "Content-Type": "application/json"
-    }
-    query = """
-    query Search($mpn: String!) {
-      supSearch(q: $mpn, limit: 1) {
+
+# Abgefragte Felder je Suchergebnis (für Einzel- und Sammelabfragen identisch)
+_SUPSEARCH_FIELDS = """
         results {
           part {
             mpn
@@ -72,62 +40,118 @@ def octopart_price_nexar(article, octopart_api_key=OCTOPART_API_KEY):
             }
           }
         }
-      }
+"""
+
+def _nexar_query(query, variables, octopart_api_key):
+    url = "https://api.nexar.com/graphql"
+    headers = {
+        "Authorization": f"Bearer {octopart_api_key}",
+        "Content-Type": "application/json"
     }
-    """
-    try:
-        response = requests.post(url, headers=headers, json={"query": query, "variables": {"mpn": article}}, timeout=10)
-        response.raise_for_status()
-        data = response.json()
+    response = http_client.post(url, headers=headers, json={"query": query, "variables": variables}, timeout=10)
+    response.raise_for_status()
+    return response.json()
+
+@cached("Octopart")
+def _fetch_octopart_price(article, octopart_api_key):
+    query = "query Search($mpn: String!) { supSearch(q: $mpn, limit: 1) {" + _SUPSEARCH_FIELDS + "} }"
+    data = _nexar_query(query, {"mpn": article}, octopart_api_key)
+    return _parse_supsearch(data.get("data", {}).get("supSearch", {}))
+
+def _parse_supsearch(search):
+    if not (search or {}).get("results"):
+        return None
         
-        if not data.get("data", {}).get("supSearch", {}).get("results"):
-            return None
-            
-        sellers = data["data"]["supSearch"]["results"][0]["part"]["sellers"]
-        if not sellers:
-            return None
+    sellers = search["results"][0]["part"]["sellers"]
+    if not sellers:
+        return None
 
-        offers = sellers[0]["offers"]
-        if not offers:
-            return None
+    offers = sellers[0]["offers"]
+    if not offers:
+        return None
 
-        price_data = None
-        # 1. Versuche EUR
-        for offer in offers:
-            for p in offer["prices"]:
-                if p["currency"] == "EUR":
-                    price_data = p
-                    break
-            if price_data:
+    price_data = None
+    # 1. Versuche EUR
+    for offer in offers:
+        for p in offer["prices"]:
+            if p["currency"] == "EUR":
+                price_data = p
                 break
-        # 2. Falls kein EUR, nehme USD und rechne um
-        usd_converted = False
-        if not price_data:
+        if price_data:
+            break
+    # 2. Falls kein EUR, nehme USD (danach jede andere Währung mit bekanntem Kurs) und rechne um
+    if not price_data:
+        for wanted in ("USD", None):
             for offer in offers:
                 for p in offer["prices"]:
-                    if p["currency"] == "USD":
+                    if p["currency"] == wanted or (wanted is None and currency.get_rate(p["currency"])[0] is not None):
                         price_data = p
-                        usd_converted = True
                         break
                 if price_data:
                     break
+            if price_data:
+                break
 
-        if price_data:
-            qty = price_data["quantity"]
-            price = price_data["price"]
-            
-            if usd_converted:
-                usd_eur = get_usd_to_eur()
-                price = price * usd_eur
+    if price_data:
+        qty = price_data["quantity"]
+        price = price_data["price"]
+        rate_time = False
+        
+        if price_data["currency"] != "EUR":
+            rate, age = currency.get_rate(price_data["currency"])
+            price = price * rate
+            rate_time = None if age is None else time.time() - age
 
-            return {
-                "Datum": date.today().strftime("%d.%m.%Y"),
-                "Preis": price * 0.7,
-                "Losgröße": qty,
-                "Quelle": "Octopart (-30%)"
-            }
+        result = {
+            "Datum": date.today().strftime("%d.%m.%Y"),
+            "Preis": price * 0.7,
+            "Losgröße": qty,
+            "Quelle": "Octopart (-30%)"
+        }
+        if rate_time is not False:
+            # Stand des Umrechnungskurses (None = Notfallwert); ob er veraltet ist, wird erst bei der Anzeige
+            # geprüft, weil das Ergebnis bis zu einem Tag im Preis-Cache liegt
+            result["Kurs_Stand"] = rate_time
+        return result
+    else:
+        return None
+
+def octopart_price_nexar_batch(articles, octopart_api_key=OCTOPART_API_KEY, refresh=False):
+    """
+    Fragt mehrere Teile mit einer GraphQL-Anfrage pro NEXAR_BATCH_SIZE Teilen ab (ein Alias je Teil).
+    Gibt ein Dict Teil -> Ergebnis zurück.
+    """
+    if not octopart_api_key:
+        return {a: None for a in articles}
+    results = {}
+    missing = []
+    for article in articles:
+        hit, value = (False, None) if refresh else price_cache.lookup("Octopart", article)
+        if hit:
+            results[article] = value
         else:
-            return None
-    except Exception as e:
-        print(f"Octopart-Parsing-Fehler: {e}")
-        return None
\ No newline at end of file
+            missing.append(article)
+
+    for i in range(0, len(missing), NEXAR_BATCH_SIZE):
+        batch = missing[i:i + NEXAR_BATCH_SIZE]
+        params = ", ".join(f"$mpn{j}: String!" for j in range(len(batch)))
+        aliases = " ".join(f"q{j}: supSearch(q: $mpn{j}, limit: 1) {{{_SUPSEARCH_FIELDS}}}" for j in range(len(batch)))
+        query = f"query Batch({params}) {{ {aliases} }}"
+        try:
+            data = _nexar_query(query, {f"mpn{j}": a for j, a in enumerate(batch)}, octopart_api_key).get("data") or {}
+        except Exception as e:
+            print(f"Octopart-Sammelabfrage fehlgeschlagen: {e}")
+            data = {}
+        for j, article in enumerate(batch):
+            if f"q{j}" not in data:
+                # Kein Ergebnis für diesen Alias (Fehler): nicht cachen
+                results[article] = None
+                continue
+            try:
+                results[article] = _parse_supsearch(data[f"q{j}"])
+            except Exception as e:
+                print(f"Octopart-Parsing-Fehler: {e}")
+                results[article] = None
+                continue
+            price_cache.store("Octopart", article, results[article])
+    return results
@@ -1,19 +1,182 @@
 # Dieses Modul fragt alle Online-Preisquellen gleichzeitig ab.
 
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import tracing
 from ac_price_module import ac_price
-from mouser_module import mouser_price
-from octopart_module import octopart_price_nexar
+from mouser_module import mouser_price, mouser_price_batch
+from octopart_module import octopart_price_nexar, octopart_price_nexar_batch
+from config import ONLINE_LOOKUP_DEADLINE, ONLINE_BATCH_DEADLINE_PER_PART, ONLINE_MAX_WORKERS, SUPPLIER_MAX_CONCURRENCY
 
-def get_online_results(artikelnummer):
+# Reihenfolge bestimmt die Spaltenreihenfolge im Ergebnis
+ONLINE_SOURCES = [
+    ("Automotive-Connectors", ac_price),
+    ("Mouser", mouser_price),
+    ("Octopart", octopart_price_nexar),
+]
+
+# Quellen mit Sammelabfrage (Funktion erhält eine Liste von Teilen und liefert Dict Teil -> Ergebnis)
+BATCH_SOURCES = {
+    "Mouser": mouser_price_batch,
+    "Octopart": octopart_price_nexar_batch,
+}
+
+# Gemeinsamer Thread-Pool; so groß wie die Summe der Quellen-Limits, damit gestartete Abfragen nie warten müssen
+_executor = ThreadPoolExecutor(max_workers=ONLINE_MAX_WORKERS, thread_name_prefix="online")
+
+# Begrenzt die gleichzeitigen Anfragen je Quelle (z.B. um Sperren durch den Anbieter zu vermeiden).
+# Ein Platz wird vor dem Start belegt und erst freigegeben, wenn die Abfrage wirklich endet (auch nach der Deadline).
+_source_limits = {name: threading.BoundedSemaphore(SUPPLIER_MAX_CONCURRENCY.get(name, 2)) for name, _ in ONLINE_SOURCES}
+
+def _cancelled(cancel_event):
+    return cancel_event is not None and cancel_event.is_set()
+
+def _timed_call(name, func, artikelnummer, cancel_event=None, refresh=False):
+    if _cancelled(cancel_event):
+        return None, 0.0
+    start = time.perf_counter()
+    with tracing.span(f"online.{name}"):
+        result = func(artikelnummer, refresh=refresh)
+    duration = time.perf_counter() - start
+    if tracing.is_enabled():
+        # Sammelabfragen erhalten eine Liste von Teilen und liefern ein Dict Teil -> Ergebnis
+        found = [bool(v) for v in (result or {}).values()] if isinstance(artikelnummer, list) else [bool(result)]
+        tracing.count(f"online.{name}", "hit", sum(found))
+        tracing.count(f"online.{name}", "miss", len(found) - sum(found))
+    return result, duration
+
+def _submit(name, func, artikelnummer, cancel_event, refresh):
+    # Den beim Start belegten Platz freigeben, auch wenn die Limits inzwischen ersetzt wurden
+    limit = _source_limits[name]
+    future = _executor.submit(tracing.bind(_timed_call), name, func, artikelnummer, cancel_event, refresh)
+    future.add_done_callback(lambda _: limit.release())
+    return future
+
+def _run_calls(calls, end_time, cancel_event=None, refresh=False):
+    """
+    Startet die Abfragen (Schlüssel, Quelle, Funktion, Argument), sobald die Quelle einen freien Platz hat, und wartet
+    bis end_time (time.monotonic). Keine Abfrage blockiert dabei einen Pool-Thread: ist eine Quelle ausgelastet
+    (z.B. durch hängende Anfragen), bleibt die Abfrage ungestartet. Gibt (fertig: Schlüssel -> Future, offen: Schlüssel)
+    zurück; offen sind Abfragen, die bis zur Deadline nicht fertig oder gar nicht gestartet wurden.
+    """
+    waiting = list(calls)
+    running = {}
+    while not _cancelled(cancel_event):
+        still_waiting = []
+        for call in waiting:
+            key, name, func, arg = call
+            if _source_limits[name].acquire(blocking=False):
+                running[key] = _submit(name, func, arg, cancel_event, refresh)
+            else:
+                still_waiting.append(call)
+        waiting = still_waiting
+        pending = [f for f in running.values() if not f.done()]
+        remaining = end_time - time.monotonic()
+        if (not pending and not waiting) or remaining <= 0:
+            break
+        # In kurzen Abständen prüfen, damit ein Abbruch schnell greift und frei gewordene Plätze genutzt werden
+        if pending:
+            wait(pending, timeout=min(remaining, 0.2), return_when=FIRST_COMPLETED)
+        else:
+            time.sleep(min(remaining, 0.05))
+    if _cancelled(cancel_event):
+        for future in running.values():
+            future.cancel()
+    done = {key: f for key, f in running.items() if f.done() and not f.cancelled()}
+    return done, [call[0] for call in calls if call[0] not in done]
+
+def _is_valid_part(artikelnummer):
+    return bool(artikelnummer) and isinstance(artikelnummer, str) and artikelnummer.lower() != 'nan'
+
+@tracing.traced("get_online_results")
+def get_online_results(artikelnummer, deadline=ONLINE_LOOKUP_DEADLINE, latencies=None, cancel_event=None, refresh=False):
+    """
+    Fragt alle Quellen parallel ab. Quellen, die bis zur Deadline nicht antworten,
+    werden übersprungen (Teilergebnis). Wird ein Dict für 'latencies' übergeben, wird
+    darin die Antwortzeit pro Quelle in Sekunden eingetragen (None = Zeitüberschreitung).
+    Ist 'cancel_event' gesetzt, wird nicht weiter auf ausstehende Quellen gewartet.
+    Mit refresh=True wird der lokale Preis-Cache umgangen und neu befüllt.
+    """
     results = []
-    if artikelnummer and isinstance(artikelnummer, str) and artikelnummer and artikelnummer.lower() != 'nan':
-        ac_res = ac_price(artikelnummer)
-        if ac_res:
-            results.append(ac_res)
-        mouser_res = mouser_price(artikelnummer)
-        if mouser_res:
-            results.append(mouser_res)
-        octopart_res = octopart_price_nexar(artikelnummer)
-        if octopart_res:
-            results.append(octopart_res)
+    if _is_valid_part(artikelnummer):
+        calls = [(name, name, func, artikelnummer) for name, func in ONLINE_SOURCES]
+        done, _ = _run_calls(calls, time.monotonic() + deadline, cancel_event, refresh)
+        if _cancelled(cancel_event):
+            return []
+        for name, _ in ONLINE_SOURCES:
+            if name not in done:
+                print(f"[ONLINE] {name}: keine Antwort innerhalb von {deadline} s für '{artikelnummer}'")
+                tracing.count(f"online.{name}", "timeout")
+                if latencies is not None:
+                    latencies[name] = None
+                continue
+            try:
+                res, duration = done[name].result()
+            except Exception as e:
+                print(f"[ONLINE] {name}: Fehler für '{artikelnummer}': {e}")
+                continue
+            if latencies is not None:
+                latencies[name] = duration
+            if res:
+                results.append(res)
     return results
+
+@tracing.traced("get_online_results_batch")
+def get_online_results_batch(artikelnummern, deadline=None, latencies=None, cancel_event=None, refresh=False):
+    """
+    Fragt mehrere Teile auf einmal ab: Quellen mit Sammelabfrage (BATCH_SOURCES) erhalten die ganze Liste,
+    die übrigen werden pro Teil gestartet, sobald die Quelle einen freien Platz hat. Gibt ein Dict Teil -> Ergebnisliste
+    zurück, jede Liste hat dieselbe Form wie bei get_online_results.
+    Die Deadline (Standard: ONLINE_LOOKUP_DEADLINE plus ONLINE_BATCH_DEADLINE_PER_PART je Teil) gilt für den ganzen
+    Block; Teile ohne Antwort bis dahin fehlen im Ergebnis der Quelle und werden als Zeitüberschreitung gemeldet.
+    """
+    parts = list(dict.fromkeys(a for a in artikelnummern if _is_valid_part(a)))
+    if deadline is None:
+        deadline = ONLINE_LOOKUP_DEADLINE + ONLINE_BATCH_DEADLINE_PER_PART * len(parts)
+    calls = []
+    for name, func in ONLINE_SOURCES:
+        batch_func = BATCH_SOURCES.get(name)
+        if batch_func is not None:
+            calls.append(((name, None), name, batch_func, parts))
+        else:
+            calls.extend(((name, part), name, func, part) for part in parts)
+    done, _ = _run_calls(calls, time.monotonic() + deadline, cancel_event, refresh)
+    if _cancelled(cancel_event):
+        return {a: [] for a in artikelnummern}
+
+    def result_of(key, name):
+        try:
+            return done[key].result()
+        except Exception as e:
+            print(f"[ONLINE] {name}: Fehler bei der Sammelabfrage: {e}")
+            return None, 0.0
+
+    results = {a: [] for a in artikelnummern}
+    for name, _ in ONLINE_SOURCES:
+        keys = [(name, None)] if name in BATCH_SOURCES else [(name, part) for part in parts]
+        missing = [key for key in keys if key not in done]
+        if missing:
+            n_missing = len(parts) if name in BATCH_SOURCES else len(missing)
+            print(f"[ONLINE] {name}: {n_missing} von {len(parts)} Teilen ohne Antwort innerhalb von {deadline:.0f} s")
+            tracing.count(f"online.{name}", "timeout", n_missing)
+        total = 0.0
+        for key in keys:
+            if key in missing:
+                continue
+            res, duration = result_of(key, name)
+            total += duration
+            if name in BATCH_SOURCES:
+                for part in parts:
+                    if (res or {}).get(part):
+                        results[part].append(res[part])
+            elif res:
+                results[key[1]].append(res)
+        if latencies is not None:
+            latencies[name] = None if missing else total
+    return results
+
+def format_latencies(latencies):
+    """Erzeugt eine kurze Textzusammenfassung der Antwortzeiten, z.B. für die Statusleiste."""
+    parts = [f"{name}: {'Timeout' if dur is None else f'{dur:.1f} s'}" for name, dur in latencies.items()]
+    return "Online-Antwortzeiten – " + ", ".join(parts) if parts else ""
@@ -0,0 +1,105 @@
+# Dieses Modul stellt einen lokalen Cache (SQLite) für Online-Preise bereit, damit Teile nicht bei jeder Suche neu abgefragt werden.
+
+import json
+import sqlite3
+import threading
+import time
+import functools
+from config import (PRICE_CACHE_FILE, PRICE_CACHE_TTL, PRICE_CACHE_NEGATIVE_TTL, PRICE_CACHE_MAX_ENTRIES,
+                    PRICE_CACHE_PRUNE_INTERVAL)
+
+_lock = threading.Lock()
+_conn = None
+_stores_since_prune = 0
+
+def _get_conn():
+    global _conn
+    if _conn is None:
+        _conn = sqlite3.connect(PRICE_CACHE_FILE, check_same_thread=False)
+        _conn.execute(
+            "CREATE TABLE IF NOT EXISTS price_cache ("
+            " source TEXT NOT NULL, part TEXT NOT NULL, value TEXT,"
+            " fetched_at REAL NOT NULL, last_access REAL NOT NULL,"
+            " PRIMARY KEY (source, part))"
+        )
+        _conn.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON price_cache (last_access)")
+        _prune(_conn)
+        _conn.commit()
+    return _conn
+
+def _prune(conn):
+    """Größe begrenzen: am längsten nicht genutzte Einträge entfernen (LRU)."""
+    count = conn.execute("SELECT COUNT(*) FROM price_cache").fetchone()[0]
+    if count > PRICE_CACHE_MAX_ENTRIES:
+        conn.execute(
+            "DELETE FROM price_cache WHERE rowid IN "
+            "(SELECT rowid FROM price_cache ORDER BY last_access LIMIT ?)",
+            (count - PRICE_CACHE_MAX_ENTRIES,),
+        )
+
+def normalize_part(article):
+    return str(article).strip().upper()
+
+def lookup(source, article):
+    """Gibt (Treffer, Wert) zurück. Wert ist None bei einem gecachten 'nicht gefunden'."""
+    part = normalize_part(article)
+    now = time.time()
+    with _lock:
+        conn = _get_conn()
+        row = conn.execute(
+            "SELECT value, fetched_at FROM price_cache WHERE source = ? AND part = ?", (source, part)
+        ).fetchone()
+        if row is None:
+            return False, None
+        value, fetched_at = row
+        ttl = PRICE_CACHE_TTL.get(source, 0) if value is not None else PRICE_CACHE_NEGATIVE_TTL
+        if now - fetched_at > ttl:
+            return False, None
+        conn.execute("UPDATE price_cache SET last_access = ? WHERE source = ? AND part = ?", (now, source, part))
+        conn.commit()
+    return True, json.loads(value) if value is not None else None
+
+def store(source, article, value):
+    global _stores_since_prune
+    part = normalize_part(article)
+    now = time.time()
+    with _lock:
+        conn = _get_conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO price_cache (source, part, value, fetched_at, last_access) VALUES (?, ?, ?, ?, ?)",
+            (source, part, json.dumps(value) if value is not None else None, now, now),
+        )
+        # COUNT(*) durchläuft die ganze Tabelle, daher nicht bei jedem Eintrag
+        _stores_since_prune += 1
+        if _stores_since_prune >= PRICE_CACHE_PRUNE_INTERVAL:
+            _stores_since_prune = 0
+            _prune(conn)
+        conn.commit()
+
+def clear(source=None):
+    """Leert den Cache komplett oder nur für eine Quelle."""
+    with _lock:
+        conn = _get_conn()
+        if source is None:
+            conn.execute("DELETE FROM price_cache")
+        else:
+            conn.execute("DELETE FROM price_cache WHERE source = ?", (source,))
+        conn.commit()
+
+def cached(source):
+    """
+    Decorator für Abfragefunktionen der Online-Quellen. Ergebnisse (auch None = nicht gefunden)
+    werden gespeichert. Ausnahmen werden nicht gecacht. Mit refresh=True wird der Cache umgangen.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(article, *args, refresh=False, **kwargs):
+            if not refresh:
+                hit, value = lookup(source, article)
+                if hit:
+                    return value
+            value = func(article, *args, **kwargs)
+            store(source, article, value)
+            return value
+        return wrapper
+    return decorator
@@ -0,0 +1,141 @@
+# Dieses Modul bildet Preiseinträge typisiert ab (Datum, Preis, Losgröße, Quelle) statt als vier Objektzellen untereinander.
+# In das 4-Zeilen-Layout der Excel-Datenbank wird nur beim Anzeigen, Exportieren und Zurückschreiben umgewandelt.
+
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+from config import BLOCK_SIZE, BLOCK_ROWS, STALE_AFTER_DAYS
+
+# Datumsangaben im Format TT.MM.JJJJ (wie von strptime akzeptiert)
+_DATE_PATTERN = r"\d{1,2}\.\d{1,2}\.\d{4}"
+_DATE_DTYPE = "datetime64[us]"
+
+def _to_datetime64(values):
+    """Datum-Zellen (Timestamp/datetime, TT.MM.JJJJ oder Unix-Timestamp) -> datetime64-Array, sonst NaT."""
+    cells = pd.Series(values, dtype=object)
+    out = pd.Series(pd.NaT, index=cells.index, dtype=_DATE_DTYPE)
+    is_dt = cells.map(lambda x: isinstance(x, datetime)).astype(bool)
+    if is_dt.any():
+        out[is_dt] = pd.to_datetime(cells[is_dt]).astype(_DATE_DTYPE)
+    text = cells[~is_dt].map(str).str.strip()
+    # Unix-Timestamps (Sekunden oder Millisekunden)
+    is_ts = text.str.isdigit() & (text.str.len() >= 12)
+    if is_ts.any():
+        ts = pd.to_numeric(text[is_ts], errors="coerce")
+        ts = ts.where(ts <= 1e12, ts // 1000)
+        out.loc[is_ts[is_ts].index] = pd.to_datetime(ts, unit="s", errors="coerce").astype(_DATE_DTYPE)
+    is_date = ~is_ts & text.str.fullmatch(_DATE_PATTERN)
+    if is_date.any():
+        out.loc[is_date[is_date].index] = pd.to_datetime(text[is_date], format="%d.%m.%Y", errors="coerce").astype(_DATE_DTYPE)
+    return out.to_numpy()
+
+def _to_float(values):
+    """Preis-Zellen (Zahl oder Text wie "1,23 €") -> float-Array, sonst NaN."""
+    cells = pd.Series(values, dtype=object)
+    text = cells.map(lambda x: x.replace("€", "").replace(" ", "").replace(",", ".") if isinstance(x, str) else x)
+    return pd.to_numeric(text, errors="coerce").to_numpy(dtype=float)
+
+class PriceRecord:
+    """Ein einzelner Preiseintrag, z. B. ein Ergebnis einer Online-Quelle."""
+    __slots__ = ("column", "date", "price", "lot", "source")
+
+    def __init__(self, column, date, price, lot, source):
+        self.column = column
+        self.date = date
+        self.price = price
+        self.lot = lot
+        self.source = source
+
+    @classmethod
+    def from_online(cls, res):
+        """Aus dem Ergebnis-Dict einer Online-Quelle; fehlende Felder bleiben leer."""
+        date = _to_datetime64([res.get("Datum", "")])[0]
+        price = _to_float([res.get("Preis")])[0]
+        # Fehlende Losgröße (None, "", NaN) bleibt leer, sie ist nicht 0 Stück
+        lot = _to_float([res.get("Losgröße")])[0]
+        return cls(
+            res.get("Quelle", "Online"),
+            pd.Timestamp(date) if not np.isnat(date) else None,
+            float(price) if not np.isnan(price) else None,
+            int(lot) if not np.isnan(lot) else None,
+            res.get("Quelle", ""),
+        )
+
+    def to_block(self):
+        """Die vier Zellen im Excel-Layout (Datum, Preis, Losgröße, Quelle)."""
+        return [self.date, self.price, self.lot, self.source]
+
+class PriceTable:
+    """
+    Spaltenorientierte Preisdaten: ein Eintrag je (Block, Preisspalte) mit NumPy-Arrays
+    für Datum (datetime64), Preis (float64) und Losgröße (float64, NaN = fehlt); die Quelle als Kategorie.
+    Ganzzahlige Losgrößen entstehen erst bei der Ausgabe (records).
+    """
+    __slots__ = ("columns", "n_rows", "block", "column", "date", "price", "lot", "source")
+
+    def __init__(self, columns, n_rows, block, column, date, price, lot, source):
+        self.columns = columns
+        self.n_rows = n_rows
+        self.block = block
+        self.column = column
+        self.date = date
+        self.price = price
+        self.lot = lot
+        self.source = source
+
+    @classmethod
+    def from_blocks(cls, df, block_size=BLOCK_SIZE):
+        """
+        Liest alle Preisblöcke aus dem 4-Zeilen-Layout. Eine Spalte eines Blocks zählt als
+        Preiseintrag, wenn in der Quelle-Zeile ein Text steht.
+        """
+        values = df.to_numpy(dtype=object)
+        n_rows, n_cols = values.shape
+        n_blocks = -(-n_rows // block_size)
+        cube = np.full((n_blocks * block_size, n_cols), None, dtype=object)
+        cube[:n_rows] = values
+        cube = cube.reshape(n_blocks, block_size, n_cols)
+
+        quelle = cube[:, BLOCK_ROWS["Quelle"], :]
+        is_entry = np.frompyfunc(lambda x: isinstance(x, str) and x.strip() != "", 1, 1)(quelle).astype(bool)
+        block, column = np.nonzero(is_entry)
+        return cls(
+            list(df.columns),
+            n_rows,
+            block.astype(np.int32),
+            column.astype(np.int16),
+            _to_datetime64(cube[block, BLOCK_ROWS["Datum"], column]),
+            _to_float(cube[block, BLOCK_ROWS["Preis"], column]),
+            # Fehlende Losgrößen bleiben NaN (nicht 0 Stück)
+            _to_float(cube[block, BLOCK_ROWS["Losgröße"], column]),
+            pd.Categorical(quelle[block, column].astype(str)),
+        )
+
+    def __len__(self):
+        return len(self.block)
+
+    @property
+    def nbytes(self):
+        return (self.block.nbytes + self.column.nbytes + self.date.nbytes + self.price.nbytes
+                + self.lot.nbytes + self.source.nbytes)
+
+    def records(self, complete=False):
+        """Einträge als PriceRecord; mit complete=True nur solche mit Datum, Preis und Losgröße."""
+        for i in range(len(self)):
+            date, price, lot = self.date[i], self.price[i], self.lot[i]
+            if complete and (np.isnat(date) or np.isnan(price) or np.isnan(lot)):
+                continue
+            yield PriceRecord(
+                self.columns[self.column[i]],
+                pd.Timestamp(date) if not np.isnat(date) else None,
+                float(price) if not np.isnan(price) else None,
+                int(lot) if not np.isnan(lot) else None,
+                self.source[i],
+            )
+
+    def stale_rows(self, stale_days=STALE_AFTER_DAYS, block_size=BLOCK_SIZE):
+        """Zeilenindizes aller Blöcke mit einem Preisdatum älter als 'stale_days'."""
+        cutoff = np.datetime64(datetime.today() - timedelta(days=stale_days), "us")
+        stale_blocks = np.unique(self.block[self.date < cutoff])
+        rows = np.arange(self.n_rows)
+        return rows[np.isin(rows // block_size, stale_blocks)].tolist()
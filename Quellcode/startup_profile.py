@@ -0,0 +1,60 @@
+# Dieses Modul misst den Programmstart: Zeitpunkte der Startphasen und die Importzeiten einzelner Module (ähnlich "python -X importtime").
+# Aktivierung: python main.py --profile-startup oder Umgebungsvariable PREIS_STARTUP_PROFILE=1
+
+import builtins
+import os
+import sys
+import threading
+import time
+
+_start = time.perf_counter()
+_enabled = False
+_reported = False
+_phases = []
+_imports = {}
+_original_import = builtins.__import__
+_lock = threading.Lock()
+
+def _timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+    # Nur erstmalige, absolute Importe messen (kumuliert inklusive Unter-Importe)
+    if level or name in sys.modules:
+        return _original_import(name, globals, locals, fromlist, level)
+    start = time.perf_counter()
+    try:
+        return _original_import(name, globals, locals, fromlist, level)
+    finally:
+        elapsed = time.perf_counter() - start
+        with _lock:
+            _imports.setdefault(name, (elapsed, threading.current_thread().name))
+
+def enable():
+    """Schaltet die Messung ein; sollte vor den übrigen Importen aufgerufen werden."""
+    global _enabled
+    if not _enabled:
+        _enabled = True
+        builtins.__import__ = _timed_import
+
+def enabled_by_request(argv=None):
+    argv = sys.argv if argv is None else argv
+    return "--profile-startup" in argv or os.getenv("PREIS_STARTUP_PROFILE") == "1"
+
+def mark(phase):
+    """Merkt sich den Zeitpunkt einer Startphase (ohne Wirkung, wenn die Messung aus ist)."""
+    if _enabled:
+        with _lock:
+            _phases.append((phase, time.perf_counter() - _start))
+
+def report(top=15):
+    """Gibt Startphasen und die langsamsten Importe einmalig aus."""
+    global _reported
+    if not _enabled or _reported:
+        return
+    _reported = True
+    builtins.__import__ = _original_import
+    print("--- Startzeiten ---")
+    for phase, t in _phases:
+        print(f"{t*1000:8.0f} ms  {phase}")
+    print(f"--- Langsamste Importe (kumuliert, Top {top}) ---")
+    slowest = sorted(_imports.items(), key=lambda item: item[1][0], reverse=True)[:top]
+    for name, (elapsed, thread) in slowest:
+        print(f"{elapsed*1000:8.0f} ms  {name} [{thread}]")
@@ -0,0 +1,119 @@
+# Dieses Modul begrenzt die Anfragerate pro Online-Quelle und sperrt Quellen nach wiederholten Fehlern vorübergehend.
+
+import threading
+import time
+from config import SUPPLIER_HOSTS, SUPPLIER_RATE_LIMITS, CIRCUIT_BREAKER_THRESHOLD, CIRCUIT_BREAKER_COOLDOWN
+
+class SupplierUnavailable(Exception):
+    """Die Quelle ist nach wiederholten Fehlern vorübergehend gesperrt."""
+
+class TokenBucket:
+    """Token-Bucket: 'rate' Anfragen pro Sekunde, bis zu 'capacity' direkt hintereinander."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+class CircuitBreaker:
+    """
+    Öffnet nach 'threshold' Fehlern in Folge für 'cooldown' Sekunden; danach ist genau ein Testaufruf erlaubt.
+    Bis dieser Erfolg oder Fehler meldet, werden alle anderen Aufrufer abgewiesen.
+    """
+
+    def __init__(self, threshold, cooldown):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.half_open_in_flight = False
+        self.trial_started = 0.0
+        self.lock = threading.Lock()
+
+    def allow(self):
+        with self.lock:
+            now = time.monotonic()
+            # Meldet sich der Testaufruf nicht (z.B. abgebrochener Thread), ist nach 'cooldown' ein neuer erlaubt
+            if self.half_open_in_flight and now - self.trial_started < self.cooldown:
+                return False
+            if self.opened_at is None:
+                return True
+            if now - self.opened_at >= self.cooldown:
+                # Halb offen: dieser Aufrufer ist der Testaufruf
+                self.half_open_in_flight = True
+                self.trial_started = now
+                return True
+            return False
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.half_open_in_flight = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            # Ein fehlgeschlagener Testaufruf sperrt sofort wieder für 'cooldown'
+            if self.half_open_in_flight or self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+            self.half_open_in_flight = False
+
+    def is_testing(self):
+        with self.lock:
+            return self.half_open_in_flight
+
+    def remaining(self):
+        """Verbleibende Sperrzeit in Sekunden (0 = nicht gesperrt)."""
+        with self.lock:
+            if self.opened_at is None:
+                return 0.0
+            return max(0.0, self.cooldown - (time.monotonic() - self.opened_at))
+
+class SupplierGuard:
+    def __init__(self, name, rate, capacity):
+        self.name = name
+        self.bucket = TokenBucket(rate, capacity)
+        self.breaker = CircuitBreaker(CIRCUIT_BREAKER_THRESHOLD, CIRCUIT_BREAKER_COOLDOWN)
+
+    def before_request(self):
+        if not self.breaker.allow():
+            if self.breaker.is_testing():
+                raise SupplierUnavailable(f"{self.name} ist vorübergehend gesperrt (Testanfrage läuft)")
+            raise SupplierUnavailable(f"{self.name} ist vorübergehend gesperrt "
+                                      f"(noch {self.breaker.remaining():.0f} s)")
+        self.bucket.acquire()
+
+_guards = {name: SupplierGuard(name, *SUPPLIER_RATE_LIMITS.get(name, (2.0, 2))) for name in SUPPLIER_HOSTS}
+_guards_by_host = {host: _guards[name] for name, host in SUPPLIER_HOSTS.items()}
+
+def guard_for_host(host):
+    return _guards_by_host.get(host)
+
+def set_rate_limit(name, rate, capacity):
+    """Ersetzt die Ratenbegrenzung einer Quelle zur Laufzeit (z.B. für Messungen gegen einen lokalen Server)."""
+    _guards[name].bucket = TokenBucket(rate, capacity)
+
+def get_breaker_states():
+    """Verbleibende Sperrzeit pro Quelle (nur gesperrte Quellen)."""
+    return {name: g.breaker.remaining() for name, g in _guards.items() if g.breaker.remaining() > 0}
+
+def format_breaker_status():
+    states = get_breaker_states()
+    if not states:
+        return ""
+    return "Gesperrt: " + ", ".join(f"{name} (noch {sec:.0f} s)" for name, sec in states.items())
@@ -0,0 +1,81 @@
+# Die Module liegen flach in Quellcode/ und importieren sich gegenseitig über den Modulnamen.
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import threading
+import types
+import pytest
+
+class FakeWidget:
+    """Ersatz für Tk-Widgets und -Variablen (ohne Anzeige): merkt sich config()- und set()-Werte."""
+    def __init__(self, value=None):
+        self.value = value
+        self.options = {}
+
+    def config(self, **kwargs):
+        self.options.update(kwargs)
+
+    configure = config
+
+    def __setitem__(self, key, value):
+        self.options[key] = value
+
+    def __getitem__(self, key):
+        return self.options[key]
+
+    def set(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+class FakeRoot:
+    """Führt root.after(0, ...) sofort aus, spätere Aufrufe (Timer) werden nur gezählt."""
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, ms, func, *args):
+        if ms == 0:
+            func(*args)
+        else:
+            self.scheduled.append((ms, func))
+        return len(self.scheduled)
+
+    def after_cancel(self, job):
+        pass
+
+@pytest.fixture
+def fake_ui():
+    """UIManager-Ersatz für EventHandlers; show_table und Meldungen werden in ui.shown/ui.messages gesammelt."""
+    ui = types.SimpleNamespace(root=FakeRoot(), shown=[], messages=[])
+    for name in ("entry", "search_btn", "bom_btn", "cancel_btn", "update_db_btn", "progress_var",
+                 "status_label", "supplier_status_label", "trace_label", "tree"):
+        setattr(ui, name, FakeWidget())
+    ui.fuzzy_var = FakeWidget(True)
+    ui.use_online_var = FakeWidget(False)
+    ui.refresh_cache_var = FakeWidget(False)
+    ui.show_table = lambda df, veraltet_indices=None: ui.shown.append((df, veraltet_indices))
+    ui.show_suggestions = lambda values, open_list=False: ui.entry.config(values=values, opened=open_list)
+    return ui
+
+@pytest.fixture
+def handlers(fake_ui, monkeypatch):
+    """EventHandlers ohne Laden der Datenbank, Hintergrund-Threads laufen sofort im Test-Thread."""
+    import event_handlers
+
+    class InlineThread:
+        def __init__(self, target, daemon=None):
+            self.target = target
+
+        def start(self):
+            self.target()
+
+    monkeypatch.setattr(event_handlers, "threading", types.SimpleNamespace(Thread=InlineThread, Event=threading.Event))
+    monkeypatch.setattr(event_handlers.messagebox, "showinfo", lambda *args, **kw: fake_ui.messages.append(args))
+    monkeypatch.setattr(event_handlers.messagebox, "showerror", lambda *args, **kw: fake_ui.messages.append(args))
+    monkeypatch.setattr(event_handlers.EventHandlers, "initialize_db", lambda self: None)
+    monkeypatch.setattr(event_handlers.EventHandlers, "refresh_supplier_status", lambda self: None)
+    return event_handlers.EventHandlers(fake_ui)
@@ -0,0 +1,35 @@
+import glob
+import os
+import pytest
+
+pytest.importorskip("bs4")
+import ac_price_module
+from ac_price_module import _DETAIL_STRAINER, _SEARCH_STRAINER, _extract_detail_page, _extract_search_page, _parse
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmark_fixtures")
+
+def _read(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+def test_multi_class_search_box_yields_price():
+    # <div class="product-box box-standard"> und <tr class="product-block-prices-row is-tier">
+    result, link = _extract_search_page(_parse(_read("ac_search.html"), _SEARCH_STRAINER))
+    assert link is None
+    assert result["Losgröße"] == 1000
+    assert result["Preis"] == pytest.approx(0.87 * 0.7)
+
+def test_multi_class_search_box_without_price_yields_link():
+    result, link = _extract_search_page(_parse(_read("ac_search_noprice.html"), _SEARCH_STRAINER))
+    assert result is None
+    assert link.endswith("/en/p/{{MPN}}")
+
+def test_multi_class_detail_rows_yield_price():
+    result = _extract_detail_page(_parse(_read("ac_detail.html"), _DETAIL_STRAINER))
+    assert result["Losgröße"] == 1000
+
+def test_benchmark_parse_matches_full_parse():
+    fixtures = [(os.path.basename(p), _read(p), "detail" if "detail" in p else "search")
+                for p in sorted(glob.glob(os.path.join(FIXTURES, "ac_*.html")))]
+    assert len(fixtures) == 3
+    assert ac_price_module.benchmark_parse(fixtures, repeat=1)
@@ -0,0 +1,54 @@
+import json
+import numpy as np
+import benchmark
+from bom_tools import iter_bom_parts
+from config import BLOCK_SIZE, SEARCH_COLS
+from excel_search import build_search_index
+
+def test_synthetic_db_has_block_layout_and_is_reproducible():
+    df = benchmark.make_db(500, seed=3)
+
+    assert len(df) == 500 * BLOCK_SIZE
+    mpn = df["WN_HerstellerBestellnummer_1"]
+    assert mpn.iloc[::BLOCK_SIZE].notna().all() and mpn.drop(index=mpn.index[::BLOCK_SIZE]).isna().all()
+    # Jede Herstellernummer und SAP-Nummer genau einmal, jeweils in der ersten Blockzeile
+    index = build_search_index(df, SEARCH_COLS)
+    assert len(index) == 2 * 500 and all(p == [p[0]] and p[0] % BLOCK_SIZE == 0 for p in index.values())
+    assert df.equals(benchmark.make_db(500, seed=3))
+    # Preisspalten füllen sich von links
+    filled = df[benchmark._PRICE_COLUMNS].iloc[3::BLOCK_SIZE].notna().to_numpy()
+    assert not (filled[:, 1:] & ~filled[:, :-1]).any()
+    assert 0.2 < filled[:, 0].mean() < 0.4
+
+def test_synthetic_bom_is_readable_with_expected_hit_ratio(tmp_path):
+    df = benchmark.make_db(200)
+    path = str(tmp_path / "bom.csv")
+    parts = benchmark.write_bom(path, df, 50, hit_ratio=0.8)
+
+    read = list(iter_bom_parts(path))
+    assert read == list(dict.fromkeys(parts)) and len(read) == 50
+    index = build_search_index(df, SEARCH_COLS)
+    assert sum(part in index for part in read) == 40
+
+def test_small_run_records_all_stages_and_compares(tmp_path, monkeypatch, capsys):
+    import supplier_guard
+    # bench_online hebt die Ratenbegrenzung auf; für die übrigen Tests wiederherstellen
+    for guard in supplier_guard._guards.values():
+        monkeypatch.setattr(guard, "bucket", guard.bucket)
+    out = tmp_path / "ergebnis.json"
+    args = ["--sizes", "200", "--bom-parts", "20", "--online-parts", "8", "--queries", "10", "--repeat", "1",
+            "--latency", "0", "--json", str(out)]
+
+    assert benchmark.main(args) == 0
+    report = json.loads(out.read_text(encoding="utf-8"))
+    names = [r["name"] for r in report["results"]]
+    for stage in ("DB laden (JSON)", "Suchindex aufbauen", "Einzelsuche (DB)", "BOM (offline)",
+                  "Einzelsuche (online)", "BOM (online, ohne Cache)", "BOM (online, Cache)"):
+        assert stage in names
+    assert all(r["size"] == 200 and np.isfinite(r["p50_ms"]) for r in report["results"])
+    # Verbindungsstatistik des Stub-Servers (nicht "0 Verbindungen")
+    stdout = capsys.readouterr().out
+    assert "Verbindungen" in stdout and " 0 Verbindungen" not in stdout
+
+    assert benchmark.main(args[:-2] + ["--offline", "--compare", str(out)]) == 0
+    assert "--- Vergleich mit" in capsys.readouterr().out
@@ -0,0 +1,89 @@
+import threading
+import time
+import pandas as pd
+import pytest
+import event_handlers
+import online_sources
+from bom_service import price_bom
+from config import SEARCH_COLS
+from excel_search import build_search_index
+
+def _db(n):
+    rows = []
+    for i in range(n):
+        rows += [
+            {"WN_SAP-Artikel-NR": f"{1000000000 + i}", "WN_HerstellerBestellnummer_1": f"PART-{i}",
+             "Unnamed: 24": pd.Timestamp.today().normalize()},
+            {"WN_SAP-Artikel-NR": "", "WN_HerstellerBestellnummer_1": None, "Unnamed: 24": 0.5},
+            {"WN_SAP-Artikel-NR": "", "WN_HerstellerBestellnummer_1": None, "Unnamed: 24": 1000},
+            {"WN_SAP-Artikel-NR": "", "WN_HerstellerBestellnummer_1": None, "Unnamed: 24": "SAP"},
+        ]
+    return pd.DataFrame(rows)
+
+@pytest.fixture
+def bom(tmp_path):
+    df = _db(120)
+    path = tmp_path / "bom.csv"
+    path.write_text("x;y\n" * 6 + "Pos;Manufacturer Order No\n" + "".join(f"{i};PART-{i}\n" for i in range(120)),
+                    encoding="utf-8")
+    return df, build_search_index(df, SEARCH_COLS), str(path)
+
+@pytest.fixture
+def hung_source(monkeypatch):
+    """Eine Online-Quelle, die erst beim Aufräumen antwortet."""
+    release = threading.Event()
+
+    def hung(part, refresh=False):
+        release.wait(10)
+        return None
+
+    monkeypatch.setattr(online_sources, "ONLINE_SOURCES", [("Hängt", hung)])
+    monkeypatch.setattr(online_sources, "BATCH_SOURCES", {})
+    monkeypatch.setattr(online_sources, "_source_limits", {"Hängt": threading.BoundedSemaphore(2)})
+    yield
+    release.set()
+
+def test_cancel_during_online_lookup_returns_promptly(bom, hung_source):
+    df, index, path = bom
+    cancel = threading.Event()
+    threading.Timer(0.2, cancel.set).start()
+    start = time.monotonic()
+
+    result = price_bom(df, index, path, use_online=True, cancel_event=cancel)
+
+    assert time.monotonic() - start < 2.0
+    assert result["cancelled"] and result["df"] is None
+    assert result["parts"] == 120
+
+def test_cancel_before_start_reads_nothing(bom):
+    df, index, path = bom
+    cancel = threading.Event()
+    cancel.set()
+    progress = []
+
+    result = price_bom(df, index, path, cancel_event=cancel, on_progress=lambda *a: progress.append(a))
+
+    assert result == {"df": None, "veraltet": [], "parts": 0, "cancelled": True}
+    assert progress == []
+
+def test_offline_result_keeps_bom_order(bom):
+    df, index, path = bom
+    progress = []
+    result = price_bom(df, index, path, on_progress=lambda *a: progress.append(a))
+
+    assert not result["cancelled"] and result["parts"] == 120
+    assert result["df"]["WN_HerstellerBestellnummer_1"].iloc[::4].tolist() == [f"PART-{i}" for i in range(120)]
+    assert progress[-1] == (120, 120)
+
+def test_cancel_button_stops_gui_search(bom, hung_source, handlers, fake_ui, monkeypatch):
+    df, _, path = bom
+    handlers.set_db(df)
+    fake_ui.use_online_var.set(True)
+    monkeypatch.setattr(event_handlers.filedialog, "askopenfilename", lambda **kw: path)
+    threading.Timer(0.2, handlers.cancel_bom).start()
+
+    handlers.load_bom_and_search()
+
+    assert fake_ui.status_label.options["text"] == "BOM-Suche abgebrochen."
+    assert fake_ui.cancel_btn.options["state"] == "disabled"
+    assert fake_ui.shown == [] and fake_ui.messages == []
@@ -0,0 +1,47 @@
+import pytest
+
+openpyxl = pytest.importorskip("openpyxl")
+import pandas as pd
+from bom_tools import iter_bom_parts
+
+def test_xlsx_parts_come_from_first_sheet_like_read_excel(tmp_path):
+    path = str(tmp_path / "bom.xlsx")
+    wb = openpyxl.Workbook()
+    first = wb.active
+    first.title = "BOM"
+    first.append(["Pos", "Manufacturer Order No"])
+    first.append([1, "DTM06-2S"])
+    first.append([2, "SPLICE"])
+    first.append([3, "DTM06-2S"])
+    first.append([4, "1-967616-1"])
+    notes = wb.create_sheet("Notizen")
+    notes.append(["Pos", "Manufacturer Order No"])
+    notes.append([1, "FALSCHES-BLATT"])
+    # Beim Speichern war das zweite Blatt ausgewählt
+    wb.active = 1
+    wb.save(path)
+
+    parts = list(iter_bom_parts(path, header=0))
+    assert parts == ["DTM06-2S", "1-967616-1"]
+    assert parts == [p for p in pd.read_excel(path, header=0)["Manufacturer Order No"].drop_duplicates() if p != "SPLICE"]
+
+def test_csv_delimiter_is_taken_from_header_not_preamble(tmp_path):
+    path = tmp_path / "bom.csv"
+    # Vorspann mit anderer Spaltenzahl (und Kommas) als Kopfzeile und Daten
+    preamble = "Projekt: Kabelbaum A, Rev. 3\nKunde;X\n\nStand, 01.10.2026\n-\nErstellt von; Muster; Abt.; 4\nFreigabe, offen\n"
+    path.write_text(preamble + "Pos;Manufacturer Order No;Menge\n1;ABC-1;2\n2;DTM06-2S;4\n3;ABC-1;1\n", encoding="utf-8")
+
+    assert list(iter_bom_parts(str(path), header=6)) == ["ABC-1", "DTM06-2S"]
+
+def test_csv_single_column_without_delimiter(tmp_path):
+    path = tmp_path / "bom.csv"
+    path.write_text("x;y\n" * 6 + "Manufacturer Order No\nABC-1\nDTM06-2S\n", encoding="utf-8")
+
+    assert list(iter_bom_parts(str(path), header=6)) == ["ABC-1", "DTM06-2S"]
+
+def test_csv_ambiguous_delimiter_is_reported_not_guessed(tmp_path):
+    path = tmp_path / "bom.csv"
+    path.write_text("x;y\n" * 6 + "Pos;Manufacturer Order No\n1;ABC-1;2,5\n2,DTM06-2S\n3|X;Y;Z;W\n", encoding="utf-8")
+
+    with pytest.raises(Exception, match="Trennzeichen"):
+        list(iter_bom_parts(str(path), header=6))
@@ -0,0 +1,66 @@
+import json
+import pandas as pd
+import pytest
+import cli
+from data_manager import save_db
+
+def _db():
+    rows = []
+    # PART-0 mit aktuellem, PART-1 mit veraltetem Preis
+    for i, datum in enumerate((pd.Timestamp.today().normalize(), pd.Timestamp("2020-01-01"))):
+        rows += [
+            {"WN_SAP-Artikel-NR": f"{1000000000 + i}", "WN_HerstellerBestellnummer_1": f"PART-{i}",
+             "Unnamed: 24": datum},
+            {"WN_SAP-Artikel-NR": "", "WN_HerstellerBestellnummer_1": None, "Unnamed: 24": 0.5 + i},
+            {"WN_SAP-Artikel-NR": "", "WN_HerstellerBestellnummer_1": None, "Unnamed: 24": 1000},
+            {"WN_SAP-Artikel-NR": "", "WN_HerstellerBestellnummer_1": None, "Unnamed: 24": "SAP"},
+        ]
+    return pd.DataFrame(rows)
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    # Datenbank und Ausgaben liegen relativ zum Arbeitsverzeichnis
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+def _write_bom(path, parts):
+    path.write_text("x;y\n" * 6 + "Pos;Manufacturer Order No\n" + "".join(f"{i};{p}\n" for i, p in enumerate(parts)),
+                    encoding="utf-8")
+    return str(path)
+
+def test_price_bom_writes_formatted_csv(workdir, capsys):
+    save_db(_db())
+    bom = _write_bom(workdir / "bom.csv", ["PART-1", "UNBEKANNT", "PART-0"])
+
+    assert cli.main(["price-bom", bom, "--out", "ergebnis.csv"]) == 0
+
+    out = pd.read_csv(workdir / "ergebnis.csv", sep=";", dtype=str)
+    assert out["WN_HerstellerBestellnummer_1"].iloc[[0, 4]].tolist() == ["PART-1", "PART-0"]
+    assert out["Unnamed: 24"].iloc[:4].tolist() == ["01.01.2020", "1,50 €", "1000", "SAP"]
+    stdout = capsys.readouterr().out
+    assert "Fortschritt: 3/3" in stdout
+    assert "3 Bauteile, 8 Zeilen, davon 4 veraltet -> ergebnis.csv" in stdout
+
+def test_price_bom_without_database_fails(workdir, capsys):
+    bom = _write_bom(workdir / "bom.csv", ["PART-0"])
+    assert cli.main(["price-bom", bom]) == 2
+    assert "Keine gültige Datenbank" in capsys.readouterr().err
+
+def test_price_bom_without_hits_fails(workdir, capsys):
+    save_db(_db())
+    bom = _write_bom(workdir / "bom.csv", ["UNBEKANNT"])
+    assert cli.main(["price-bom", bom, "--out", "ergebnis.xlsx"]) == 1
+    assert not (workdir / "ergebnis.xlsx").exists()
+    assert "Keine Ergebnisse für BOM gefunden (1 Bauteile)" in capsys.readouterr().err
+
+def test_price_bom_exports_trace(workdir):
+    import tracing
+    save_db(_db())
+    bom = _write_bom(workdir / "bom.csv", ["PART-0"])
+    try:
+        assert cli.main(["price-bom", bom, "--out", "ergebnis.csv", "--trace", "ablauf.json"]) == 0
+    finally:
+        tracing.disable()
+    events = json.loads((workdir / "ablauf.json").read_text(encoding="utf-8"))
+    events = events["traceEvents"] if isinstance(events, dict) else events
+    assert any(e.get("name") == "price_bom" for e in events)
@@ -0,0 +1,41 @@
+import threading
+import time
+import pytest
+import currency
+from config import EXCHANGE_RATE_MAX_AGE
+
+@pytest.fixture
+def rates(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(currency, "_rates", None)
+    monkeypatch.setattr(currency, "_last_attempt", 0.0)
+
+def test_slow_fetch_does_not_block_other_callers(rates, monkeypatch):
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def slow_fetch():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return {"rates": {"EUR": 1.0, "USD": 2.0}, "fetched_at": time.time()}
+
+    monkeypatch.setattr(currency, "_fetch_rates", slow_fetch)
+    fetching = threading.Thread(target=currency.get_rate, args=("USD",))
+    fetching.start()
+    assert started.wait(5)
+    start = time.perf_counter()
+    # Während des Abrufs: sofort der Notfallwert, kein zweiter Abruf
+    assert currency.get_rate("USD") == (currency.FALLBACK_TO_EUR["USD"], None)
+    assert time.perf_counter() - start < 0.5
+    release.set()
+    fetching.join()
+    assert calls == [1]
+    assert currency.get_rate("USD")[0] == 0.5
+
+def test_rate_staleness_is_computed_when_read():
+    now = time.time()
+    assert not currency.result_rate_stale({"Preis": 1.0})
+    assert not currency.result_rate_stale({"Kurs_Stand": now - 60})
+    assert currency.result_rate_stale({"Kurs_Stand": now - EXCHANGE_RATE_MAX_AGE - 60})
+    assert currency.result_rate_stale({"Kurs_Stand": None})
@@ -0,0 +1,41 @@
+import os
+import pandas as pd
+import pytest
+import data_manager
+from config import DB_FEATHER_FILE
+
+pytestmark = pytest.mark.skipif(data_manager.pa is None, reason="pyarrow nicht installiert")
+
+def _db(price):
+    return pd.DataFrame({
+        "WN_HerstellerBestellnummer_1": ["DTM06-2S", None, None, None],
+        "Unnamed: 16": [1.0, 2.0, 3.0, 4.0],
+        "Unnamed: 24": [pd.Timestamp("2025-07-16"), price, 1000, "SAP"],
+    })
+
+def test_save_over_loaded_db_keeps_loaded_frame_intact(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    data_manager.save_db_to_feather(_db(0.5))
+    loaded = data_manager.load_db_from_feather()
+    data_manager.save_db_to_feather(_db(0.75))
+    assert loaded["Unnamed: 16"].tolist() == [1.0, 2.0, 3.0, 4.0]
+    assert loaded["Unnamed: 24"].tolist()[1] == 0.5
+    assert data_manager.load_db_from_feather()["Unnamed: 24"].tolist()[1] == 0.75
+    assert not os.path.exists(DB_FEATHER_FILE + ".tmp")
+
+def test_failed_save_raises_and_keeps_previous_file(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    data_manager.save_db_to_feather(_db(0.5))
+
+    def broken_write(table, path, **kwargs):
+        with open(path, "wb") as f:
+            f.write(b"halb geschrieben")
+        raise OSError("Datenträger voll")
+
+    monkeypatch.setattr(data_manager.feather, "write_feather", broken_write)
+    with pytest.raises(OSError):
+        data_manager.save_db(_db(0.75))
+    monkeypatch.undo()
+    monkeypatch.chdir(tmp_path)
+    assert data_manager.load_db_from_feather()["Unnamed: 24"].tolist()[1] == 0.5
+    assert not os.path.exists(DB_FEATHER_FILE + ".tmp")
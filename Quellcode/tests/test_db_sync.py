@@ -0,0 +1,55 @@
+from datetime import datetime
+import pandas as pd
+import db_sync
+from db_sync import apply_diff, changed_positions, diff_db, has_changes, positions_kept
+
+def _block(sap, mpn, price, datum=pd.Timestamp("2025-07-16"), lot=1000.0):
+    return {
+        "WN_SAP-Artikel-NR": [sap, None, None, None],
+        "WN_HerstellerBestellnummer_1": [mpn, None, None, None],
+        "Unnamed: 24": [datum, price, lot, "Mouser"],
+    }
+
+def _db(*blocks):
+    return pd.concat([pd.DataFrame(b) for b in blocks], ignore_index=True)
+
+OLD = _db(_block(1001.0, "A-1", 0.5), _block(1002.0, "B-2", 0.75), _block(1003.0, "C-3", 1.25))
+
+def test_type_only_differences_are_not_changes():
+    # Wie aus Excel gelesen: SAP-Nummer als Text, Losgröße als int, Datum als datetime, Leerzeichen im Text
+    new = _db(_block("1001", "A-1 ", 0.5, datetime(2025, 7, 16), 1000),
+              _block("1002.0", "B-2", 0.75, datetime(2025, 7, 16), 1000),
+              _block(1003, "C-3", 1.25, datetime(2025, 7, 16), 1000))
+    assert db_sync.block_hashes(OLD) == db_sync.block_hashes(new)
+    assert not has_changes(diff_db(OLD, new))
+
+def test_price_change_is_detected():
+    new = _db(_block(1001, "A-1", 0.5), _block(1002, "B-2", 0.8), _block(1003, "C-3", 1.25))
+    diff = diff_db(OLD, new)
+    assert list(diff["changed"].values()) == [(1, 1)]
+    assert positions_kept(diff)
+    assert changed_positions(diff) == ([4], [])
+    assert apply_diff(OLD, new, diff)["Unnamed: 24"].tolist()[5] == 0.8
+
+def test_insert_in_the_middle_keeps_order_of_new_file():
+    new = _db(_block(1001, "A-1", 0.5), _block(1009, "X-9", 2.0), _block(1002, "B-2", 0.75), _block(1003, "C-3", 1.25))
+    diff = diff_db(OLD, new)
+    result = apply_diff(OLD, new, diff)
+    assert result["WN_HerstellerBestellnummer_1"].tolist()[::4] == ["A-1", "X-9", "B-2", "C-3"]
+    # Unveränderte Blöcke stammen aus der bisherigen Datenbank
+    assert result["WN_SAP-Artikel-NR"].tolist()[::4] == [1001.0, 1009, 1002.0, 1003.0]
+    assert not positions_kept(diff)
+
+def test_append_at_the_end_allows_incremental_index():
+    new = _db(_block(1001, "A-1", 0.5), _block(1002, "B-2", 0.75), _block(1003, "C-3", 1.25), _block(1009, "X-9", 2.0))
+    diff = diff_db(OLD, new)
+    assert positions_kept(diff)
+    assert changed_positions(diff) == ([], [12])
+    assert apply_diff(OLD, new, diff)["WN_HerstellerBestellnummer_1"].tolist()[::4] == ["A-1", "B-2", "C-3", "X-9"]
+
+def test_pure_reordering_is_applied():
+    new = _db(_block(1003, "C-3", 1.25), _block(1001, "A-1", 0.5), _block(1002, "B-2", 0.75))
+    diff = diff_db(OLD, new)
+    assert has_changes(diff) and not positions_kept(diff)
+    assert apply_diff(OLD, new, diff)["WN_HerstellerBestellnummer_1"].tolist()[::4] == ["C-3", "A-1", "B-2"]
+    assert "Reihenfolge" in db_sync.format_diff_summary(diff)
@@ -0,0 +1,107 @@
+import pandas as pd
+from config import SEARCH_COLS
+from excel_search import build_search_index, format_price_blocks, merge_results, search_and_show
+
+# Aktueller Preis (gilt unabhängig vom Testdatum nie als veraltet)
+TODAY = pd.Timestamp.today().normalize()
+
+def _block(sap, mpn, datum, preis=0.64, quelle="SAP"):
+    return [
+        {"WN_SAP-Artikel-NR": sap, "WN_HerstellerBestellnummer_1": mpn, "Unnamed: 24": pd.Timestamp(datum)},
+        {"WN_SAP-Artikel-NR": "", "WN_HerstellerBestellnummer_1": None, "Unnamed: 24": preis},
+        {"WN_SAP-Artikel-NR": "", "WN_HerstellerBestellnummer_1": None, "Unnamed: 24": 1000},
+        {"WN_SAP-Artikel-NR": "", "WN_HerstellerBestellnummer_1": None, "Unnamed: 24": quelle},
+    ]
+
+def _multi_hit_db(hits=5):
+    # Dieselbe Herstellernummer in mehreren Blöcken (verschiedene SAP-Nummern), dazwischen andere Teile
+    rows = _block("1000000099", "WM-2S", TODAY, 0.04)
+    for i in range(hits):
+        rows += _block(f"100000000{i}", "DTM06-2S", "2020-01-01" if i == 1 else TODAY)
+        rows += _block(f"200000000{i}", f"OTHER-{i}", TODAY)
+    return pd.DataFrame(rows)
+
+def test_multi_hit_returns_whole_blocks():
+    df = _multi_hit_db()
+    index = build_search_index(df, SEARCH_COLS)
+    assert len(index["DTM06-2S"]) > 4
+
+    for idx in (index, None):
+        rows = search_and_show(df, "DTM06-2S", SEARCH_COLS, idx)
+        assert len(rows) == 5 * 4
+        assert rows["WN_HerstellerBestellnummer_1"].iloc[::4].tolist() == ["DTM06-2S"] * 5
+        assert rows["WN_HerstellerBestellnummer_1"].iloc[1::4].isna().all()
+
+def test_multi_hit_formats_and_flags_per_block():
+    df = _multi_hit_db()
+    rows = search_and_show(df, "DTM06-2S", SEARCH_COLS, build_search_index(df, SEARCH_COLS))
+    merged, veraltet = merge_results(rows, [])
+
+    # Nur der zweite Treffer (Preis von 2020) ist veraltet, und zwar als ganzer Block
+    assert veraltet == [4, 5, 6, 7]
+    shown = format_price_blocks(merged)
+    assert shown["WN_SAP-Artikel-NR"].iloc[0] == "1000000000"
+    assert shown["Unnamed: 24"].iloc[:4].tolist() == [TODAY.strftime("%d.%m.%Y"), "0,64 €", 1000, "SAP"]
+
+def test_hit_outside_first_row_returns_its_block():
+    df = _multi_hit_db(hits=1)
+    df.loc[6, "WN_HerstellerBestellnummer_1"] = "ALT-NR"
+    rows = search_and_show(df, "ALT-NR", SEARCH_COLS, build_search_index(df, SEARCH_COLS))
+    assert rows.index.tolist() == [4, 5, 6, 7]
+
+def test_format_price_blocks_as_text_formats_every_cell_once():
+    df = _multi_hit_db(hits=1)
+    df["Mouser (-30%)"] = [pd.Timestamp("2026-10-18"), 0.5, 100, "Mouser (-30%)"] + [None] * 8
+    shown = format_price_blocks(df, as_text=True)
+
+    assert all(isinstance(v, str) for v in shown.to_numpy().ravel())
+    assert shown["Mouser (-30%)"].tolist()[:4] == ["18.10.2026", "0,50 €", "100", "Mouser (-30%)"]
+    assert shown["Mouser (-30%)"].tolist()[4:] == [""] * 8
+    # Ohne as_text (Export) bleiben die übrigen Zellen typisiert
+    assert format_price_blocks(df)["Mouser (-30%)"].iloc[2] == 100
+
+def test_index_lookup_matches_search_without_index():
+    df = _multi_hit_db(hits=2).astype({"WN_SAP-Artikel-NR": object})
+    df.loc[0, "WN_SAP-Artikel-NR"] = 1000000099.0  # aus Excel als Zahl gelesen
+    df.loc[4, "WN_HerstellerBestellnummer_1"] = "  DTM06-2S "
+    index = build_search_index(df, SEARCH_COLS)
+
+    assert index["1000000099"] == [0]
+    assert index["DTM06-2S"] == [4, 12]
+    assert "" not in index and "nan" not in index
+    for key in ["1000000099", "DTM06-2S", "OTHER-1", "2000000000", "UNBEKANNT"]:
+        with_index = search_and_show(df, key, SEARCH_COLS, index)
+        without = search_and_show(df, key, SEARCH_COLS)
+        assert (with_index is None and without is None) or with_index.equals(without), key
+
+def test_incremental_index_update_equals_rebuild():
+    from db_sync import apply_diff, changed_positions, diff_db, positions_kept
+    from excel_search import update_search_index
+    old_df = _multi_hit_db(hits=2)
+    loaded = old_df.copy()
+    # Block 3 bekommt einen neuen Preis, hinten kommt ein neuer Block mit einer schon vorhandenen Nummer dazu
+    loaded.loc[13, "Unnamed: 24"] = 0.99
+    loaded = pd.concat([loaded, pd.DataFrame(_block("3000000000", "WM-2S", TODAY))], ignore_index=True)
+
+    diff = diff_db(old_df, loaded)
+    assert positions_kept(diff)
+    new_df = apply_diff(old_df, loaded, diff)
+    replaced, appended = changed_positions(diff)
+    old_index = build_search_index(old_df, SEARCH_COLS)
+    new_index = update_search_index(old_index, old_df, new_df, replaced + appended, SEARCH_COLS)
+
+    assert new_index == build_search_index(new_df, SEARCH_COLS)
+    assert replaced == [12] and appended == [20]
+    assert new_index["DTM06-2S"] == [4, 12] and new_index["WM-2S"] == [0, 20] and new_index["3000000000"] == [20]
+    # Der alte Index bleibt für laufende Suchen unverändert
+    assert old_index == build_search_index(old_df, SEARCH_COLS)
+
+def test_incremental_index_update_drops_replaced_keys():
+    from excel_search import update_search_index
+    old_df = _multi_hit_db(hits=1)
+    new_df = old_df.copy()
+    new_df.loc[4, "WN_HerstellerBestellnummer_1"] = "DTM06-2S-NEU"
+    new_index = update_search_index(build_search_index(old_df, SEARCH_COLS), old_df, new_df, [4], SEARCH_COLS)
+
+    assert new_index == build_search_index(new_df, SEARCH_COLS)
+    assert "DTM06-2S" not in new_index
@@ -0,0 +1,63 @@
+from datetime import datetime
+from excel_updater import (COL_1000ER, COL_ARTIKEL, COL_PRICE, FIRST_DATA_ROW, MemorySheet, batch_update_prices,
+                           build_excel_index, format_update_report)
+
+UPDATES = [{"artikelnummer": "DTM06-2S", "1000ernummer": "",
+            "sources": [{"price_block": ["16.07.2025", "0,50", "1000", "Mouser"]}]}]
+
+def _sheet():
+    return MemorySheet({(FIRST_DATA_ROW, COL_ARTIKEL): "DTM06-2S"}, max_row=FIRST_DATA_ROW + 3)
+
+def test_price_block_is_written_into_free_block_of_part():
+    ws = _sheet()
+    report = batch_update_prices(ws, UPDATES)
+
+    assert report["blocks"] == 1
+    values = [ws.cells[(FIRST_DATA_ROW + i, COL_PRICE)] for i in range(4)]
+    assert values == [datetime(2025, 7, 16), 0.5, 1000, "Mouser"]
+    assert (ws.macro_runs, ws.saves) == (1, 1)
+
+def test_index_reads_three_columns_with_one_range_each():
+    cells = {}
+    for block in range(250):
+        row = FIRST_DATA_ROW + block * 4
+        cells[(row, COL_ARTIKEL)] = f"PART-{block}"
+        cells[(row, COL_1000ER)] = 1000000000 + block
+        if block % 2:
+            for i, value in enumerate([datetime(2025, 7, 16), 0.5, 1000, "Mouser"]):
+                cells[(row + i, COL_PRICE)] = value
+    ws = MemorySheet(cells, max_row=FIRST_DATA_ROW + 250 * 4 - 1)
+    free_blocks = {}
+
+    index = build_excel_index(ws, ws.max_row(), free_blocks)
+
+    assert (ws.range_reads, ws.cell_reads) == (3, 0)
+    assert index[("part-1", "1000000001", "1000", "mouser")] == FIRST_DATA_ROW + 4
+    assert free_blocks["part-2"] == [FIRST_DATA_ROW + 8]
+    assert sum(len(rows) for rows in free_blocks.values()) == 125
+
+def test_batch_writes_adjacent_blocks_in_one_range_and_saves_once():
+    cells = {(FIRST_DATA_ROW + i * 4, COL_ARTIKEL): "DTM06-2S" for i in range(3)}
+    ws = MemorySheet(cells, max_row=FIRST_DATA_ROW + 3 * 4 - 1)
+    updates = [{"artikelnummer": "DTM06-2S", "1000ernummer": "",
+                "sources": [{"price_block": ["16.07.2025", "0,50", lot, "Mouser"]} for lot in ("1", "100", "1000")]}]
+
+    report = batch_update_prices(ws, updates)
+
+    assert (report["blocks"], report["ranges"]) == (3, 1)
+    assert (ws.range_reads, ws.range_writes, ws.cell_reads, ws.macro_runs, ws.saves) == (3, 1, 0, 1, 1)
+
+def test_duplicate_block_keeps_newest_price_and_is_reported():
+    ws = MemorySheet({(FIRST_DATA_ROW + i * 4, COL_ARTIKEL): "DTM06-2S" for i in range(2)},
+                     max_row=FIRST_DATA_ROW + 2 * 4 - 1)
+    updates = [{"artikelnummer": "DTM06-2S", "1000ernummer": "",
+                "sources": [{"price_block": [datum, preis, "1000", "Mouser (-30%)"]}]}
+               for datum, preis in (("16.07.2025", "0,50"), ("01.10.2026", "0,55"), ("01.01.2025", "0,40"))]
+
+    report = batch_update_prices(ws, updates)
+
+    assert (report["blocks"], report["duplicates"]) == (1, 2)
+    assert ws.cells[(FIRST_DATA_ROW, COL_PRICE)] == datetime(2026, 10, 1)
+    assert ws.cells[(FIRST_DATA_ROW + 1, COL_PRICE)] == 0.55
+    assert (FIRST_DATA_ROW + 4, COL_PRICE) not in ws.cells
+    assert "2 doppelte Blöcke" in format_update_report(report)
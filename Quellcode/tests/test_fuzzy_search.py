@@ -0,0 +1,108 @@
+import pandas as pd
+import online_sources
+from config import SEARCH_COLS
+from excel_search import build_search_index, merge_results
+from fuzzy_search import FuzzyIndex
+
+def _db():
+    rows = []
+    for sap, mpn, price in (("1000000001", "DTM06-2S-E007", 0.64), ("1000000002", "DTM06-2S-E008", 0.71),
+                            ("1000000003", "WM-2S", 0.04)):
+        rows += [
+            {"WN_SAP-Artikel-NR": sap, "WN_HerstellerBestellnummer_1": mpn, "Unnamed: 24": pd.Timestamp("2025-07-16")},
+            {"WN_SAP-Artikel-NR": "", "WN_HerstellerBestellnummer_1": None, "Unnamed: 24": price},
+            {"WN_SAP-Artikel-NR": "", "WN_HerstellerBestellnummer_1": None, "Unnamed: 24": 1000},
+            {"WN_SAP-Artikel-NR": "", "WN_HerstellerBestellnummer_1": None, "Unnamed: 24": "SAP"},
+        ]
+    return pd.DataFrame(rows)
+
+def _online(artikelnummer, queried, latencies=None, refresh=False):
+    queried.append(artikelnummer)
+    if latencies is not None:
+        latencies["Mouser"] = 0.12
+    return [{"Datum": "18.10.2026", "Preis": 0.5, "Losgröße": 100, "Quelle": "Mouser (-30%)"}]
+
+def test_prefix_returns_shortest_matches_first():
+    index = FuzzyIndex(["DTM06-2S-E007", "DTM06-2S", "dtm06-12S", "DTM06-2S-E008", "WM-2S", "1000000001"])
+
+    assert index.prefix("dtm 06-2") == ["DTM06-2S", "DTM06-2S-E007", "DTM06-2S-E008"]
+    assert index.prefix("DTM06", limit=2) == ["DTM06-2S", "dtm06-12S"]
+    assert index.prefix("XYZ") == [] and index.prefix("--") == []
+
+def test_similar_ranks_by_shared_trigrams():
+    index = FuzzyIndex(["DTM06-2S-E008", "WM-2S", "DTM06-12S-E007", "DTM06-2S-E007"])
+    result = index.similar("DTM06-4S-E007")
+
+    assert [key for key, _ in result] == ["DTM06-2S-E007", "DTM06-12S-E007", "DTM06-2S-E008"]
+    assert result[0][1] > result[1][1] > result[2][1] >= 0.5
+    # "WM-2S" teilt zu wenige Trigramme; Präfixtreffer kommen vor ähnlichen Nummern
+    assert index.search("DTM06-2S") == ["DTM06-2S-E007", "DTM06-2S-E008"]
+    assert index.search("DTM06-2S-E007")[0] == "DTM06-2S-E007"
+
+def test_similar_skips_common_trigrams(monkeypatch):
+    import fuzzy_search
+    monkeypatch.setattr(fuzzy_search, "FUZZY_MAX_POSTINGS", 50)
+    # "100" und "000" stehen in jeder SAP-Nummer und liefern allein keine Kandidaten mehr
+    index = FuzzyIndex([f"{1000000000 + i}" for i in range(1000)] + ["ABC-1000123"])
+    result = [key for key, _ in index.similar("1000000123")]
+
+    assert result[0] == "1000000123"
+    assert "ABC-1000123" not in result
+
+def test_online_result_only_in_first_block():
+    db_rows = _db().iloc[0:8]
+    online = {"Datum": "18.10.2026", "Preis": 0.5, "Losgröße": 100, "Quelle": "Mouser (-30%)"}
+    merged, _ = merge_results(db_rows, [online])
+
+    assert len(merged) == 8
+    column = merged["Mouser (-30%)"].tolist()
+    assert column[:4] == [pd.Timestamp("2026-10-18"), 0.5, 100, "Mouser (-30%)"]
+    assert column[4:] == [None] * 4
+
+def test_miss_queries_typed_number_and_only_suggests_candidates(handlers, fake_ui, monkeypatch):
+    queried = []
+    monkeypatch.setattr(online_sources, "get_online_results", lambda a, **kw: _online(a, queried, **kw))
+    handlers.set_db(_db())
+    fake_ui.use_online_var.set(True)
+    fake_ui.entry.set("DTM06-4S-E007")
+
+    handlers.do_search()
+
+    assert queried == ["DTM06-4S-E007"]
+    assert "DTM06-2S-E007" in fake_ui.entry["values"] and fake_ui.entry["opened"]
+    (shown, _), = fake_ui.shown
+    # Nur das Online-Ergebnis, keine Datenbankblöcke der ähnlichen Nummern
+    assert len(shown) == 4
+    assert "DTM06-2S-E007" not in shown.get("WN_HerstellerBestellnummer_1", pd.Series(dtype=object)).tolist()
+    status = fake_ui.status_label.options["text"]
+    assert "ähnliche Nummern" in status and "Mouser" in status
+
+def test_exact_hit_queries_block_number(handlers, fake_ui, monkeypatch):
+    queried = []
+    monkeypatch.setattr(online_sources, "get_online_results", lambda a, **kw: _online(a, queried, **kw))
+    handlers.set_db(_db())
+    fake_ui.use_online_var.set(True)
+    fake_ui.entry.set("1000000002")
+
+    handlers.do_search()
+
+    assert queried == ["DTM06-2S-E008"]
+    (shown, _), = fake_ui.shown
+    assert shown["WN_HerstellerBestellnummer_1"].iloc[0] == "DTM06-2S-E008"
+    assert "ähnliche Nummern" not in fake_ui.status_label.options["text"]
+
+def test_suggestion_list_opens_only_on_request():
+    from types import SimpleNamespace
+    from ui_manager import UIManager
+    calls = []
+
+    class Entry(dict):
+        tk = SimpleNamespace(call=lambda *args: calls.append(args))
+
+    ui = SimpleNamespace(entry=Entry())
+    UIManager.show_suggestions(ui, ["A-1", "A-2"])
+    UIManager.show_suggestions(ui, [], open_list=True)
+    assert calls == [] and ui.entry["values"] == []
+
+    UIManager.show_suggestions(ui, ["A-1", "A-2"], open_list=True)
+    assert calls == [("ttk::combobox::Post", ui.entry)]
@@ -0,0 +1,95 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+import requests
+from requests.adapters import HTTPAdapter
+import http_client
+
+class _Handler(BaseHTTPRequestHandler):
+    # Antwort je Pfad: (Status, Retry-After oder None, Verzögerung in Sekunden)
+    plan = {}
+    hits = {}
+
+    def _answer(self):
+        self.hits[self.path] = self.hits.get(self.path, 0) + 1
+        status, retry_after, delay = self.plan[self.path]
+        if delay:
+            time.sleep(delay)
+        self.send_response(status)
+        if retry_after is not None:
+            self.send_header("Retry-After", retry_after)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    do_GET = do_POST = _answer
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setattr(http_client, "HTTP_BACKOFF", 0)
+    _Handler.hits = {}
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=srv.serve_forever, args=(0.05,), daemon=True).start()
+    session = requests.Session()
+    session.mount("http://", HTTPAdapter(max_retries=http_client._retry()))
+    yield session, f"http://127.0.0.1:{srv.server_address[1]}", _Handler.hits
+    srv.shutdown()
+    srv.server_close()
+
+@pytest.mark.parametrize("method, status, retry_after, attempts", [
+    ("GET", 502, None, 3),
+    ("GET", 429, None, 3),
+    ("POST", 502, None, 1),
+    ("POST", 503, None, 1),
+    ("POST", 503, "0", 3),
+    ("POST", 429, "0", 3),
+])
+def test_status_retries(server, method, status, retry_after, attempts):
+    session, base, hits = server
+    _Handler.plan = {"/x": (status, retry_after, 0)}
+    assert session.request(method, base + "/x", timeout=5).status_code == status
+    assert hits["/x"] == attempts
+
+@pytest.mark.parametrize("method", ["GET", "POST"])
+def test_read_timeout_is_not_retried(server, method):
+    session, base, hits = server
+    _Handler.plan = {"/slow": (200, None, 0.5)}
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        session.request(method, base + "/slow", timeout=0.1)
+    time.sleep(0.6)
+    assert hits["/slow"] == 1
+
+def test_retries_consume_rate_limit_tokens(server, monkeypatch):
+    session, base, hits = server
+
+    class Bucket:
+        tokens = 0
+
+        def acquire(self):
+            self.tokens += 1
+
+    class Guard:
+        bucket = Bucket()
+
+    monkeypatch.setattr(http_client, "guard_for_host", lambda host: Guard if host == "127.0.0.1" else None)
+    _Handler.plan = {"/busy": (503, None, 0)}
+    assert session.get(base + "/busy", timeout=5).status_code == 503
+    assert hits["/busy"] == 3
+    assert Guard.bucket.tokens == 2
+
+def test_stats_are_kept_per_pool_actually_used(monkeypatch):
+    import benchmark
+    from config import EXCHANGE_RATE_URL
+    monkeypatch.setattr(http_client, "_stats", {})
+    with benchmark.stub_suppliers(0.0) as base_url:
+        for _ in range(3):
+            assert http_client.get(EXCHANGE_RATE_URL).status_code == 200
+
+    stats = http_client.get_stats()
+    # Umgeleitet auf den Stub-Server: gezählt wird dessen Pool, nicht der angefragte Host
+    assert list(stats) == [base_url.split("//")[1]]
+    entry = stats[base_url.split("//")[1]]
+    assert entry["requests"] == 3 and 1 <= entry["connections"] <= 3
@@ -0,0 +1,94 @@
+import threading
+import time
+import pytest
+import online_sources
+
+@pytest.fixture
+def sources(monkeypatch):
+    """Eine hängende Quelle (1 Platz) und eine schnelle Quelle statt der echten Anbieter."""
+    release = threading.Event()
+    calls = {"Langsam": 0}
+
+    def slow(part, refresh=False):
+        calls["Langsam"] += 1
+        release.wait(5)
+        return None
+
+    def fast(part, refresh=False):
+        return {"Datum": "18.10.2026", "Preis": 1.0, "Losgröße": 1, "Quelle": f"Schnell {part}"}
+
+    monkeypatch.setattr(online_sources, "ONLINE_SOURCES", [("Langsam", slow), ("Schnell", fast)])
+    monkeypatch.setattr(online_sources, "BATCH_SOURCES", {})
+    monkeypatch.setattr(online_sources, "_source_limits",
+                        {"Langsam": threading.BoundedSemaphore(1), "Schnell": threading.BoundedSemaphore(2)})
+    yield calls
+    release.set()
+
+def test_hung_source_does_not_block_others(sources):
+    latencies = {}
+    start = time.monotonic()
+    results = online_sources.get_online_results("A", deadline=0.3, latencies=latencies)
+    assert time.monotonic() - start < 1.0
+    assert [r["Quelle"] for r in results] == ["Schnell A"]
+    assert latencies["Langsam"] is None
+
+def test_saturated_source_is_skipped_instead_of_queued(sources):
+    online_sources.get_online_results("A", deadline=0.2)
+    # Der hängende Aufruf belegt den einzigen Platz: weitere Suchen starten die Quelle nicht erneut
+    for part in ("B", "C", "D"):
+        results = online_sources.get_online_results(part, deadline=0.2)
+        assert [r["Quelle"] for r in results] == [f"Schnell {part}"]
+    assert sources["Langsam"] == 1
+
+def test_batch_deadline_reports_missing_parts(sources):
+    latencies = {}
+    start = time.monotonic()
+    results = online_sources.get_online_results_batch(["A", "B", "C"], deadline=0.3, latencies=latencies)
+    # Die hängende Quelle hält den Block nicht auf, die schnelle liefert für alle Teile
+    assert time.monotonic() - start < 1.0
+    assert all([r["Quelle"] for r in res] == [f"Schnell {part}"] for part, res in results.items())
+    assert latencies["Langsam"] is None and latencies["Schnell"] is not None
+    assert sources["Langsam"] == 1
+
+@pytest.fixture
+def stub(tmp_path, monkeypatch):
+    """Mouser und Nexar über den Stub-Server des Benchmarks, leerer Preis-Cache; zählt die POST-Anfragen."""
+    import benchmark
+    import currency
+    import http_client
+    import price_cache
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(currency, "_rates", None)
+    monkeypatch.setattr(currency, "_last_attempt", 0.0)
+    monkeypatch.setattr(price_cache, "PRICE_CACHE_FILE", str(tmp_path / "cache.sqlite"))
+    monkeypatch.setattr(price_cache, "_conn", None)
+    posts = []
+    real_post = http_client.post
+    monkeypatch.setattr(http_client, "post", lambda url, **kw: posts.append(url) or real_post(url, **kw))
+    with benchmark.stub_suppliers(0.0):
+        yield posts
+    price_cache._conn.close()
+
+# Unbekannte Teile ("UNBEKANNT-...") liefert der Stub nicht, sie stehen zwischen bekannten Teilen
+PARTS = ["DTM06-2S", "UNBEKANNT-1", "1-967616-1", "UNBEKANNT-2", "WM-2S"]
+
+def test_mouser_batch_maps_pipe_results_and_caches_misses(stub):
+    from mouser_module import mouser_price_batch
+    results = mouser_price_batch(PARTS, MOUSER_API_KEY="key")
+
+    assert len(stub) == 1
+    assert {p for p, r in results.items() if r} == {"DTM06-2S", "1-967616-1", "WM-2S"}
+    assert results["DTM06-2S"]["Quelle"] == "Mouser (-30%)" and results["DTM06-2S"]["Losgröße"] == 1000
+    # Fehlende Teile der vollständigen Antwort: keine Einzelabfragen, beim nächsten Mal aus dem Cache
+    assert mouser_price_batch(PARTS, MOUSER_API_KEY="key") == results
+    assert len(stub) == 1
+
+def test_nexar_batch_maps_aliases_back_to_parts(stub):
+    from octopart_module import octopart_price_nexar_batch
+    results = octopart_price_nexar_batch(PARTS, octopart_api_key="key")
+
+    assert sum("nexar" in url for url in stub) == 1
+    assert [p for p in PARTS if results[p]] == ["DTM06-2S", "1-967616-1", "WM-2S"]
+    assert results["WM-2S"]["Quelle"] == "Octopart (-30%)" and results["WM-2S"]["Losgröße"] == 1
+    assert octopart_price_nexar_batch(PARTS, octopart_api_key="key") == results
+    assert sum("nexar" in url for url in stub) == 1
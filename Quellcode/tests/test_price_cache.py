@@ -0,0 +1,42 @@
+import pytest
+import price_cache
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(price_cache, "PRICE_CACHE_FILE", str(tmp_path / "cache.sqlite"))
+    monkeypatch.setattr(price_cache, "PRICE_CACHE_MAX_ENTRIES", 10)
+    monkeypatch.setattr(price_cache, "PRICE_CACHE_PRUNE_INTERVAL", 5)
+    monkeypatch.setattr(price_cache, "_conn", None)
+    monkeypatch.setattr(price_cache, "_stores_since_prune", 0)
+    yield
+    if price_cache._conn is not None:
+        price_cache._conn.close()
+
+def _count():
+    return price_cache._get_conn().execute("SELECT COUNT(*) FROM price_cache").fetchone()[0]
+
+def test_store_counts_only_every_prune_interval(cache):
+    statements = []
+    price_cache._get_conn().set_trace_callback(statements.append)
+    for i in range(10):
+        price_cache.store("Mouser", f"P{i}", {"Preis": i})
+    assert sum("COUNT(*)" in s for s in statements) == 2
+
+def test_cache_is_pruned_to_max_entries_lru(cache):
+    for i in range(12):
+        price_cache.store("Mouser", f"P{i}", {"Preis": i})
+    # Zwischen zwei Prüfungen darf der Cache kurz über dem Limit liegen
+    assert _count() == 12
+    price_cache.lookup("Mouser", "P0")
+    for i in range(12, 15):
+        price_cache.store("Mouser", f"P{i}", {"Preis": i})
+    assert _count() == 10
+    assert price_cache.lookup("Mouser", "P0") == (True, {"Preis": 0})
+    assert price_cache.lookup("Mouser", "P1") == (False, None)
+
+def test_cache_is_pruned_on_open(cache, monkeypatch):
+    for i in range(12):
+        price_cache.store("Mouser", f"P{i}", {"Preis": i})
+    price_cache._conn.close()
+    monkeypatch.setattr(price_cache, "_conn", None)
+    assert _count() == 10
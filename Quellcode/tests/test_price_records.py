@@ -0,0 +1,25 @@
+import pandas as pd
+from price_records import PriceRecord, PriceTable
+
+def _blocks():
+    return pd.DataFrame({
+        "Mouser": [pd.Timestamp("2025-07-16"), 0.5, 1000, "Mouser",
+                   "16.07.2025", "1,20 €", None, "Mouser",
+                   pd.Timestamp("2025-07-16"), 0.75, "", "Mouser"],
+    })
+
+def test_missing_lot_stays_missing():
+    table = PriceTable.from_blocks(_blocks())
+    assert [r.lot for r in table.records()] == [1000, None, None]
+
+def test_complete_records_require_lot():
+    records = list(PriceTable.from_blocks(_blocks()).records(complete=True))
+    assert [r.to_block() for r in records] == [[pd.Timestamp("2025-07-16"), 0.5, 1000, "Mouser"]]
+    assert type(records[0].lot) is int
+
+def test_online_record_keeps_missing_lot_missing():
+    base = {"Datum": "18.10.2026", "Preis": "0,50 €", "Quelle": "Mouser (-30%)"}
+    lots = [PriceRecord.from_online({**base, "Losgröße": lot}).lot for lot in (100, "1000", None, float("nan"), "")]
+
+    assert lots == [100, 1000, None, None, None]
+    assert PriceRecord.from_online(base).to_block() == [pd.Timestamp("2026-10-18"), 0.5, None, "Mouser (-30%)"]
@@ -0,0 +1,66 @@
+import warnings
+import numpy as np
+import pandas as pd
+import pytest
+import data_manager
+from data_manager import _restore_block_dates
+
+def _restore_per_cell(df):
+    # Bisherige Umwandlung aus load_db_from_json (Zelle für Zelle), als Referenz. Ältere pandas-Versionen
+    # wandelten eine Zahlenspalte beim Zuweisen eines Timestamps in object um; pandas 3 lehnt die Zuweisung ab
+    # und das except ließ die Zahl stehen. Die Referenz bildet das ursprüngliche Verhalten nach.
+    df = df.astype({c: object for c in df.columns if pd.api.types.is_numeric_dtype(df[c].dtype)
+                    and not pd.api.types.is_bool_dtype(df[c].dtype)})
+    block_size = 4
+    for col in df.columns:
+        for i in range(0, len(df), block_size):
+            val = df.iloc[i][col]
+            if isinstance(val, (int, float)) and not isinstance(val, bool) and val > 1e12:
+                try:
+                    df.iloc[i, df.columns.get_loc(col)] = pd.to_datetime(val, unit='ms')
+                except Exception:
+                    pass
+    return df
+
+def _fixture():
+    ts = pd.Timestamp("2025-07-16")
+    return pd.DataFrame({
+        # Gemischte Preisspalte: gültiges Datum, Datum als Text, leer, ungültig (außerhalb des Datumsbereichs)
+        "Unnamed: 16": [ts, 0.5, 1000, "Mouser",
+                        "16.07.2025", "1,20 €", 500, "Arrow",
+                        None, None, None, None,
+                        1e20, 0.7, 100, "Octopart",
+                        "", "", "", "",
+                        pd.Timestamp("1999-12-31 23:59:59"), 12.5, 1, "SAP"],
+        # Reine Zahlenspalte mit einem Millisekunden-Zeitstempel und einem ungültigen Wert
+        "Unnamed: 17": [1.7526e12, 1.0, 2.0, 3.0, 1e20, 1.0, 2.0, 3.0, np.nan, 1.0, 2.0, 3.0,
+                        5.0, 1.0, 2.0, 3.0, 1.6e12, 1.0, 2.0, 3.0, 0.0, 1.0, 2.0, 3.0],
+        "WN_SAP-Artikel-NR": [1001, None, None, None, 1002, None, None, None, 1003, None, None, None,
+                              1004, None, None, None, 1005, None, None, None, 1006, None, None, None],
+        "Aktiv": [True, False, False, False] * 6,
+    })
+
+@pytest.fixture
+def json_roundtrip(tmp_path):
+    path = tmp_path / "database.json"
+    _fixture().to_json(path, orient="split", force_ascii=False)
+    return lambda: pd.read_json(path, orient="split")
+
+def _cells(df):
+    return [[(type(v).__name__, "nan" if isinstance(v, float) and v != v else str(v)) for v in df[c]] for c in df.columns]
+
+def test_vectorized_restore_matches_per_cell_loop(json_roundtrip):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", FutureWarning)
+        expected = _restore_per_cell(json_roundtrip())
+    result = _restore_block_dates(json_roundtrip())
+    assert _cells(result) == _cells(expected)
+
+def test_restore_leaves_invalid_and_empty_dates_unchanged(json_roundtrip):
+    result = _restore_block_dates(json_roundtrip())
+    col = result["Unnamed: 16"].tolist()
+    assert col[0] == pd.Timestamp("2025-07-16")
+    assert col[4] == "16.07.2025"
+    assert col[8] is None or col[8] != col[8]
+    assert col[12] == 1e20
+    assert col[16] == ""
@@ -0,0 +1,22 @@
+import os
+import subprocess
+import sys
+
+SOURCE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ("pandas", "numpy", "requests", "urllib3", "bs4", "openpyxl", "win32com", "pyarrow")
+
+def _modules_after(code):
+    # Eigener Prozess, damit die im Testlauf bereits geladenen Module nicht zählen
+    out = subprocess.run([sys.executable, "-c", code + "\nimport sys\nprint(' '.join(sorted(sys.modules)))"],
+                         cwd=SOURCE_DIR, capture_output=True, text=True, check=True).stdout
+    return set(out.split())
+
+def test_gui_entry_point_imports_no_heavy_modules():
+    loaded = _modules_after("import main")
+    assert "gui" in loaded and "event_handlers" in loaded
+    assert not loaded & set(HEAVY)
+
+def test_search_pulls_in_pandas_only_when_used():
+    loaded = _modules_after("import event_handlers\nimport excel_search")
+    assert "pandas" in loaded
+    assert not loaded & {"requests", "bs4", "openpyxl"}
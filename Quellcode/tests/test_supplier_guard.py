@@ -0,0 +1,54 @@
+import threading
+import time
+import pytest
+from supplier_guard import CircuitBreaker, SupplierGuard, SupplierUnavailable
+
+def _open_breaker(cooldown=0.05):
+    breaker = CircuitBreaker(threshold=2, cooldown=cooldown)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert not breaker.allow()
+    time.sleep(cooldown)
+    return breaker
+
+def test_half_open_lets_exactly_one_concurrent_caller_through():
+    breaker = _open_breaker()
+    start = threading.Barrier(20)
+    results = []
+
+    def call():
+        start.wait()
+        results.append(breaker.allow())
+
+    threads = [threading.Thread(target=call) for _ in range(20)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results.count(True) == 1
+
+def test_trial_success_closes_and_failure_reopens():
+    breaker = _open_breaker()
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_failure()
+    # Ein einzelner Fehler des Testaufrufs sperrt sofort wieder, ohne neuen Testaufruf
+    assert not breaker.allow()
+    time.sleep(0.05)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.allow() and breaker.allow()
+
+def test_lost_trial_is_replaced_after_cooldown():
+    breaker = _open_breaker()
+    assert breaker.allow()
+    assert not breaker.allow()
+    time.sleep(0.05)
+    assert breaker.allow()
+
+def test_guard_reports_running_trial():
+    guard = SupplierGuard("Test", rate=1000, capacity=10)
+    guard.breaker = _open_breaker()
+    guard.before_request()
+    with pytest.raises(SupplierUnavailable, match="Testanfrage"):
+        guard.before_request()
@@ -0,0 +1,38 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+import tracing
+
+@pytest.fixture(autouse=True)
+def enabled():
+    tracing.enable()
+    yield
+    tracing.disable()
+
+def test_summary_of_a_run_excludes_other_threads():
+    runs = {}
+    started = threading.Barrier(2)
+
+    def worker(name):
+        runs[name] = tracing.start_run()
+        started.wait()
+        for _ in range(3):
+            with tracing.span(f"schritt {name}"):
+                pass
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in ("a", "b")]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert list(tracing.summary(run=runs["a"])) == ["schritt a"]
+    assert tracing.summary(run=runs["b"])["schritt b"]["calls"] == 3
+
+def test_bound_pool_tasks_belong_to_the_run():
+    run = tracing.start_run()
+    with ThreadPoolExecutor(2) as pool:
+        list(pool.map(tracing.bind(lambda i: tracing.count("quelle", "hit")), range(4)))
+        # Ungebundene Aufgaben (z.B. eines anderen Laufs) zählen nicht mit
+        pool.submit(tracing.count, "quelle", "miss").result()
+    assert tracing.summary(run=run)["quelle"]["hit"] == 4
+    assert tracing.summary(run=run)["quelle"]["miss"] == 0
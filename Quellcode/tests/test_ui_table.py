@@ -0,0 +1,73 @@
+import types
+import pandas as pd
+from config import TABLE_PAGE_SIZE
+from ui_manager import UIManager
+
+class FakeTree:
+    """Treeview-Ersatz ohne Anzeige: merkt sich Spalten und eingefügte Zeilen."""
+    def __init__(self):
+        self.options = {}
+        self.rows = []
+
+    def __setitem__(self, key, value):
+        self.options[key] = value
+
+    def heading(self, col, **kw):
+        pass
+
+    def column(self, col, **kw):
+        pass
+
+    def tag_configure(self, tag, **kw):
+        pass
+
+    def get_children(self):
+        return list(range(len(self.rows)))
+
+    def delete(self, *items):
+        self.rows = []
+
+    def insert(self, parent, index, values, tags=()):
+        self.rows.append((values, tags))
+
+def _table_ui():
+    idle = []
+    ui = types.SimpleNamespace(tree=FakeTree(), tree_scroll_y=types.SimpleNamespace(set=lambda *a: None),
+                               root=types.SimpleNamespace(after_idle=idle.append))
+    for name in ("show_table", "_show_next_page", "_on_tree_yscroll"):
+        setattr(ui, name, getattr(UIManager, name).__get__(ui))
+    return ui, idle
+
+def _result(n_blocks):
+    rows = []
+    for i in range(n_blocks):
+        rows += [[f"PART-{i}", pd.Timestamp("2025-07-16")], [None, 0.5], [None, 1000], [None, "SAP"]]
+    return pd.DataFrame(rows, columns=["WN_HerstellerBestellnummer_1", "Unnamed: 24"])
+
+def test_table_inserts_first_page_and_loads_more_on_scroll():
+    n_rows = TABLE_PAGE_SIZE * 2 + 40
+    ui, idle = _table_ui()
+    stale = [TABLE_PAGE_SIZE + 4, TABLE_PAGE_SIZE + 5]
+    ui.show_table(_result(n_rows // 4), stale)
+
+    assert ui.tree.options["columns"] == ["Auswahl", "WN_HerstellerBestellnummer_1", "Unnamed: 24"]
+    assert len(ui.tree.rows) == TABLE_PAGE_SIZE
+    assert ui.tree.rows[0] == (("", "PART-0", "16.07.2025"), ())
+    assert ui.tree.rows[1] == (("", "", "0,50 €"), ())
+
+    # Weit oben gescrollt: nichts nachladen, kurz vor dem Ende: nächste Seite
+    ui._on_tree_yscroll("0.0", "0.5")
+    assert idle == []
+    while len(ui.tree.rows) < n_rows:
+        ui._on_tree_yscroll("0.8", "0.95")
+        idle.pop()()
+    ui._on_tree_yscroll("0.9", "1.0")
+    assert idle == []
+    assert len(ui.tree.rows) == n_rows
+    assert [i for i, (_, tags) in enumerate(ui.tree.rows) if tags] == stale
+
+def test_new_result_replaces_table():
+    ui, _ = _table_ui()
+    ui.show_table(_result(100))
+    ui.show_table(_result(2))
+    assert [values[1] for values, _ in ui.tree.rows[::4]] == ["PART-0", "PART-1"]
@@ -0,0 +1,17 @@
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from utils import _format_value_uncached, format_column
+
+VALUES = [pd.Timestamp("2025-07-16"), datetime(2026, 10, 18, 12, 30), "16.07.2025", "kein Datum",
+          0.5, 12, 1.005, np.float64(0.125), -1.5, 1e-7, 2.5e12, "1,23 €", "0,50", "12.5", True, None, np.nan, pd.NaT,
+          "", "Mouser (-30%)", 1000, np.int64(250)]
+
+def test_format_column_matches_per_cell_formatting():
+    for field in ("Datum", "Preis", None, "Losgröße"):
+        expected = ["" if pd.isna(v) else _format_value_uncached(v, field) for v in VALUES]
+        assert format_column(VALUES, field) == expected, field
+
+def test_format_column_on_series_with_index_gaps():
+    series = pd.Series([0.5, None, pd.Timestamp("2025-07-16")], index=[4, 9, 13], dtype=object)
+    assert format_column(series, "Preis") == ["0,50 €", "", "16.07.2025"]
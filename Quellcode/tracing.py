@@ -0,0 +1,238 @@
+# Dieses Modul misst die Laufzeit einzelner Verarbeitungsschritte (BOM lesen, Suche, Online-Quellen, Zusammenführen, Anzeige)
+# und zählt Treffer, Fehlanzeigen und Fehler. Die Ereignisse landen in einem Ringpuffer und lassen sich als JSON oder im
+# Chrome-Trace-Format (chrome://tracing, ui.perfetto.dev) exportieren.
+# Aktivierung: python main.py --trace oder Umgebungsvariable PREIS_TRACE=1. Ausgeschaltet prüfen alle Funktionen nur ein Flag.
+
+import functools
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+from config import TRACE_BUFFER_SIZE, TRACE_SUMMARY_TOP
+
+_enabled = False
+_origin = time.perf_counter()
+_events = deque(maxlen=TRACE_BUFFER_SIZE)
+_lock = threading.Lock()
+_next_seq = 0
+_NULL_SPAN = nullcontext()
+# Laufnummer (z.B. eine Suche im GUI) je Thread; Pool-Aufgaben übernehmen sie über bind()
+_local = threading.local()
+_run_ids = itertools.count(1)
+
+# Reihenfolge der Zähler in Zusammenfassung und Export
+OUTCOMES = ("hit", "miss", "error", "timeout")
+_OUTCOME_TEXT = {"hit": "Treffer", "miss": "ohne Ergebnis", "error": "Fehler", "timeout": "Zeitüberschreitung"}
+
+def enable(buffer_size=None):
+    """Schaltet die Aufzeichnung ein; optional mit anderer Puffergröße (ältere Ereignisse werden verworfen)."""
+    global _enabled, _events
+    if buffer_size is not None:
+        with _lock:
+            _events = deque(_events, maxlen=buffer_size)
+    _enabled = True
+
+def disable():
+    global _enabled
+    _enabled = False
+
+def is_enabled():
+    return _enabled
+
+def enabled_by_request(argv=None):
+    argv = sys.argv if argv is None else argv
+    return "--trace" in argv or os.getenv("PREIS_TRACE") == "1"
+
+def _record(stage, start, duration, outcome=None, n=1, args=None):
+    global _next_seq
+    thread = threading.current_thread()
+    run = getattr(_local, "run", None)
+    with _lock:
+        _events.append((_next_seq, stage, start, duration, outcome, n, thread.ident, thread.name, args, run))
+        _next_seq += 1
+
+def start_run():
+    """
+    Beginnt einen neuen Lauf im aktuellen Thread und gibt seine Nummer zurück. Ereignisse dieses Threads und
+    mit bind() weitergegebener Aufgaben gehören dazu; an summary/format_summary/export als 'run' übergeben.
+    """
+    run = next(_run_ids)
+    _local.run = run
+    return run
+
+def bind(func):
+    """Überträgt den Lauf des aktuellen Threads auf 'func', z.B. für Aufgaben in einem Thread-Pool oder root.after."""
+    run = getattr(_local, "run", None)
+    if not _enabled or run is None:
+        return func
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        previous = getattr(_local, "run", None)
+        _local.run = run
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _local.run = previous
+    return wrapper
+
+class _Span:
+    __slots__ = ("stage", "args", "start")
+
+    def __init__(self, stage, args):
+        self.stage = stage
+        self.args = args or None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _record(self.stage, self.start, time.perf_counter() - self.start,
+                "error" if exc_type is not None else None, args=self.args)
+        return False
+
+def span(stage, **args):
+    """Kontextmanager für einen Verarbeitungsschritt; ein Fehler im Block wird als 'error' gezählt."""
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(stage, args)
+
+def traced(stage=None, hit=None):
+    """
+    Dekorator: misst jeden Aufruf als Schritt 'stage' (Standard: Funktionsname).
+    Mit hit(ergebnis) -> bool wird zusätzlich als Treffer oder Fehlanzeige gezählt.
+    """
+    def decorator(func):
+        name = stage or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except Exception:
+                _record(name, start, time.perf_counter() - start, "error")
+                raise
+            outcome = None if hit is None else ("hit" if hit(result) else "miss")
+            _record(name, start, time.perf_counter() - start, outcome)
+            return result
+        return wrapper
+    return decorator
+
+def count(stage, outcome, n=1):
+    """Zählt n Ereignisse ('hit', 'miss', 'error' oder 'timeout') für einen Schritt ohne Zeitmessung."""
+    if _enabled and n:
+        _record(stage, time.perf_counter(), None, outcome, n)
+
+def iterate(stage, iterable):
+    """
+    Misst die Zeit, die in einem Iterator (z.B. einer gestreamt gelesenen Datei) verbracht wird, und zeichnet sie
+    am Ende als ein Schritt auf (Summe über alle Elemente, ohne die Verarbeitung der Elemente durch den Aufrufer).
+    """
+    if not _enabled:
+        return iterable
+    return _timed_iter(stage, iter(iterable))
+
+def _timed_iter(stage, iterator):
+    first = None
+    spent = 0.0
+    items = 0
+    try:
+        while True:
+            start = time.perf_counter()
+            if first is None:
+                first = start
+            try:
+                item = next(iterator)
+            except StopIteration:
+                spent += time.perf_counter() - start
+                return
+            spent += time.perf_counter() - start
+            items += 1
+            yield item
+    finally:
+        _record(stage, first if first is not None else time.perf_counter(), spent, args={"items": items})
+
+def mark():
+    """Position im Puffer; an summary/format_summary/export übergeben, um nur spätere Ereignisse auszuwerten."""
+    with _lock:
+        return _next_seq
+
+def events(since=0, run=None):
+    """Ereignisse ab Position 'since', mit 'run' nur die eines Laufs (siehe start_run)."""
+    with _lock:
+        return [e for e in _events if e[0] >= since and (run is None or e[9] == run)]
+
+def summary(since=0, run=None):
+    """Aufrufe, Gesamt- und Maximalzeit (Sekunden) und Zähler pro Schritt, in der Reihenfolge des ersten Auftretens."""
+    result = {}
+    for _, stage, _, duration, outcome, n, _, _, _, _ in events(since, run):
+        entry = result.get(stage)
+        if entry is None:
+            entry = result[stage] = {"calls": 0, "time": 0.0, "max": 0.0, **{o: 0 for o in OUTCOMES}}
+        if duration is not None:
+            entry["calls"] += 1
+            entry["time"] += duration
+            entry["max"] = max(entry["max"], duration)
+        if outcome is not None:
+            entry[outcome] = entry.get(outcome, 0) + n
+    return result
+
+def format_summary(since=0, top=TRACE_SUMMARY_TOP, run=None):
+    """Kurze Zusammenfassung der zeitintensivsten Schritte, z.B. für die Statusleiste."""
+    stages = sorted(summary(since, run).items(), key=lambda item: item[1]["time"], reverse=True)[:top]
+    parts = []
+    for stage, s in stages:
+        text = f"{stage} {s['calls']}× {s['time']:.2f} s"
+        counts = [f"{s[o]} {_OUTCOME_TEXT[o]}" for o in OUTCOMES if s[o]]
+        if counts:
+            text += f" ({', '.join(counts)})"
+        parts.append(text)
+    return " | ".join(parts)
+
+def export_json(path, since=0, run=None):
+    """Speichert Zusammenfassung und Einzelereignisse (Zeiten in Millisekunden seit Programmstart)."""
+    data = {
+        "summary": summary(since, run),
+        "events": [
+            {"stage": stage, "start_ms": (start - _origin) * 1000,
+             "duration_ms": None if duration is None else duration * 1000,
+             "outcome": outcome, "count": n, "thread": thread_name, "args": args, "run": event_run}
+            for _, stage, start, duration, outcome, n, _, thread_name, args, event_run in events(since, run)
+        ],
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=1, ensure_ascii=False, default=str)
+    return path
+
+def export_chrome_trace(path, since=0, run=None):
+    """Speichert die Ereignisse im Chrome-Trace-Format: Schritte als Balken je Thread, Zähler als Markierungen."""
+    pid = os.getpid()
+    trace = []
+    threads = {}
+    for _, stage, start, duration, outcome, n, tid, thread_name, args, event_run in events(since, run):
+        threads[tid] = thread_name
+        event = {"name": stage, "cat": stage.split(".")[0].split(" ")[0], "pid": pid, "tid": tid,
+                 "ts": (start - _origin) * 1e6}
+        extra = {"run": event_run} if event_run is not None else {}
+        if duration is None:
+            event.update(ph="i", s="t", args={outcome: n, **extra})
+        else:
+            event.update(ph="X", dur=duration * 1e6,
+                         args=dict(args or {}, **({"outcome": outcome} if outcome else {}), **extra))
+        trace.append(event)
+    trace.extend({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+                 for tid, name in threads.items())
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": trace, "displayTimeUnit": "ms"}, f, ensure_ascii=False, default=str)
+    return path
+
+def export(path, fmt="chrome", since=0, run=None):
+    return export_json(path, since, run) if fmt == "json" else export_chrome_trace(path, since, run)
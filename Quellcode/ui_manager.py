@@ -2,9 +2,8 @@
 
 import tkinter as tk
 from tkinter import ttk
-from datetime import datetime
-import pandas as pd
-from config import HIDE_COLS
+import tracing
+from config import HIDE_COLS, TABLE_PAGE_SIZE
 
 class UIManager:
     def __init__(self, root):
@@ -27,13 +26,16 @@ class UIManager:
         frame.pack(fill="x", padx=10, pady=4)
 
         ttk.Label(frame, text="Artikelnummer oder SAP-Nummer:").pack(side="left")
-        self.entry = ttk.Entry(frame, width=30)
+        # Combobox statt Entry, damit beim Tippen Vorschläge angeboten werden können
+        self.entry = ttk.Combobox(frame, width=30)
         self.entry.pack(side="left", padx=5)
 
         self.search_btn = ttk.Button(frame, text="Suche", width=16, state="disabled")
         self.search_btn.pack(side="left", padx=5)
         self.bom_btn = ttk.Button(frame, text="BOM laden & Suchen", width=20, state="disabled")
         self.bom_btn.pack(side="left", padx=5)
+        self.cancel_btn = ttk.Button(frame, text="Abbrechen", width=12, state="disabled")
+        self.cancel_btn.pack(side="left", padx=5)
         self.export_btn = ttk.Button(frame, text="Export als Excel", width=18)
         self.export_btn.pack(side="left", padx=5)
         self.update_db_btn = ttk.Button(frame, text="Datenbank aktualisieren", width=22)
@@ -45,6 +47,14 @@ class UIManager:
         online_check = ttk.Checkbutton(frame, text="Online Quellen nutzen", variable=self.use_online_var)
         online_check.pack(side="left", padx=10)
 
+        self.fuzzy_var = tk.BooleanVar(value=True)
+        fuzzy_check = ttk.Checkbutton(frame, text="Unscharfe Suche", variable=self.fuzzy_var)
+        fuzzy_check.pack(side="left", padx=10)
+
+        self.refresh_cache_var = tk.BooleanVar(value=False)
+        refresh_check = ttk.Checkbutton(frame, text="Preis-Cache umgehen", variable=self.refresh_cache_var)
+        refresh_check.pack(side="left", padx=10)
+
         # Result frame with Treeview
         result_frame = ttk.Frame(self.root, padding=4)
         result_frame.pack(fill="both", expand=True, padx=10, pady=4)
@@ -53,8 +63,12 @@ class UIManager:
         tree_scroll_x = ttk.Scrollbar(result_frame, orient="horizontal")
         self.tree = ttk.Treeview(
             result_frame, columns=[], show="headings",
-            yscrollcommand=tree_scroll_y.set, xscrollcommand=tree_scroll_x.set, selectmode="extended"
+            yscrollcommand=self._on_tree_yscroll, xscrollcommand=tree_scroll_x.set, selectmode="extended"
         )
+        self.tree_scroll_y = tree_scroll_y
+        self._table_rows = []
+        self._table_veraltet = set()
+        self._rows_shown = 0
         tree_scroll_y.config(command=self.tree.yview)
         tree_scroll_y.pack(side="right", fill="y")
         tree_scroll_x.config(command=self.tree.xview)
@@ -67,11 +81,32 @@ class UIManager:
         progress_bar.pack(fill="x", padx=10, pady=2)
         self.status_label = ttk.Label(self.root, text="Bereit")
         self.status_label.pack(fill="x", padx=10, pady=(0, 5))
+        # Zustand der Schutzschalter (leer, solange keine Quelle gesperrt ist)
+        self.supplier_status_label = ttk.Label(self.root, text="", foreground="red")
+        self.supplier_status_label.pack(fill="x", padx=10, pady=(0, 5))
+        # Ablaufmessung (nur mit --trace), getrennt von den Meldungen in status_label
+        self.trace_label = ttk.Label(self.root, text="", foreground="gray")
+        if tracing.is_enabled():
+            self.trace_label.pack(fill="x", padx=10, pady=(0, 5))
+
+    def show_suggestions(self, values, open_list=False):
+        """
+        Setzt die Vorschläge der Suchzeile (Type-Ahead und ähnliche Nummern nach einer erfolglosen Suche).
+        Mit open_list wird die Liste aufgeklappt; beim Tippen bleibt sie zu, weil die offene Liste die Tastatur übernimmt.
+        """
+        self.entry["values"] = values
+        if open_list and values:
+            self.entry.tk.call("ttk::combobox::Post", self.entry)
 
+    @tracing.traced("show_table")
     def show_table(self, df, veraltet_indices=None):
         if veraltet_indices is None:
             veraltet_indices = []
         
+        # Ergebnisse sind typisiert, erst hier einmalig in Anzeigetext umwandeln; eingefügt werden nur die sichtbaren Seiten
+        # (Import erst bei Bedarf, damit das Fenster ohne pandas starten kann)
+        from excel_search import format_price_blocks
+        df = format_price_blocks(df, as_text=True)
         df_display = df.drop(columns=[col for col in HIDE_COLS if col in df.columns], errors="ignore").copy()
         if "Status" in df_display.columns:
             df_display = df_display.drop(columns=["Status"])
@@ -88,15 +123,20 @@ class UIManager:
         self.tree.delete(*self.tree.get_children())
         self.tree.tag_configure("veraltet", background="#ffcccc")
 
-        for idx, (_, row) in enumerate(df_display.iterrows()):
-            values = [""]
-            for col_name, x in row.items():
-                if isinstance(x, (pd.Timestamp, datetime)):
-                    values.append(x.strftime("%d.%m.%Y"))
-                elif "Preis" in col_name and isinstance(x, (int, float)):
-                    # Formatiere den Preis für die deutsche Anzeige mit 4 Nachkommastellen
-                    values.append(f"{x:,.4f} €".replace(",", "X").replace(".", ",").replace("X", "."))
-                else:
-                    values.append(str(x))
-            tags = ("veraltet",) if idx in veraltet_indices else ()
-            self.tree.insert("", "end", values=values, tags=tags)
\ No newline at end of file
+        self._table_rows = [("", *row) for row in df_display.itertuples(index=False, name=None)]
+        self._table_veraltet = set(veraltet_indices)
+        self._rows_shown = 0
+        self._show_next_page()
+
+    def _show_next_page(self):
+        end = min(self._rows_shown + TABLE_PAGE_SIZE, len(self._table_rows))
+        for idx in range(self._rows_shown, end):
+            tags = ("veraltet",) if idx in self._table_veraltet else ()
+            self.tree.insert("", "end", values=self._table_rows[idx], tags=tags)
+        self._rows_shown = end
+
+    def _on_tree_yscroll(self, first, last):
+        self.tree_scroll_y.set(first, last)
+        # Kurz vor dem Ende der bisher eingefügten Zeilen die nächste Seite nachladen
+        if float(last) > 0.9 and self._rows_shown < len(self._table_rows):
+            self.root.after_idle(self._show_next_page)
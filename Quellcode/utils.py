@@ -1,12 +1,23 @@
 # Diese Datei sammelt kleine, allgemeine Hilfsfunktionen, die in der gesamten Anwendung wiederverwendet werden.
 
+from datetime import datetime
+from functools import lru_cache
+import numpy as np
 import pandas as pd
 import re
-from config import ONLINE_KEYWORDS
+from config import ONLINE_KEYWORDS, FORMAT_CACHE_SIZE
 
-def format_value(value, field=None):
+# Bereits formatierte Werte (TT.MM.JJJJ bzw. "1,23 €") und zu entfernende Zeichen in Preisen
+_DATE_TEXT = re.compile(r"^\d{2}\.\d{2}\.\d{4}$")
+_PRICE_TEXT = re.compile(r"^\d+,\d{2} €$")
+_NOT_PRICE_CHARS = re.compile(r"[^\d.,]")
+
+def _format_value_uncached(value, field=None):
+    if isinstance(value, datetime) and pd.notna(value):
+        # Zeitpunkte in jeder Zeile als Datum anzeigen, nicht nur in der Datum-Zeile
+        return value.strftime("%d.%m.%Y")
     if field and "Datum" in field and pd.notna(value) and str(value).strip() != "":
-        if isinstance(value, str) and re.match(r"^\d{2}\.\d{2}\.\d{4}$", value):
+        if isinstance(value, str) and _DATE_TEXT.match(value):
             return value
         try:
             date_val = pd.to_datetime(value, dayfirst=True, errors="coerce")
@@ -15,13 +26,81 @@ def format_value(value, field=None):
             return str(value)
     if field and "Preis" in field and pd.notna(value):
         try:
-            val = re.sub(r"[^\d.,]", "", str(value)).replace(",", ".")
+            val = _NOT_PRICE_CHARS.sub("", str(value)).replace(",", ".")
             price = float(val)
             return "{:.2f} €".format(price).replace(".", ",")
         except Exception:
             pass
     return "" if pd.isna(value) else str(value)
 
+# Typisiert, damit z. B. 1 und 1.0 getrennt zwischengespeichert werden ("1" bzw. "1.0")
+_format_value_cached = lru_cache(maxsize=FORMAT_CACHE_SIZE, typed=True)(_format_value_uncached)
+
+def format_value(value, field=None):
+    """Formatiert einen Wert für die Anzeige (Datum als TT.MM.JJJJ, Preis als "1,23 €")."""
+    if value is None or value is pd.NaT or (isinstance(value, float) and value != value):
+        return ""
+    if isinstance(value, str) and ((field and "Datum" in field and _DATE_TEXT.match(value))
+                                   or (field and "Preis" in field and _PRICE_TEXT.match(value))):
+        return value
+    if isinstance(value, datetime):
+        return value.strftime("%d.%m.%Y")
+    try:
+        return _format_value_cached(value, field)
+    except TypeError:
+        # Nicht hashbare Werte
+        return _format_value_uncached(value, field)
+
+def format_column(values, field=None):
+    """
+    Formatiert eine ganze Spalte wie format_value: Zeitstempel und Zahlen vektorisiert,
+    alle übrigen Werte einzeln über den Zwischenspeicher.
+    """
+    cells = pd.Series(list(values), dtype=object)
+    out = np.empty(len(cells), dtype=object)
+    done = cells.isna().to_numpy().copy()
+    out[done] = ""
+    is_dt = cells.map(lambda x: isinstance(x, datetime)).to_numpy(dtype=bool) & ~done
+    if is_dt.any():
+        out[is_dt] = [v.strftime("%d.%m.%Y") for v in cells[is_dt]]
+        done |= is_dt
+    if field and "Preis" in field:
+        is_num = cells.map(lambda x: isinstance(x, (int, float, np.number)) and not isinstance(x, bool)).to_numpy(dtype=bool) & ~done
+        if is_num.any():
+            # Zahlen, deren Text nur aus Ziffern und Punkt besteht, direkt formatieren
+            # (negative Werte und Exponentendarstellung laufen über format_value)
+            text = cells[is_num].map(str)
+            ok = text.str.fullmatch(r"\d+(\.\d*)?").to_numpy(dtype=bool)
+            formatted = cells[is_num][ok].map(lambda x: "{:.2f} €".format(float(x))).str.replace(".", ",", regex=False)
+            positions = np.flatnonzero(is_num)[ok]
+            out[positions] = formatted.to_numpy()
+            done[positions] = True
+    rest = np.flatnonzero(~done)
+    out[rest] = [format_value(v, field) for v in cells.iloc[rest]]
+    return out.tolist()
+
+def benchmark_format(df=None, repeat=3):
+    """Vergleicht die bisherige Formatierung Zelle für Zelle mit format_column über die Datum-/Preis-Zeilen der Datenbank."""
+    import time
+    from data_manager import load_db
+    from config import BLOCK_SIZE, BLOCK_ROWS
+    df = load_db() if df is None else df
+    columns = [(field, df.iloc[BLOCK_ROWS[field]::BLOCK_SIZE, pos].tolist())
+               for field in ("Datum", "Preis") for pos in range(df.shape[1])]
+    n_cells = sum(len(values) for _, values in columns)
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        reference = [[_format_value_uncached(v, field) for v in values] for field, values in columns]
+    t_scalar = (time.perf_counter() - start) / repeat
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fast = [format_column(values, field) for field, values in columns]
+    t_column = (time.perf_counter() - start) / repeat
+    status = "OK" if fast == reference else "ABWEICHUNG"
+    print(f"{n_cells} Zellen: einzeln {t_scalar*1000:.0f} ms, spaltenweise {t_column*1000:.0f} ms "
+          f"({t_scalar/t_column:.1f}x) [{status}]")
+
 def sapnr_to_str(x):
     try:
         if pd.isna(x) or str(x).strip() == "" or str(x).lower() == "nan":
@@ -39,4 +118,7 @@ def clean_price(value):
         return value
 
 def is_online_source(colname):
-    return any(key in colname.lower() for key in ONLINE_KEYWORDS)
\ No newline at end of file
+    return any(key in colname.lower() for key in ONLINE_KEYWORDS)
+
+if __name__ == "__main__":
+    benchmark_format()